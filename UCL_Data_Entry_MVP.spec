@@ -10,7 +10,26 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Not used by the app: keeps the bundle (and its start-up) small.
+    # pyarrow and openpyxl stay in: Parquet export / Excel import import them lazily.
+    excludes=[
+        'pandas',
+        'tkinter',
+        'matplotlib',
+        'scipy',
+        'IPython',
+        'PIL',
+        'pytest',
+        'PyQt6.QtWebEngineCore',
+        'PyQt6.QtWebEngineWidgets',
+        'PyQt6.QtQml',
+        'PyQt6.QtQuick',
+        'PyQt6.QtMultimedia',
+        'PyQt6.QtNetwork',
+        'PyQt6.QtSql',
+        'PyQt6.QtBluetooth',
+        'PyQt6.Qt3DCore',
+    ],
     noarchive=False,
     optimize=0,
 )
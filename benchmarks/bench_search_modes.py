@@ -0,0 +1,114 @@
+"""
+Benchmark: index seek vs table scan for each search MatchMode.
+
+Builds a synthetic tblCohortMember in a local SQLite database (a stand-in,
+since SQL Server isn't needed to show the difference), indexes the search
+columns, then times the predicate each MatchMode produces and prints the
+query plan - "SEARCH ... USING INDEX" is a seek, "SCAN" reads every row.
+
+Usage:
+    python benchmarks/bench_search_modes.py [--rows 500000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+SURNAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson",
+            "Davies", "Robinson", "Wright", "Thompson", "Evans", "Walker", "White"]
+FIRST_NAMES = ["John", "Jane", "David", "Sarah", "Michael", "Emma", "James", "Laura"]
+
+
+def build_table(path, rows):
+    conn = sqlite3.connect(path)
+    # NOCASE mirrors SQL Server's case-insensitive collation, and lets
+    # SQLite use the index for LIKE 'term%'
+    conn.execute("""
+        CREATE TABLE tblCohortMember (
+            RecID INTEGER PRIMARY KEY,
+            FamilySerial TEXT COLLATE NOCASE,
+            CohortMemberID TEXT COLLATE NOCASE,
+            FirstName TEXT COLLATE NOCASE,
+            Surname TEXT COLLATE NOCASE
+        )
+    """)
+    rng = random.Random(42)
+
+    def make_rows():
+        for rec_id in range(1, rows + 1):
+            # Add a random suffix so surnames have realistic cardinality
+            suffix = "".join(rng.choices(string.ascii_lowercase, k=3))
+            yield (
+                rec_id,
+                f"F{rec_id // 4:07d}",
+                str(rec_id % 4 + 1),
+                rng.choice(FIRST_NAMES),
+                rng.choice(SURNAMES) + suffix,
+            )
+
+    conn.executemany("INSERT INTO tblCohortMember VALUES (?, ?, ?, ?, ?)", make_rows())
+    for col in ("Surname", "FamilySerial", "CohortMemberID"):
+        conn.execute(f"CREATE INDEX ix_{col} ON tblCohortMember ({col})")
+
+    # Full-text stand-in (SQL Server would use a full-text index + CONTAINS)
+    conn.execute("CREATE VIRTUAL TABLE fts_member USING fts5(Surname, content='')")
+    conn.execute(
+        "INSERT INTO fts_member (rowid, Surname) "
+        "SELECT RecID, Surname FROM tblCohortMember"
+    )
+    conn.commit()
+    return conn
+
+
+# (label, where clause, parameter) - same shapes DataManager generates
+CASES = [
+    ("EXACT    FamilySerial = ?", "FamilySerial = ?", "F0012345"),
+    ("PREFIX   FamilySerial LIKE 'F00123%'", "FamilySerial LIKE ?", "F00123%"),
+    ("PREFIX   Surname LIKE 'Wrightab%'", "Surname LIKE ?", "Wrightab%"),
+    ("CONTAINS Surname LIKE '%ightab%'", "Surname LIKE ?", "%ightab%"),
+    ("CONTAINS FamilySerial LIKE '%12345%'", "FamilySerial LIKE ?", "%12345%"),
+    ("FULLTEXT CONTAINS(Surname, 'wrightab*')",
+     "RecID IN (SELECT rowid FROM fts_member WHERE fts_member MATCH ?)",
+     "Surname: wrightab*"),
+]
+
+
+def run_case(conn, where, param, repeat):
+    query = f"SELECT * FROM tblCohortMember WHERE {where} ORDER BY RecID LIMIT 501"
+    plan_rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", [param])
+    plan = " | ".join(row[-1] for row in plan_rows)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(query, [param]).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(rows), plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows:,} synthetic rows...", file=sys.stderr)
+        conn = build_table(os.path.join(tmp, "bench.sqlite"), args.rows)
+
+        print(f"{'case':45} {'median ms':>10} {'rows':>6}  plan")
+        for label, where, param in CASES:
+            ms, count, plan = run_case(conn, where, param, args.repeat)
+            is_scan = "USING" not in plan or "SCAN tblCohortMember" in plan
+            kind = "SCAN" if is_scan else "SEEK"
+            print(f"{label:45} {ms:10.2f} {count:6}  [{kind}] {plan}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
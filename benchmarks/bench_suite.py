@@ -0,0 +1,302 @@
+"""
+Benchmark suite: times the app's main operations on a synthetic cohort.
+
+Builds a synthetic tblCohortMember at each size in a local SQLite database
+(DATA_BACKEND=sqlite, a stand-in for SQL Server), then times load, paging,
+search, saving edits, adding a record and bulk import through the real
+DataManager / MainPresenter code, plus table rendering (offscreen Qt).
+
+Results are written to JSON and compared against the stored baseline
+(benchmarks/baseline.json, if present): any case slower than the baseline
+by more than --tolerance is reported as a regression (and the exit code
+is 1). --update-baseline stores this run as the new baseline.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 10000 100000 1000000] [--repeat 5]
+        [--output bench_results.json] [--baseline benchmarks/baseline.json]
+        [--tolerance 0.25] [--update-baseline]
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Run from anywhere: the repo root holds the 'src' package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No window needed to render the table
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SURNAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson",
+            "Davies", "Robinson", "Wright", "Thompson", "Evans", "Walker", "White"]
+FIRST_NAMES = ["John", "Jane", "David", "Sarah", "Michael", "Emma", "James", "Laura"]
+TITLES = ["Mr", "Mrs", "Ms", "Miss", "Dr"]
+
+# Columns filled in by make_rows (RecID and StatusDate come from the backend)
+COLUMNS = ["FamilySerial", "CohortMemberID", "FirstName", "Surname",
+           "Title", "Sex", "DateOfBirth", "Status"]
+
+# Stored baseline: commit a run from the reference machine here
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+EDITS = 100         # Rows changed per "save" run
+IMPORT_ROWS = 5000  # Rows per "bulk_import" run
+
+
+def make_rows(count, seed=42):
+    """Yields synthetic cohort members (lists in COLUMNS order)."""
+    rng = random.Random(seed)
+    first_birth = date(1950, 1, 1)
+    for n in range(count):
+        # A random suffix gives surnames realistic cardinality
+        suffix = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=3))
+        yield [
+            f"F{n // 4:07d}",
+            str(n % 4 + 1),
+            rng.choice(FIRST_NAMES),
+            rng.choice(SURNAMES) + suffix,
+            rng.choice(TITLES),
+            rng.choice("MF"),
+            (first_birth + timedelta(days=rng.randrange(25_000))).isoformat(),
+            "Active",
+        ]
+
+
+def build_database(path, rows):
+    """Creates the table via DataManager and indexes the search columns."""
+    from src.database.data_manager import DataManager
+
+    data_manager = DataManager()
+    data_manager.bulk_insert(COLUMNS, make_rows(rows))
+
+    # Same indexes the SQL Server table has for the search boxes
+    conn = sqlite3.connect(path)
+    for col in ("Surname", "FamilySerial", "CohortMemberID"):
+        conn.execute(f'CREATE INDEX "ix_{col}" ON "{data_manager.table_name}" ({col})')
+    conn.commit()
+    conn.close()
+    return data_manager
+
+
+def write_import_file(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(make_rows(rows, seed=7))
+
+
+def time_case(fn, repeat, setup=None):
+    """
+    Runs fn repeat times (setup first each time, untimed).
+    Returns: {'median_ms': ..., 'min_ms': ...}
+    """
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+    }
+
+
+def wait_for(presenter, app, name):
+    """Spins the event loop until the presenter's task called name has finished."""
+    while presenter.is_pending(name):
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()  # Deliver the result
+
+
+def run_size(rows, repeat, tmp):
+    from PyQt6.QtWidgets import QApplication
+    from src.database.bulk_import import BulkImporter
+    from src.ui.presenter.main_presenter import MainPresenter
+    from src.ui.view.main_view import MainView
+
+    app = QApplication.instance() or QApplication([])
+
+    db_path = os.path.join(tmp, f"bench_{rows}.db")
+    os.environ["DATA_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = db_path
+    os.environ["SCHEMA_CACHE_PATH"] = os.path.join(tmp, "schema_cache.json")
+
+    print(f"Building {rows:,} synthetic rows...", file=sys.stderr)
+    start = time.perf_counter()
+    data_manager = build_database(db_path, rows)
+    results = {"build": {"median_ms": round((time.perf_counter() - start) * 1000, 3)}}
+
+    key_col = data_manager.primary_key_col
+    stamp_col = data_manager.last_modified_col
+
+    # --- DataManager ---
+    results["load"] = time_case(data_manager.get_all_records, repeat)
+
+    def page_through():
+        # The first 10 pages, as when scrolling down
+        after_key = None
+        for _ in range(10):
+            _, _, after_key = data_manager.get_page(after_key=after_key)
+            if after_key is None:
+                break
+    results["page_x10"] = time_case(page_through, repeat)
+
+    def search():
+        data_manager.search_cache.clear()  # Time the query, not the cache
+        data_manager.search_records({"Surname": "Wrigh"})
+    results["search"] = time_case(search, repeat)
+
+    rng = random.Random(1)
+
+    def pick_edits():
+        # Fresh StatusDates each run, as if just loaded (not timed)
+        after_key = (rng.randrange(max(rows - EDITS, 1)),)
+        headers, records, _ = data_manager.get_page(
+            after_key=after_key, page_size=EDITS
+        )
+        key_idx, stamp_idx = headers.index(key_col), headers.index(stamp_col)
+        return [
+            {key_col: row[key_idx], stamp_col: row[stamp_idx], "Title": "Dr"}
+            for row in records
+        ]
+    results[f"save_{EDITS}"] = time_case(
+        data_manager.save_records, repeat, setup=pick_edits
+    )
+
+    new_record = dict(zip(COLUMNS, next(make_rows(1, seed=3))))
+    results["add"] = time_case(lambda: data_manager.insert_record(new_record), repeat)
+
+    import_path = os.path.join(tmp, "bench_import.csv")
+    write_import_file(import_path, IMPORT_ROWS)
+    importer = BulkImporter(data_manager)
+    results[f"bulk_import_{IMPORT_ROWS}"] = time_case(
+        lambda: importer.run(import_path), repeat
+    )
+
+    # --- Presenter + View ---
+    view = MainView()
+    presenter = MainPresenter(view, data_manager)
+    wait_for(presenter, app, "records")
+
+    def presenter_load():
+        presenter.load_data()
+        wait_for(presenter, app, "records")
+    results["presenter_load"] = time_case(presenter_load, repeat)
+
+    headers, page, _ = data_manager.get_all_records()
+
+    def render(data):
+        view.set_table_data(headers, data)
+        view.table.viewport().grab()  # Forces a full paint
+    results["render_page"] = time_case(lambda: render(page), repeat)
+
+    many = min(rows, 100_000)
+    _, big, _ = data_manager.get_page(page_size=many)
+    results[f"render_{many}"] = time_case(lambda: render(big), repeat)
+    memory = view.current_data.memory_usage()
+    print(
+        f"Row store for {memory['rows']:,} rows: about {memory['bytes'] / 1e6:.1f} MB",
+        file=sys.stderr,
+    )
+
+    presenter.sync_timer.stop()
+    presenter.runner.shutdown()
+    view.close()
+    data_manager.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints each case next to its baseline.
+    Returns: number of regressions (slower than baseline * (1 + tolerance))
+    """
+    regressions = 0
+    print(f"\n{'rows':>9} {'case':22} {'median ms':>11} {'baseline':>11} {'change':>8}")
+    for size, cases in results["results"].items():
+        base_cases = baseline.get("results", {}).get(size, {})
+        for case, timing in cases.items():
+            base = base_cases.get(case)
+            if not base or not base.get("median_ms"):
+                print(f"{size:>9} {case:22} {timing['median_ms']:11.2f} {'-':>11}")
+                continue
+            ratio = timing["median_ms"] / base["median_ms"]
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(
+                f"{size:>9} {case:22} {timing['median_ms']:11.2f} "
+                f"{base['median_ms']:11.2f} {ratio - 1:+8.0%}{flag}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument(
+        "--baseline",
+        default=BASELINE_PATH,
+        help="earlier results to compare against (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown before a case counts as a regression "
+        "(default: %(default)s = 25%%)",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store this run as the baseline instead of comparing",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            results["results"][str(rows)] = run_size(rows, args.repeat, tmp)
+
+    outputs = [args.output] + ([args.baseline] if args.update_baseline else [])
+    for path in outputs:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {path}", file=sys.stderr)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        print(json.dumps(results["results"], indent=2))
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    print(f"\n{regressions} regressions (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
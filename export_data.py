@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+from src.database.bulk_export import BulkExporter
+from src.database.data_manager import DataManager
+
+# Ensure Python can see the 'src' folder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the table (or a search result) to CSV or Parquet "
+        "(uses the same .env settings as the app)."
+    )
+    parser.add_argument("path", help="the .csv or .parquet file to write")
+    parser.add_argument(
+        "--search",
+        action="append",
+        default=[],
+        metavar="COLUMN=TERM",
+        help="only export matching rows, like the search boxes (repeatable)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BulkExporter.CHUNK_SIZE,
+        help="rows fetched at a time (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    search_params = {}
+    for item in args.search:
+        column, _, term = item.partition("=")
+        search_params[column.strip()] = term
+
+    def show_progress(counts):
+        print(
+            f"\r{counts['rows']:,} rows exported ({counts['rows_per_sec']:,} rows/s)",
+            end="",
+            flush=True,
+        )
+
+    data_manager = DataManager()
+    try:
+        exporter = BulkExporter(data_manager, chunk_size=args.chunk_size)
+        summary = exporter.run(
+            args.path, search_params=search_params, progress=show_progress
+        )
+    finally:
+        data_manager.close()
+
+    print(
+        f"\nWrote {summary['rows']:,} rows to {summary['path']} "
+        f"in {summary['seconds']:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import time
+from src.database.bulk_import import BulkImporter
+from src.database.data_manager import DataManager
+
+# Ensure Python can see the 'src' folder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import a CSV or Excel file into the table "
+        "(uses the same .env settings as the app)."
+    )
+    parser.add_argument("path", help="the .csv or .xlsx file to import")
+    parser.add_argument(
+        "--errors",
+        help="where to write rejected rows (default: <file>_errors.csv)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BulkImporter.CHUNK_SIZE,
+        help="rows per transaction (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    data_manager = DataManager()
+    importer = BulkImporter(data_manager, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+
+    def show_progress(counts):
+        rate = counts["read"] / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"\r{counts['read']:,} rows read, {counts['imported']:,} imported, "
+            f"{counts['rejected']:,} rejected ({rate:,.0f} rows/s)",
+            end="",
+            flush=True,
+        )
+
+    try:
+        summary = importer.run(
+            args.path, error_path=args.errors, progress=show_progress
+        )
+    finally:
+        data_manager.close()
+
+    print()
+    if summary["ignored_columns"]:
+        print(f"Ignored columns: {', '.join(summary['ignored_columns'])}")
+    if summary["error_file"]:
+        print(f"Rejected rows written to {summary['error_file']}")
+    return 1 if summary["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
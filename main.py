@@ -1,27 +1,103 @@
 import sys
 import os
-from PyQt6.QtWidgets import QApplication
-from src.ui.view.main_view import MainView
-from src.ui.presenter.main_presenter import MainPresenter
-from src.database.data_manager import DataManager
+import time
+
+# Taken before the heavy imports, for the startup report
+LAUNCHED = time.perf_counter()
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+from src.diagnostics.startup import StartupReport  # noqa: E402
+from src.ui.view.main_view import MainView  # noqa: E402
 
 # Ensure Python can see the 'src' folder
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
+def take_startup_report_option(argv):
+    """
+    Removes --startup-report (or --startup-report=FILE) from argv.
+    Returns: (report_wanted, file_path_or_None)
+    """
+    for arg in list(argv[1:]):
+        if arg == "--startup-report" or arg.startswith("--startup-report="):
+            argv.remove(arg)
+            return True, arg.partition("=")[2] or None
+    return False, None
+
+
+def open_tables(tables, placeholder):
+    """
+    Multi-table mode (TABLES_CONFIG): replaces the placeholder window with
+    one tab per table. Each table has its own DataManager (rows, caches)
+    and presenter; they share one connection pool and one TaskRunner.
+    Only the first tab loads now, the others the first time they are shown.
+    Returns: (window, data_managers, presenters)
+    """
+    from src.database.data_manager import DataManager
+    from src.ui.presenter.main_presenter import MainPresenter
+    from src.ui.presenter.task_runner import TaskRunner
+    from src.ui.view.tables_window import TablesWindow
+
+    window = TablesWindow()
+    window.setGeometry(placeholder.geometry())
+    runner = TaskRunner()
+    data_managers = DataManager.for_tables(tables)
+    presenters = []
+    for i, data_manager in enumerate(data_managers):
+        view = MainView(data_manager.search_fields, data_manager.grid_columns)
+        window.add_table(data_manager.title, view)
+        presenters.append(MainPresenter(view, data_manager, runner, load_now=i == 0))
+    window.tab_shown.connect(lambda i: presenters[i].ensure_loaded())
+
+    window.show()
+    placeholder.close()
+    return window, data_managers, presenters
+
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    report_wanted, report_path = take_startup_report_option(sys.argv)
+    startup = StartupReport(LAUNCHED)
+    startup.mark("imports")
 
-    # 1. Create the Model (Data)
-    data_manager = DataManager()
+    app = QApplication(sys.argv)
 
-    # 2. Create the View (UI)
+    # 1. Create the View (UI) and show it straight away, before anything
+    # touches the database
     view = MainView()
+    view.show()
+    app.processEvents()  # Paint the (empty) window now
+    startup.mark("window shown")
 
-    # 3. Create the Presenter (Logic) - wires them together
-    presenter = MainPresenter(view, data_manager)
+    # 2. Create the Model (Data) - reads .env and imports the database
+    # driver, so it happens after the window is up
+    from src.database.data_manager import DataManager
+    from src.ui.presenter.main_presenter import MainPresenter
 
-    view.show()
+    tables = DataManager.table_configs()
+    if tables:
+        # Several tables: a tab each (see open_tables), in place of the window
+        window, data_managers, presenters = open_tables(tables, view)
+        view = window.views[0]
+    else:
+        data_managers = [DataManager()]
+
+        # 3. Create the Presenter (Logic) - wires them together.
+        # Its first query starts once the event loop is running.
+        presenters = [MainPresenter(view, data_managers[0])]
+    startup.mark("ready")
+
+    def first_page_shown():
+        view.model.modelReset.disconnect(first_page_shown)
+        startup.mark("first page shown")
+        if report_wanted:
+            startup.report(report_path)
+
+    view.model.modelReset.connect(first_page_shown)
+
+    # Let background queries finish, then close the pooled connections on exit
+    app.aboutToQuit.connect(presenters[0].runner.shutdown)  # Shared by every table
+    for data_manager in data_managers:
+        app.aboutToQuit.connect(data_manager.close)
 
     # Start the event loop
     sys.exit(app.exec())
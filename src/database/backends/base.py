@@ -0,0 +1,361 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from src.ui.common.enums import CellState
+
+
+class StorageBackend(ABC):
+    """
+    What DataManager needs from a storage engine (SQL Server, SQLite, CSV...).
+    The rest of the app only talks to DataManager, so it never needs to know
+    which backend is active.
+
+    config: the DataManager, whose CONFIGURATION SECTION (table_name,
+    primary_key_col, db_sort_order, ...) every backend follows.
+    """
+
+    def __init__(self, config):
+        self.table_name = config.table_name
+        self.primary_key_col = config.primary_key_col
+        self.db_sort_order = config.db_sort_order
+        self.ignored_columns = config.ignored_columns
+        self.last_modified_col = config.last_modified_col
+        self.page_size = config.page_size
+        self.search_modes = config.search_modes
+        self.schema_cache = config.schema_cache
+
+        # The table's TableSchema once load_schema() has run (None if unknown)
+        self.schema = None
+
+    # --- Required ---
+
+    @abstractmethod
+    def get_page(
+        self, search_params=None, after_key=None, page_size=None, cancel_token=None,
+        columns=None,
+    ):
+        """
+        One page of records in sort order, continuing after after_key
+        (keyset pagination).
+        columns: only fetch these (None = all), see _projection
+        Returns: (headers, records, next_key)
+        """
+
+    @abstractmethod
+    def save_records(self, changes):
+        """
+        Saves [{'RecID': 101, 'Surname': 'Smith', 'StatusDate': <as loaded>}, ...]
+        in one transaction, with optimistic concurrency: a row that carries
+        its last_modified_col value is only written if the stored row still
+        has that value (nobody else saved it since it was loaded).
+        Rows without it are written unconditionally.
+        Returns: {'headers': [...],
+                  'written': [full row as now stored, ...],
+                  'conflicts': [{'mine': change_dict,
+                                 'theirs': stored row, or None if deleted}, ...],
+                  'message': 'Updated 2 records.'}
+        """
+
+    @abstractmethod
+    def insert_record(self, data_dict):
+        """
+        Adds one record (data_dict: {column: value}).
+        Returns: {'headers': [...],
+                  'row': the row as now stored, with its new Primary Key,
+                  'message': 'Successfully added record.'}
+        """
+
+    @abstractmethod
+    def bulk_insert(self, columns, rows):
+        """
+        Inserts many rows (lists in the same order as columns) in one
+        transaction, using the fastest method the backend has.
+        Returns: number of rows inserted
+        """
+
+    @abstractmethod
+    def iter_changed_records(self, since=None, chunk_size=5000):
+        """
+        Streams all rows (or only those changed since `since`).
+        Yields: (headers, records) one chunk at a time
+        """
+
+    # --- Optional ---
+
+    def update_records(self, changes):
+        """
+        save_records, reduced to (Success_Boolean, Message_String).
+        Any conflict counts as a failure (the other rows are still saved).
+        """
+        try:
+            result = self.save_records(changes)
+        except Exception as e:
+            return False, str(e)
+        if result["conflicts"]:
+            return False, (
+                f"{len(result['conflicts'])} records were changed by someone else "
+                f"since they were loaded. {result['message']}"
+            )
+        return True, result["message"]
+
+    def add_record(self, data_dict):
+        """insert_record, reduced to (Success_Boolean, Message_String)."""
+        if not data_dict:
+            return False, "No data provided."
+        try:
+            return True, self.insert_record(data_dict)["message"]
+        except Exception as e:
+            return False, str(e)
+
+    def iter_records(self, search_params=None, chunk_size=5000, cancel_token=None):
+        """
+        Streams every row (or every row matching search_params) in sort order.
+        This default walks the pages with get_page; backends that can keep
+        one cursor open and fetchmany from it override it.
+        Yields: (headers, records) one chunk at a time
+        """
+        after_key = None
+        while True:
+            headers, records, after_key = self.get_page(
+                search_params=search_params,
+                after_key=after_key,
+                page_size=chunk_size,
+                cancel_token=cancel_token,
+            )
+            if records:
+                yield headers, records
+            if after_key is None or (cancel_token and cancel_token.cancelled):
+                return
+
+    def get_values(self, key, columns):
+        """
+        {column: value} for some of one record's columns, e.g. a wide
+        column get_page left as CellState.NOT_LOADED. None if the record
+        is gone. This default scans the table; backends that can look
+        a key up override it.
+        """
+        for headers, records in self.iter_records():
+            key_idx = headers.index(self.primary_key_col)
+            for row in records:
+                if row[key_idx] == key:
+                    return {col: row[headers.index(col)] for col in columns}
+        return None
+
+    def schema_version(self):
+        """
+        A value that changes whenever the table is altered, or None if the
+        backend can't tell (then the schema is never cached on disk).
+        """
+        return None
+
+    def introspect(self):
+        """Reads the table's TableSchema from the database (None if unsupported)."""
+        return None
+
+    def load_schema(self):
+        """
+        Returns the TableSchema (or None), reading it at most once per session:
+        from the disk cache if the table hasn't changed, else from the database.
+        """
+        if self.schema is None:
+            version = self.schema_version()
+            if version is not None:
+                self.schema = self.schema_cache.get(self.table_name, version)
+            if self.schema is None:
+                self.schema = self.introspect()
+                if self.schema is not None and version is not None:
+                    self.schema.version = version
+                    self.schema_cache.put(self.schema)
+        return self.schema
+
+    def sync(self):
+        """Returns: a short status message"""
+        return "Connected to the server."
+
+    def is_offline_error(self, error):
+        """
+        True if error means the storage can't be reached right now (so a
+        write should be retried later), rather than that the write itself
+        was refused.
+        """
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    def pool_stats(self):
+        return {}
+
+    def statement_stats(self):
+        """SQL text cache metrics (see statement_cache.py), {} if not used."""
+        return {}
+
+    def close(self):
+        pass
+
+    # --- Shared helpers ---
+
+    def _sort_columns(self):
+        """
+        Returns the list of columns used for ORDER BY and keyset paging.
+        The Primary Key is always included as the final tie-breaker so the
+        sort key is unique (anything after the Primary Key is redundant).
+        """
+        sort_order = self.db_sort_order if self.db_sort_order else self.primary_key_col
+        columns = [col.strip() for col in sort_order.split(",") if col.strip()]
+
+        if self.primary_key_col in columns:
+            return columns[: columns.index(self.primary_key_col) + 1]
+        return columns + [self.primary_key_col]
+
+    @staticmethod
+    def _keyset_condition(sort_cols, after_key, name=str):
+        """
+        Builds the "row comes after the last one we saw" condition.
+        For sort columns (A, B) and last key (a, b) this is:
+            (A > a) OR (A = a AND B > b)
+        Unlike OFFSET, the database can seek straight to this position in
+        the index. NULLs sort first (in SQL Server and SQLite alike) but
+        never compare equal or greater, so a NULL in the last key is spelled
+        out: "A > NULL" becomes "A IS NOT NULL" and "A = NULL" "A IS NULL".
+        name: how to write a column name in the SQL (e.g. quoted)
+        Returns: (sql_string, values_list, columns_list) - columns_list is
+            the column each value is compared with
+        """
+        branches = []
+        values = []
+        value_columns = []
+        for i, col in enumerate(sort_cols):
+            parts = []
+            for j, key_col in enumerate(sort_cols[: i + 1]):
+                value = after_key[j]
+                if value is None:
+                    parts.append(f"{name(key_col)} IS {'NOT ' if j == i else ''}NULL")
+                    continue
+                parts.append(f"{name(key_col)} {'>' if j == i else '='} ?")
+                values.append(value)
+                value_columns.append(key_col)
+            branches.append("(" + " AND ".join(parts) + ")")
+        return "(" + " OR ".join(branches) + ")", values, value_columns
+
+    def _projection(self, columns, table_columns):
+        """
+        What a page showing `columns` (None = all) reads from table_columns:
+        those columns plus the ones paging and saving need (Primary Key,
+        last_modified_col, sort columns), in table order. Wide columns (see
+        TableSchema.is_wide) are only checked for being empty; their values
+        are fetched one record at a time with get_values.
+        Returns: (headers, wide) - headers is None (read everything) if
+                 table_columns isn't known
+        """
+        if table_columns is None:
+            return None, ()
+        needed = {self.primary_key_col, self.last_modified_col}
+        needed.update(self._sort_columns())
+        headers = [
+            col for col in table_columns
+            if columns is None or col in columns or col in needed
+        ]
+        schema = self.schema
+        wide = tuple(
+            col for col in headers
+            if col not in needed and schema is not None and schema.is_wide(col)
+        )
+        return headers, wide
+
+    @staticmethod
+    def _mark_not_loaded(headers, records, wide):
+        """
+        Turns the wide columns' "has a value" flags (1/0) into
+        CellState.NOT_LOADED or None, in place.
+        """
+        for col_idx in [headers.index(col) for col in wide]:
+            for row in records:
+                row[col_idx] = CellState.NOT_LOADED if row[col_idx] else None
+
+    def _search_conditions(self, search_params):
+        """
+        One predicate per filled-in search box (see _search_condition).
+        Returns: (conditions_list, values_list)
+        """
+        conditions = []
+        values = []
+        for col, search_term in (search_params or {}).items():
+            if search_term:  # Only add if user actually typed something
+                condition, value = self._search_condition(col, search_term)
+                conditions.append(condition)
+                values.append(value)
+        return conditions, values
+
+    def _tokens(self, changes):
+        """
+        {primary_key: last_modified_col value as loaded} for the rows that
+        carry one (the others are saved without a concurrency check).
+        """
+        return {
+            row[self.primary_key_col]: row[self.last_modified_col]
+            for row in changes
+            if self.last_modified_col in row
+        }
+
+    @staticmethod
+    def _stamp_text(value):
+        """
+        A last_modified_col value (datetime or text) as fixed-width text,
+        "YYYY-MM-DD HH:MM:SS.fff", so stamps compare and sort correctly as
+        text whoever wrote them. Anything that isn't a date comes back as is.
+        """
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return value
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        return value
+
+    def _save_message(self, written, conflicts):
+        message = f"Updated {len(written)} records."
+        if conflicts:
+            message += f" {len(conflicts)} were changed by someone else."
+        return message
+
+    def _group_changes(self, changes):
+        """
+        Groups edited rows by which columns changed, so each group can be sent
+        as one statement with many parameter rows.
+        Returns: ({('Surname',): [['Smith', 101], ...]}, None)
+                 or (None, error_message)
+        """
+        batches = {}
+        for row_dict in changes:
+            # Extract PrimaryKey <-- Primary Key update if changes
+            primary_key = row_dict.get(self.primary_key_col)
+            if not primary_key:
+                return None, f"Critical Error: Row is missing {self.primary_key_col}."
+
+            # Filter the dictionary to get only the columns we want to update
+            valid_keys = tuple(
+                k for k in row_dict.keys()
+                if k not in self.ignored_columns and k != self.primary_key_col
+            )
+            if not valid_keys:
+                continue
+
+            # Values in the same order as valid_keys, RecID at the end
+            # for "WHERE RecID=?"
+            values = [row_dict[key] for key in valid_keys]
+            values.append(primary_key)
+            batches.setdefault(valid_keys, []).append(values)
+
+        if not batches:
+            return None, "No changes detected or valid columns to update."
+        return batches, None
+
+    @staticmethod
+    def _next_key(headers, records, sort_cols, page_size):
+        """
+        Trims the extra look-ahead row and works out where the next page starts.
+        Returns: (records, next_key) - next_key is None on the last page
+        """
+        if len(records) <= page_size:
+            return records, None
+        records = records[:page_size]
+        key_indexes = [headers.index(col) for col in sort_cols]
+        return records, tuple(records[-1][i] for i in key_indexes)
@@ -0,0 +1,394 @@
+import bisect
+import csv
+import mmap
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from src.database.backends.base import StorageBackend
+from src.database.search_cache import SearchCache, matches
+from src.ui.common.enums import MatchMode
+from src.ui.common.ui_helpers import display_text
+
+
+class CsvBackend(StorageBackend):
+    """
+    Stores the table in a plain CSV file (DATA_BACKEND=csv), e.g.
+    "MVP_data_entry.csv" next to the app. The first line holds the headers;
+    if the file doesn't exist it is created from COLUMN_MAP (column_map).
+
+    The file is never loaded whole: pages and searches stream through a
+    memory map of it. Rows are kept in Primary Key order (new rows are
+    appended with the next key), so a sparse index of every INDEX_EVERY-th
+    key and its byte offset lets a page start reading close to where it
+    begins instead of at the top of the file.
+
+    Note: pages always come back in Primary Key order (db_sort_order is
+    ignored), and everything read back is text except the Primary Key.
+    """
+
+    # Remember the byte offset of one row in this many
+    INDEX_EVERY = 1000
+
+    # Most seconds a save waits for streams still reading the file (Windows
+    # won't replace a file that is open) before giving up
+    REPLACE_TIMEOUT = 60
+
+    def __init__(self, config, path, encoding="utf-8"):
+        super().__init__(config)
+        self.path = path
+        self.encoding = encoding
+        self._lock = threading.RLock()
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "w", newline="", encoding=encoding) as f:
+                csv.writer(f).writerow(list(config.column_map))
+
+        with open(path, newline="", encoding=encoding) as f:
+            self.headers = next(csv.reader(f))
+        self._key_idx = self.headers.index(self.primary_key_col)
+
+        # Built on first use, and rebuilt whenever the file changes on disk
+        self._index = None  # [(primary_key, byte_offset), ...]
+        self._index_stamp = None
+        self._max_key = 0
+
+        # How many streams (see _scan) have the file open right now
+        self._readers = 0
+        self._readers_changed = threading.Condition()
+
+    # --- Reads ---
+
+    def get_page(
+        self, search_params=None, after_key=None, page_size=None, cancel_token=None,
+        columns=None,
+    ):
+        """
+        One page in Primary Key order, continuing after after_key.
+        columns: only keep these (None = all); every row is still read whole.
+        Returns: (headers, records, next_key)
+        """
+        page_size = page_size or self.page_size
+        checks = self._search_checks(search_params)
+        after = int(after_key[-1]) if after_key is not None else None
+
+        records = []
+        with self._lock:
+            for _, row in self._scan(after):
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
+                if all(matches(row[idx], mode, term) for idx, mode, term in checks):
+                    records.append(row)
+                    if len(records) > page_size:
+                        break
+
+        records, next_key = self._next_key(
+            self.headers, records, [self.primary_key_col], page_size
+        )
+        headers, _ = self._projection(columns, self.headers)
+        if headers != self.headers:
+            positions = [self.headers.index(col) for col in headers]
+            records = [[row[i] for i in positions] for row in records]
+        return headers, records, next_key
+
+    def iter_records(self, search_params=None, chunk_size=5000, cancel_token=None):
+        """Streams matching rows in one pass over the file (no lock held)."""
+        checks = self._search_checks(search_params)
+        chunk = []
+        for _, row in self._scan(None):
+            if all(matches(row[idx], mode, term) for idx, mode, term in checks):
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield self.headers, chunk
+                    chunk = []
+                    if cancel_token is not None and cancel_token.cancelled:
+                        return
+        if chunk:
+            yield self.headers, chunk
+
+    def iter_changed_records(self, since=None, chunk_size=5000):
+        """Streams the file: yields (headers, records) one chunk at a time."""
+        if self.last_modified_col not in self.headers:
+            since = None  # No stamps: every row counts as changed
+        else:
+            modified_idx = self.headers.index(self.last_modified_col)
+            since = self._stamp_text(since)
+
+        # No lock while streaming: the memory map keeps reading the file as it
+        # was. An update swaps in a new one meanwhile (POSIX), or waits for
+        # the stream to finish first (Windows, see _replace)
+        chunk = []
+        for _, row in self._scan(None):
+            # Stamps are "YYYY-MM-DD HH:MM:SS.fff" (older files: no fraction),
+            # which sort as text
+            if since is not None and (row[modified_idx] or "") < since:
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield self.headers, chunk
+                chunk = []
+        if chunk:
+            yield self.headers, chunk
+
+    # --- Writes ---
+
+    def save_records(self, changes):
+        """
+        Applies every edit in a single pass: the file is copied to a temporary
+        file with the edited rows replaced, which then takes its place
+        (os.replace is atomic, so a crash never leaves a half-written file).
+        A row whose StatusDate no longer matches the one it was loaded with
+        is left alone and reported as a conflict.
+        See StorageBackend.save_records for the result.
+        """
+        batches, error = self._group_changes(changes)
+        if error:
+            raise ValueError(error)
+        tokens = {int(k): v for k, v in self._tokens(changes).items()}
+        changes_by_key = {int(row[self.primary_key_col]): row for row in changes}
+
+        # {101: {'Surname': 'Smith'}, ...}
+        edits = {}
+        for valid_keys, rows in batches.items():
+            for values in rows:
+                edits.setdefault(int(values[-1]), {}).update(zip(valid_keys, values))
+
+        unknown = {col for row in edits.values() for col in row} - set(self.headers)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+        # A file without last_modified_col is saved without the check
+        stamped = self.last_modified_col in self.headers
+        if stamped:
+            stamp_idx = self.headers.index(self.last_modified_col)
+        else:
+            tokens = {}
+        written = []
+        stored = {}  # Current version of each conflicting row
+        with self._lock:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            fd, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            try:
+                with open(fd, "w", newline="", encoding=self.encoding) as out:
+                    writer = csv.writer(out)
+                    writer.writerow(self.headers)
+                    for _, row in self._scan(None):
+                        key = row[self._key_idx]
+                        edit = edits.get(key)
+                        if edit is not None and key in tokens and (
+                            self._stamp_text(row[stamp_idx])
+                            != self._stamp_text(tokens[key])
+                        ):
+                            stored[key] = row  # Saved by someone else meanwhile
+                            edit = None
+                        if edit is not None:
+                            row = [
+                                edit.get(col, value)
+                                for col, value in zip(self.headers, row)
+                            ]
+                            if stamped:
+                                row[stamp_idx] = self._next_stamp(row[stamp_idx])
+                        fields = [self._to_csv(value) for value in row]
+                        writer.writerow(fields)
+                        if edit is not None:
+                            written.append(self._parse_row(fields))
+                self._replace(temp_path)
+            except OSError:
+                os.remove(temp_path)
+                raise
+
+        written_keys = {row[self._key_idx] for row in written}
+        conflicts = [
+            {"mine": changes_by_key[key], "theirs": stored.get(key)}
+            for key in tokens
+            if key in edits and key not in written_keys
+        ]
+        return {
+            "headers": list(self.headers),
+            "written": written,
+            "conflicts": conflicts,
+            "message": self._save_message(written, conflicts),
+        }
+
+    def insert_record(self, data_dict):
+        """See StorageBackend.insert_record."""
+        with self._lock:
+            self.bulk_insert(list(data_dict), [list(data_dict.values())])
+            # Read it back as stored (the last row: it has the highest key)
+            _, row = next(self._scan(self._max_key - 1))
+        return {
+            "headers": self.headers,
+            "row": row,
+            "message": "Successfully added record.",
+        }
+
+    def bulk_insert(self, columns, rows):
+        """
+        CSV fast path: one append to the end of the file for all the rows,
+        each given the next Primary Key.
+        Returns: number of rows inserted
+        """
+        columns = list(columns)
+        unknown = [col for col in columns if col not in self.headers]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+        stamp = self._now()
+        count = 0
+        with self._lock:
+            self._refresh_index()
+            with open(self.path, "a", newline="", encoding=self.encoding) as f:
+                writer = csv.writer(f)
+                for values in rows:
+                    row = dict(zip(columns, values))
+                    self._max_key += 1
+                    row[self.primary_key_col] = self._max_key
+                    row.setdefault(self.last_modified_col, stamp)
+                    writer.writerow(
+                        [self._to_csv(row.get(col)) for col in self.headers]
+                    )
+                    count += 1
+
+            # Appended rows come after every indexed key, so a non-empty index
+            # still holds (an empty one is rebuilt to find the first row)
+            if self._index:
+                stat = os.stat(self.path)
+                self._index_stamp = (stat.st_mtime_ns, stat.st_size)
+        return count
+
+    # --- Helpers ---
+
+    def _scan(self, after):
+        """
+        Yields (byte_offset, row) for every row with a Primary Key above after
+        (all rows if after is None), reading through a memory map of the file.
+        """
+        with self._lock:
+            self._refresh_index()
+            index = self._index
+            f = open(self.path, "rb")
+            with self._readers_changed:
+                self._readers += 1
+        try:
+            if not index:
+                return  # Headers only
+
+            # Start at the last indexed row that can't be past `after`
+            start = index[0][1]
+            if after is not None:
+                pos = bisect.bisect_right([key for key, _ in index], after) - 1
+                if pos >= 0:
+                    start = index[pos][1]
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset, row in self._read_rows(mm, start):
+                    if after is None or row[self._key_idx] > after:
+                        yield offset, row
+        finally:
+            f.close()
+            with self._readers_changed:
+                self._readers -= 1
+                self._readers_changed.notify_all()
+
+    def _replace(self, temp_path):
+        """
+        Puts temp_path in the file's place (caller holds the lock, so no new
+        stream starts meanwhile). Windows refuses while the file is open or
+        memory-mapped, so on PermissionError this waits for the streams still
+        reading it (an export, say) to finish and tries again.
+        """
+        deadline = time.monotonic() + self.REPLACE_TIMEOUT
+        while True:
+            try:
+                os.replace(temp_path, self.path)
+                return
+            except PermissionError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise
+                with self._readers_changed:
+                    # No stream open: something else has it (e.g. a virus
+                    # scanner), so just try again shortly
+                    self._readers_changed.wait(
+                        remaining if self._readers else min(remaining, 0.05)
+                    )
+
+    def _read_rows(self, mm, offset):
+        """Parses rows from offset onwards: yields (byte_offset, row)."""
+        mm.seek(offset)
+        lines = iter(lambda: mm.readline().decode(self.encoding), "")
+        reader = csv.reader(lines)
+        while True:
+            start = mm.tell()  # The reader only reads ahead within a row
+            try:
+                fields = next(reader)
+            except StopIteration:
+                return
+            if not fields:
+                continue  # Blank line
+            yield start, self._parse_row(fields)
+
+    def _parse_row(self, fields):
+        """CSV fields -> row values: empty becomes None, the Primary Key an int."""
+        row = [value if value != "" else None for value in fields]
+        row[self._key_idx] = int(row[self._key_idx])
+        return row
+
+    def _refresh_index(self):
+        """(Re)builds the sparse index if the file changed since it was built."""
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._index is not None and stamp == self._index_stamp:
+            return
+
+        index = []
+        max_key = 0
+        if stat.st_size:
+            with open(self.path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                mm.readline()  # Skip the headers
+                for i, (offset, row) in enumerate(self._read_rows(mm, mm.tell())):
+                    if i % self.INDEX_EVERY == 0:
+                        index.append((row[self._key_idx], offset))
+                    max_key = max(max_key, row[self._key_idx])
+
+        self._index = index
+        self._index_stamp = stamp
+        self._max_key = max_key
+
+    def _search_checks(self, search_params):
+        """[(column_index, MatchMode, normalized_term), ...] for the typed boxes."""
+        checks = []
+        for col, term in SearchCache.normalize(search_params or {}):
+            mode = self.search_modes.get(col, MatchMode.CONTAINS)
+            if mode == MatchMode.FULLTEXT:
+                mode = MatchMode.CONTAINS  # No full-text index in a CSV file
+            checks.append((self.headers.index(col), mode, term))
+        return checks
+
+    @classmethod
+    def _now(cls):
+        return cls._stamp_text(datetime.now())
+
+    @classmethod
+    def _next_stamp(cls, current):
+        """
+        An updated row's last_modified_col: now, or 1 ms after the stamp it
+        has if that isn't earlier (saved twice in one millisecond), so every
+        save leaves a new StatusDate.
+        """
+        now = datetime.fromisoformat(cls._now())  # To the millisecond
+        try:
+            previous = datetime.fromisoformat(current or "")
+        except ValueError:
+            previous = None
+        if previous is not None and previous >= now:
+            now = previous + timedelta(milliseconds=1)
+        return cls._stamp_text(now)
+
+    @staticmethod
+    def _to_csv(value):
+        # Same text the grid shows, so dates read back as "YYYY-MM-DD"
+        return display_text(value)
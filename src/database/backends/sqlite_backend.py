@@ -0,0 +1,337 @@
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from src.database.backends.base import StorageBackend
+from src.diagnostics.tracer import payload_bytes, tracer
+from src.ui.common.enums import MatchMode
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Stores the table in a local SQLite file - no SQL Server needed.
+    Used on its own (DATA_BACKEND=sqlite) and as the local side of LocalReplica.
+    If the table doesn't exist yet it is created from COLUMN_MAP
+    (the table's column_map).
+    """
+
+    # The last_modified_col stamp, to the millisecond: two saves within the
+    # same second must not leave the same StatusDate (see save_records)
+    NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+    def __init__(self, config, path, create_from_schema=True):
+        super().__init__(config)
+        self.path = path
+
+        # One connection shared by the background threads, guarded by a lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+        columns = self._conn.execute(f'PRAGMA table_info("{self.table_name}")')
+        self.headers = [row[1] for row in columns]
+        if not self.headers and create_from_schema:
+            with self._lock, self._conn:
+                self._create_table(list(config.column_map))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Reads ---
+
+    def get_page(
+        self, search_params=None, after_key=None, page_size=None, cancel_token=None,
+        columns=None,
+    ):
+        """
+        Fetches a single page using keyset pagination (like the SQL Server
+        version, but with LIMIT). Returns: (headers, records, next_key)
+        """
+        page_size = page_size or self.page_size
+        sort_cols = self._sort_columns()
+        projected, _ = self._projection(columns, self.headers or None)
+        select_list = (
+            ", ".join(f'"{col}"' for col in projected) if projected else "*"
+        )
+
+        conditions, values = self._search_conditions(search_params)
+
+        if after_key is not None:
+            keyset_sql, keyset_values, _ = self._keyset_condition(
+                sort_cols, after_key, name=lambda col: f'"{col}"'
+            )
+            conditions.append(keyset_sql)
+            values.extend(keyset_values)
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_by = ", ".join(f'"{col}"' for col in sort_cols)
+        query = (
+            f'SELECT {select_list} FROM "{self.table_name}" {where_clause} '
+            f"ORDER BY {order_by} LIMIT ?"
+        )
+
+        with self._lock:
+            with tracer.span("execute", "db"):
+                cursor = self._conn.execute(query, values + [page_size + 1])
+            headers = [column[0] for column in cursor.description]
+            with tracer.span("fetch", "db") as span:
+                records = [list(row) for row in cursor]
+                if span:
+                    span.update(rows=len(records), bytes=payload_bytes(records))
+
+        records, next_key = self._next_key(headers, records, sort_cols, page_size)
+        return headers, records, next_key
+
+    def get_values(self, key, columns):
+        """Reads some columns of one record by Primary Key: {column: value} or None"""
+        columns = list(columns)
+        unknown = [col for col in columns if col not in self.headers]
+        if unknown:
+            raise ValueError(f"No such column: {', '.join(unknown)}")
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT {column_list} FROM "{self.table_name}" '
+                f'WHERE "{self.primary_key_col}" = ?',
+                [key],
+            ).fetchone()
+        return dict(zip(columns, row)) if row is not None else None
+
+    def iter_records(self, search_params=None, chunk_size=5000, cancel_token=None):
+        """Streams the table (or a search result) in sort order with fetchmany."""
+        conditions, values = self._search_conditions(search_params)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_by = ", ".join(f'"{col}"' for col in self._sort_columns())
+        query = f'SELECT * FROM "{self.table_name}" {where_clause} ORDER BY {order_by}'
+        yield from self._stream(query, values, chunk_size, cancel_token)
+
+    def iter_changed_records(self, since=None, chunk_size=5000):
+        query = f'SELECT * FROM "{self.table_name}"'
+        values = []
+        if since is not None:
+            # Stamps are compared as "YYYY-MM-DD HH:MM:SS.fff" text; rows
+            # written before every stamp had that form are brought into it
+            query += (
+                f" WHERE strftime('%Y-%m-%d %H:%M:%f', \"{self.last_modified_col}\")"
+                " >= ?"
+            )
+            values.append(self._stamp_text(since))
+
+        yield from self._stream(query, values, chunk_size)
+
+    def _stream(self, query, values, chunk_size, cancel_token=None):
+        # A separate connection so a long export doesn't hold the lock throughout
+        conn = sqlite3.connect(self.path)
+        try:
+            if cancel_token is not None:
+                cancel_token.on_cancel(conn.interrupt)
+            cursor = conn.execute(query, values)
+            headers = [column[0] for column in cursor.description]
+            while not (cancel_token and cancel_token.cancelled):
+                records = cursor.fetchmany(chunk_size)
+                if not records:
+                    break
+                yield headers, [list(row) for row in records]
+        finally:
+            conn.close()
+
+    # --- Writes ---
+
+    def save_records(self, changes):
+        """
+        Same grouping as SQL Server (one executemany per set of changed
+        columns), with the StatusDate check done inside the same transaction.
+        A table without last_modified_col is saved without the check.
+        See StorageBackend.save_records for the result.
+        """
+        with self._lock, self._conn:
+            return self._save_rows(changes)
+
+    def _save_rows(self, changes):
+        """
+        The body of save_records, inside the caller's transaction (the
+        caller holds the lock and commits).
+        """
+        batches, error = self._group_changes(changes)
+        if error:
+            raise ValueError(error)
+        stamped = self.last_modified_col in self.headers
+        tokens = self._tokens(changes) if stamped else {}
+        changes_by_key = {row[self.primary_key_col]: row for row in changes}
+
+        # 1. Which of the rows have been saved by someone else meanwhile?
+        stored = dict(self._rows_by_key(list(tokens)))
+        conflict_keys = set()
+        if tokens:
+            stamp_idx = self.headers.index(self.last_modified_col)
+            conflict_keys = {
+                key for key, token in tokens.items()
+                if key not in stored
+                or self._stamp(stored[key][stamp_idx]) != self._stamp(token)
+            }
+
+        # 2. Write the rest
+        for valid_keys, rows in batches.items():
+            rows = [row for row in rows if row[-1] not in conflict_keys]
+            if not rows:
+                continue
+            set_clause = ", ".join(f'"{key}"=?' for key in valid_keys)
+            if stamped:
+                set_clause += f', "{self.last_modified_col}"={self._next_stamp()}'
+            self._conn.executemany(
+                f'UPDATE "{self.table_name}" SET {set_clause} '
+                f'WHERE "{self.primary_key_col}"=?',
+                ([self._to_sqlite(v) for v in row] for row in rows),
+            )
+
+        sent_keys = {row[-1] for rows in batches.values() for row in rows}
+        written = [
+            row for _, row in self._rows_by_key(list(sent_keys - conflict_keys))
+        ]
+
+        conflicts = [
+            {"mine": changes_by_key[key], "theirs": stored.get(key)}
+            for key in tokens
+            if key in conflict_keys and key in sent_keys
+        ]
+        return {
+            "headers": list(self.headers),
+            "written": written,
+            "conflicts": conflicts,
+            "message": self._save_message(written, conflicts),
+        }
+
+    def insert_record(self, data_dict):
+        """See StorageBackend.insert_record."""
+        with self._lock:
+            self.bulk_insert(list(data_dict), [list(data_dict.values())])
+            # The Primary Key is the rowid, so the new row is easy to find
+            row = self._conn.execute(
+                f'SELECT * FROM "{self.table_name}" WHERE rowid = last_insert_rowid()'
+            ).fetchone()
+        return {
+            "headers": self.headers,
+            "row": list(row),
+            "message": "Successfully added record.",
+        }
+
+    def bulk_insert(self, columns, rows):
+        """
+        SQLite fast path: executemany inside one transaction (one disk sync
+        for the whole batch instead of one per row).
+        Returns: number of rows inserted
+        """
+        with self._lock, self._conn:
+            return self._insert_rows(columns, rows)
+
+    def _insert_rows(self, columns, rows):
+        """
+        The body of bulk_insert, inside the caller's transaction (the
+        caller holds the lock and commits).
+        """
+        columns = list(columns)
+        stamp = (
+            self.last_modified_col in self.headers
+            and self.last_modified_col not in columns
+        )
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        if stamp:
+            column_list += f', "{self.last_modified_col}"'
+            placeholders += f", {self.NOW}"
+
+        before = self._conn.total_changes
+        self._conn.executemany(
+            f'INSERT INTO "{self.table_name}" ({column_list}) '
+            f"VALUES ({placeholders})",
+            ([self._to_sqlite(v) for v in row] for row in rows),
+        )
+        return self._conn.total_changes - before
+
+    # --- Helpers ---
+
+    def _rows_by_key(self, keys):
+        """
+        Fetches whole rows by Primary Key (caller holds the lock).
+        Returns: [(key, row), ...]
+        """
+        key_idx = self.headers.index(self.primary_key_col)
+        found = []
+        # Stay under SQLite's limit on parameters per statement
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            cursor = self._conn.execute(
+                f'SELECT * FROM "{self.table_name}" '
+                f'WHERE "{self.primary_key_col}" IN ({", ".join("?" for _ in part)})',
+                part,
+            )
+            found.extend((row[key_idx], list(row)) for row in cursor)
+        return found
+
+    def _next_stamp(self):
+        """
+        SQL for an updated row's last_modified_col: now, or 1 ms after the
+        stamp it has if that isn't earlier (saved twice in one millisecond),
+        so every save leaves a new StatusDate.
+        """
+        return (
+            f"MAX({self.NOW}, COALESCE(strftime('%Y-%m-%d %H:%M:%f', "
+            f"\"{self.last_modified_col}\", '+0.001 seconds'), ''))"
+        )
+
+    def _create_table(self, headers):
+        """Creates the table with the given columns (caller holds the lock)."""
+        # NOCASE: text compares case-insensitively, like SQL Server
+        columns = ", ".join(
+            f'"{col}" INTEGER PRIMARY KEY' if col == self.primary_key_col
+            else f'"{col}" COLLATE NOCASE'
+            for col in headers
+        )
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.table_name}" ({columns})'
+        )
+
+        # Index the columns we sort and search on
+        for col in set(self._sort_columns()) | set(self.search_modes):
+            if col in headers and col != self.primary_key_col:
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "ix_{self.table_name}_{col}" '
+                    f'ON "{self.table_name}" ("{col}")'
+                )
+        self.headers = list(headers)
+
+    def _search_condition(self, col, search_term):
+        """SQLite version of SqlServerBackend._search_condition."""
+        mode = self.search_modes.get(col, MatchMode.CONTAINS)
+        term = str(search_term).strip()
+
+        if mode == MatchMode.EXACT:
+            return f'"{col}" = ? COLLATE NOCASE', term
+
+        literal = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        if mode == MatchMode.PREFIX:
+            return f'"{col}" LIKE ? ESCAPE \'\\\'', f"{literal}%"
+        # CONTAINS (and FULLTEXT, which has no index here)
+        return f'"{col}" LIKE ? ESCAPE \'\\\'', f"%{literal}%"
+
+    @staticmethod
+    def _stamp(value):
+        """
+        A StatusDate as stored or as loaded, in a form that compares equal
+        however many fraction digits its text has ("...:05.250" and a
+        datetime of ...:05.250000 are the same stamp).
+        """
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return value
+
+    @staticmethod
+    def _to_sqlite(value):
+        """SQLite can't store dates or Decimals; keep the text the grid shows."""
+        if isinstance(value, (date, datetime, Decimal)):
+            return str(value)
+        return value
@@ -0,0 +1,730 @@
+import pyodbc
+from contextlib import contextmanager
+from src.database.backends.base import StorageBackend
+from src.database.connection_pool import ConnectionPool
+from src.database.statement_cache import StatementCache, bucket
+from src.database.table_schema import TableSchema
+from src.diagnostics.tracer import payload_bytes, tracer
+from src.ui.common.enums import MatchMode
+
+# SQL Server type name -> ODBC type used to declare parameters (setinputsizes)
+ODBC_TYPES = {
+    "nvarchar": pyodbc.SQL_WVARCHAR,
+    "nchar": pyodbc.SQL_WCHAR,
+    "varchar": pyodbc.SQL_VARCHAR,
+    "char": pyodbc.SQL_CHAR,
+    "int": pyodbc.SQL_INTEGER,
+    "bigint": pyodbc.SQL_BIGINT,
+    "smallint": pyodbc.SQL_SMALLINT,
+    "tinyint": pyodbc.SQL_TINYINT,
+    "bit": pyodbc.SQL_BIT,
+    "date": pyodbc.SQL_TYPE_DATE,
+    "datetime": pyodbc.SQL_TYPE_TIMESTAMP,
+    "datetime2": pyodbc.SQL_TYPE_TIMESTAMP,
+    "smalldatetime": pyodbc.SQL_TYPE_TIMESTAMP,
+    "decimal": pyodbc.SQL_DECIMAL,
+    "numeric": pyodbc.SQL_NUMERIC,
+    "float": pyodbc.SQL_DOUBLE,
+    "real": pyodbc.SQL_REAL,
+}
+TEXT_TYPES = {"nvarchar", "nchar", "varchar", "char"}
+SIZED_TYPES = {"decimal", "numeric", "date", "datetime", "datetime2", "smalldatetime"}
+
+
+class SqlServerBackend(StorageBackend):
+    """The original SQL Server storage (pyodbc + T-SQL)."""
+
+    # Rows per executemany call during bulk_insert
+    BULK_BATCH_SIZE = 1000
+
+    # Stay under SQL Server's limit of 2100 parameters per request
+    MAX_PARAMS = 2000
+
+    def __init__(
+        self, config, conn_string, pool_size=4, idle_timeout=300, ping_after=30,
+        pool=None,
+    ):
+        """pool: another table's ConnectionPool to share (the settings are its own)"""
+        super().__init__(config)
+
+        # Connections are kept open and reused (see .env for the pool settings)
+        self.pool = pool or ConnectionPool(
+            conn_string,
+            max_size=pool_size,
+            idle_timeout=idle_timeout,
+            ping_after=ping_after,
+        )
+
+        # Generated SQL, one text per shape of call (see statement_cache.py)
+        self.statements = StatementCache()
+
+    def _get_connection(self):
+        """
+        Helper method to borrow a pooled connection for a 'with' block.
+        It goes back to the pool (not closed) at the end of the block.
+        """
+        return self.pool.connection()
+
+    def pool_stats(self):
+        """Connection pool metrics, e.g. {'connects': 2, 'reused': 118, ...}"""
+        return dict(self.pool.stats, connects_avoided=self.pool.stats["reused"])
+
+    def statement_stats(self):
+        """SQL text cache metrics, e.g. {'hits': 95, 'misses': 5, 'cached': 5, ...}"""
+        return dict(self.statements.stats, cached=len(self.statements))
+
+    def close(self):
+        """Closes the pooled connections (call when the app exits)."""
+        self.pool.close_all()
+
+    # SQLSTATEs for a query or login timeout
+    TIMEOUT_STATES = ("HYT00", "HYT01")
+
+    def is_offline_error(self, error):
+        """Connection failures (SQLSTATE class 08) and timeouts."""
+        if super().is_offline_error(error) or self.pool.is_disconnect(error):
+            return True
+        args = getattr(error, "args", ())
+        return bool(args) and str(args[0]) in self.TIMEOUT_STATES
+
+    # --- Schema ---
+
+    def schema_version(self):
+        """sys.objects.modify_date: changes with every ALTER TABLE."""
+        with self._get_connection() as conn:
+            row = conn.cursor().execute(
+                "SELECT CONVERT(varchar(30), modify_date, 126) "
+                "FROM sys.objects WHERE object_id = OBJECT_ID(?)",
+                [self.table_name],
+            ).fetchone()
+        return row[0] if row else None
+
+    def introspect(self):
+        """Reads the columns and indexes from the catalog views."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT c.name, t.name, c.max_length, c.precision, c.scale,
+                       c.is_nullable, c.is_identity, c.is_computed
+                FROM sys.columns c
+                JOIN sys.types t ON t.user_type_id = c.user_type_id
+                WHERE c.object_id = OBJECT_ID(?)
+                ORDER BY c.column_id
+                """,
+                [self.table_name],
+            )
+            columns = []
+            for name, type_name, max_length, precision, scale, *flags in cursor:
+                if max_length == -1:
+                    max_length = None  # varchar(max) etc.
+                elif type_name in ("nvarchar", "nchar"):
+                    max_length //= 2  # sys.columns counts bytes
+                columns.append({
+                    "name": name,
+                    "type": type_name,
+                    "max_length": max_length,
+                    "precision": precision,
+                    "scale": scale,
+                    "nullable": bool(flags[0]),
+                    "identity": bool(flags[1]),
+                    "computed": bool(flags[2]),
+                })
+
+            cursor.execute(
+                """
+                SELECT i.name, i.is_unique, c.name
+                FROM sys.indexes i
+                JOIN sys.index_columns ic
+                  ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+                JOIN sys.columns c
+                  ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+                WHERE i.object_id = OBJECT_ID(?) AND ic.is_included_column = 0
+                ORDER BY i.index_id, ic.key_ordinal
+                """,
+                [self.table_name],
+            )
+            indexes = {}
+            for index_name, is_unique, column_name in cursor:
+                index = indexes.setdefault(
+                    index_name,
+                    {"name": index_name, "unique": bool(is_unique), "columns": []},
+                )
+                index["columns"].append(column_name)
+
+        if not columns:
+            return None  # No such table (or no permission to see it)
+        return TableSchema(self.table_name, columns, list(indexes.values()))
+
+    def _select_list(self, prefix=""):
+        """
+        Explicit column names once the schema is known, else *.
+        prefix: e.g. "inserted." for an OUTPUT clause
+        """
+        schema = self.load_schema()
+        if schema is None:
+            return prefix + "*"
+        return ", ".join(prefix + col for col in schema.column_names)
+
+    def _headers(self, cursor):
+        schema = self.schema
+        if schema is not None:
+            return schema.column_names
+        # cursor.description is a tuple of tuples.
+        # We just want the first item (name) from each.
+        return [column[0] for column in cursor.description]
+
+    def _input_size(self, col, value=None):
+        """
+        The (sql_type, size, decimal_digits) to declare for a parameter
+        compared with/stored in col, or None if we don't know its type.
+        Declaring them means SQL Server sees the same parameter types every
+        time, so it reuses one query plan instead of compiling one per
+        value length.
+        """
+        info = self.schema.column(col) if self.schema else None
+        if info is None or info["type"] not in ODBC_TYPES:
+            return None
+        sql_type = ODBC_TYPES[info["type"]]
+
+        if info["type"] in TEXT_TYPES:
+            size = info["max_length"] or 0  # 0 = (max)
+            if size and isinstance(value, str) and len(value) > size:
+                # e.g. a LIKE pattern; never truncate it, but keep to a few
+                # sizes so long terms still share plans
+                size = bucket(len(value))
+            return (sql_type, size, 0)
+        if info["type"] in SIZED_TYPES:
+            # Precision and scale, e.g. decimal(10, 2) or datetime2(7)
+            return (sql_type, info["precision"], info["scale"])
+        return (sql_type, 0, 0)
+
+    @staticmethod
+    def _set_input_sizes(cursor, sizes):
+        """Only declares the parameters if every one of them is known."""
+        if sizes and all(size is not None for size in sizes):
+            cursor.setinputsizes(sizes)
+        else:
+            cursor.setinputsizes(None)  # Drop any left from the cursor's last use
+
+    def _statement(self, key, build):
+        """
+        The SQL text for a shape of call, written by build() the first time
+        (see StatementCache). The text also depends on whether the schema
+        is known yet (explicit column lists instead of *).
+        """
+        return self.statements.get((self.schema is not None,) + key, build)
+
+    @staticmethod
+    @contextmanager
+    def _cancellable(cursor, cancel_token):
+        """
+        Lets cancel_token stop the query running on cursor until the block
+        ends. Cursors are kept for reuse, so a later cancel must not reach it.
+        """
+        if cancel_token is None:
+            yield
+            return
+        running = [True]
+        cancel_token.on_cancel(lambda: running[0] and cursor.cancel())
+        try:
+            yield
+        finally:
+            running[0] = False
+
+    # --- Queries ---
+
+    def _search_condition(self, col, search_term):
+        """
+        Builds one search predicate using the column's MatchMode.
+        EXACT and PREFIX are "sargable": SQL Server can seek an index on col
+        instead of reading every row, which '%term%' always forces.
+        Returns: (sql_string, value)
+        """
+        mode = self.search_modes.get(col, MatchMode.CONTAINS)
+        term = str(search_term).strip()
+
+        if mode == MatchMode.EXACT:
+            return f"{col} = ?", term
+
+        if mode == MatchMode.FULLTEXT:
+            # Prefix term in double quotes: CONTAINS(Surname, '"smi*"')
+            return f"CONTAINS({col}, ?)", '"' + term.replace('"', '""') + '*"'
+
+        # LIKE: make the user's own %, _ and [ match literally
+        # SQL Server 'LIKE' is case-insensitive by default.
+        literal = "".join(f"[{ch}]" if ch in "%_[" else ch for ch in term)
+        if mode == MatchMode.PREFIX:
+            return f"{col} LIKE ?", f"{literal}%"
+        return f"{col} LIKE ?", f"%{literal}%"
+
+    @staticmethod
+    def _filled_in(search_params):
+        """The filled-in search boxes, sorted by column name."""
+        return {
+            col: term for col, term in sorted((search_params or {}).items()) if term
+        }
+
+    def _search_shape(self, search_params):
+        """What a search's SQL depends on: its columns and their MatchModes."""
+        return tuple(
+            (col, self.search_modes.get(col, MatchMode.CONTAINS))
+            for col in search_params
+        )
+
+    def get_page(
+        self, search_params=None, after_key=None, page_size=None, cancel_token=None,
+        columns=None,
+    ):
+        """
+        Fetches a single page of records using keyset pagination.
+        search_params: optional {'Surname': 'Smith'} filters (same as search_records).
+        after_key: the sort key of the last row already loaded (None = first page).
+        cancel_token: optional token; cancelling it stops the query on the server.
+        columns: only select these (None = all); wide columns come back as
+            CellState.NOT_LOADED (see _projection and get_values).
+        Returns: (headers, records, next_key)
+            next_key is passed back in to get the following page,
+            it is None when there are no more rows.
+        """
+        page_size = page_size or self.page_size
+        sort_cols = self._sort_columns()
+
+        schema = self.load_schema()
+        projected, wide = self._projection(
+            columns, schema.column_names if schema is not None else None
+        )
+        if projected is None:
+            select_list = "*"
+        else:
+            # A wide column is only checked for a value: 1 byte a row, not the notes
+            select_list = ", ".join(
+                f"CASE WHEN {col} IS NULL THEN 0 ELSE 1 END AS {col}"
+                if col in wide else col
+                for col in projected
+            )
+
+        # 1. Search filters ("AND Col LIKE ?", "AND Col = ?", ...), always in
+        # the same column order, so the same boxes give the same SQL
+        search_params = self._filled_in(search_params)
+        conditions, values = self._search_conditions(search_params)
+        param_columns = list(search_params)
+
+        # 2. Continue after the last row of the previous page
+        if after_key is not None:
+            keyset_sql, keyset_values, keyset_columns = self._keyset_condition(
+                sort_cols, after_key
+            )
+            conditions.append(keyset_sql)
+            values.extend(keyset_values)
+            param_columns.extend(keyset_columns)
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # 3. Ask for one extra row so we know if there is another page
+        query = self._statement(
+            (
+                "page",
+                tuple(projected or ()),
+                wide,
+                self._search_shape(search_params),
+                # Which parts of the last key are NULL change the condition
+                None if after_key is None else tuple(v is None for v in after_key),
+            ),
+            lambda: f"""
+                SELECT TOP (?) {select_list} FROM {self.table_name}
+                {where_clause}
+                ORDER BY {", ".join(sort_cols)}
+            """,
+        )
+
+        with self._get_connection() as conn:
+            cursor = self.pool.cursor(conn, query)
+            # cursor.cancel() is safe to call from another thread
+            with self._cancellable(cursor, cancel_token):
+                self._set_input_sizes(
+                    cursor,
+                    [(pyodbc.SQL_INTEGER, 0, 0)] + [
+                        self._input_size(col, value)
+                        for col, value in zip(param_columns, values)
+                    ],
+                )
+                with tracer.span("execute", "db"):
+                    cursor.execute(query, [page_size + 1] + values)
+                headers = projected or self._headers(cursor)
+
+                # fetchmany keeps us to a single page in memory
+                with tracer.span("fetch", "db") as span:
+                    records = [list(row) for row in cursor.fetchmany(page_size + 1)]
+                    if span:
+                        span.update(rows=len(records), bytes=payload_bytes(records))
+
+        # 4. Work out the key to continue from
+        records, next_key = self._next_key(headers, records, sort_cols, page_size)
+        self._mark_not_loaded(headers, records, wide)
+        return headers, records, next_key
+
+    def get_values(self, key, columns):
+        """
+        Reads some columns of one record by Primary Key, e.g. a wide
+        column when its cell is opened. Returns: {column: value} or None
+        """
+        schema = self.load_schema()
+        columns = list(columns)
+        if schema is not None:
+            unknown = [col for col in columns if schema.column(col) is None]
+            if unknown:
+                raise ValueError(f"No such column: {', '.join(unknown)}")
+        query = self._statement(
+            ("values", tuple(columns)),
+            lambda: f"SELECT {', '.join(columns)} FROM {self.table_name} "
+            f"WHERE {self.primary_key_col} = ?",
+        )
+
+        with self._get_connection() as conn:
+            cursor = self.pool.cursor(conn, query)
+            self._set_input_sizes(cursor, [self._input_size(self.primary_key_col)])
+            with tracer.span("execute", "db"):
+                cursor.execute(query, [key])
+            with tracer.span("fetch", "db") as span:
+                row = cursor.fetchone()
+                if span and row is not None:
+                    span.update(rows=1, bytes=payload_bytes([list(row)]))
+        return dict(zip(columns, row)) if row is not None else None
+
+    def iter_records(self, search_params=None, chunk_size=5000, cancel_token=None):
+        """
+        Streams the table (or a search result) through one cursor,
+        chunk_size rows at a time with fetchmany.
+        Yields: (headers, records) one chunk at a time
+        """
+        select_list = self._select_list()
+        search_params = self._filled_in(search_params)
+        conditions, values = self._search_conditions(search_params)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = self._statement(
+            ("all", self._search_shape(search_params)),
+            lambda: f"""
+                SELECT {select_list} FROM {self.table_name}
+                {where_clause}
+                ORDER BY {", ".join(self._sort_columns())}
+            """,
+        )
+
+        with self._get_connection() as conn:
+            cursor = self.pool.cursor(conn, query)
+            with self._cancellable(cursor, cancel_token):
+                self._set_input_sizes(cursor, None)
+                cursor.execute(query, values)
+                headers = self._headers(cursor)
+
+                while not (cancel_token and cancel_token.cancelled):
+                    records = cursor.fetchmany(chunk_size)
+                    if not records:
+                        break
+                    yield headers, [list(row) for row in records]
+
+    def save_records(self, changes):
+        """
+        Saves many edited records in ONE transaction, checking each row's
+        StatusDate (as loaded) against the stored one - see
+        StorageBackend.save_records for the result.
+
+        Each chunk of rows is ONE round trip: a single T-SQL batch that
+        1. locks the rows and returns those whose StatusDate has moved on
+           (the conflicts, as they are now stored),
+        2. runs one UPDATE per set of changed columns, joined to the new
+           values (VALUES (...), (...)) and guarded by the same check,
+           returning the rows as written (OUTPUT inserted...).
+        Note: OUTPUT without INTO needs a table without triggers.
+        """
+        # 1. Group the rows by which columns changed
+        # {('Surname',): [['Smith', 101], ...], ('Sex',): [['F', 102]]}
+        batches, error = self._group_changes(changes)
+        if error:
+            raise ValueError(error)
+        tokens = self._tokens(changes)
+        changes_by_key = {row[self.primary_key_col]: row for row in changes}
+        sent_keys = {row[-1] for rows in batches.values() for row in rows}
+
+        self.load_schema()
+        headers = []
+        written = []
+        stored = {}  # Current version of each conflicting row
+
+        with self._get_connection() as conn:
+            # 2. Split into chunks that fit SQL Server's 2100 parameter limit
+            for chunk in self._chunk_batches(batches):
+                sql, params, sizes = self._save_batch_sql(chunk, tokens)
+                cursor = self.pool.cursor(conn, sql)
+                self._set_input_sizes(cursor, sizes)
+                with tracer.span("execute", "db", params=len(params)):
+                    cursor.execute(sql, params)
+
+                # First result: the conflicts. Then one result per UPDATE.
+                with tracer.span("fetch", "db") as span:
+                    headers = self._headers(cursor)
+                    for row in cursor.fetchall():
+                        stored[row[headers.index(self.primary_key_col)]] = list(row)
+                    while cursor.nextset():
+                        written.extend(list(row) for row in cursor.fetchall())
+                    span["rows"] = len(written) + len(stored)
+
+            # 3. Commit once: every row that passed the check is saved, or none
+            # (if anything fails, the pool rolls the whole batch back)
+            conn.commit()
+
+        key_idx = headers.index(self.primary_key_col) if headers else 0
+        written_keys = {row[key_idx] for row in written}
+        conflicts = [
+            {"mine": changes_by_key[key], "theirs": stored.get(key)}
+            for key in tokens
+            if key in sent_keys and key not in written_keys
+        ]
+        return {
+            "headers": headers,
+            "written": written,
+            "conflicts": conflicts,
+            "message": self._save_message(written, conflicts),
+        }
+
+    def _chunk_batches(self, batches):
+        """
+        Splits {changed_columns: rows} into chunks of at most MAX_PARAMS
+        parameters. Yields: [(changed_columns, rows), ...]
+        """
+        chunk = []
+        used = 0
+        for valid_keys, rows in batches.items():
+            # The new values, plus key/token/flag in the UPDATE and key/token
+            # in the conflict check
+            per_row = len(valid_keys) + 5
+            for row in rows:
+                if used + per_row > self.MAX_PARAMS and chunk:
+                    yield chunk
+                    chunk = []
+                    used = 0
+                if chunk and chunk[-1][0] == valid_keys:
+                    chunk[-1][1].append(row)
+                else:
+                    chunk.append((valid_keys, [row]))
+                used += per_row
+        if chunk:
+            yield chunk
+
+    def _save_batch_sql(self, chunk, tokens):
+        """
+        Builds the conflict check + UPDATEs for one chunk (see save_records).
+        Row counts are padded up to a power of two with rows that match
+        nothing, so saves of a similar size send the same statement
+        (unless padding would pass the parameter limit).
+        Returns: (sql, params, sizes)
+        """
+        checked = [row[-1] for _, rows in chunk for row in rows if row[-1] in tokens]
+        shape = (
+            bucket(len(checked)) if checked else 0,
+            tuple((valid_keys, bucket(len(rows))) for valid_keys, rows in chunk),
+        )
+        padded_params = 2 * shape[0] + sum(
+            rows * (len(valid_keys) + 3) for valid_keys, rows in shape[1]
+        )
+        if padded_params > self.MAX_PARAMS:
+            shape = (
+                len(checked),
+                tuple((valid_keys, len(rows)) for valid_keys, rows in chunk),
+            )
+        sql = self._statement(("save",) + shape, lambda: self._save_sql(shape))
+
+        pk = self.primary_key_col
+        stamp = self.last_modified_col
+        params = []
+        sizes = []
+
+        # 1. The conflict check: (key, token as loaded) per checked row
+        for key in checked:
+            params.extend([key, tokens[key]])
+        params.extend([None, None] * (shape[0] - len(checked)))
+        sizes.extend([self._input_size(pk), self._input_size(stamp)] * shape[0])
+
+        # 2. The UPDATEs: (key, token, check flag, new values...) per row
+        for (valid_keys, rows), (_, padded) in zip(chunk, shape[1]):
+            for row in rows:
+                key = row[-1]
+                params.extend([key, tokens.get(key), 1 if key in tokens else 0])
+                params.extend(row[:-1])
+            padding = [None, None, 0] + [None] * len(valid_keys)
+            params.extend(padding * (padded - len(rows)))
+            row_sizes = [
+                self._input_size(pk),
+                self._input_size(stamp),
+                (pyodbc.SQL_INTEGER, 0, 0),
+            ] + [self._input_size(col) for col in valid_keys]
+            sizes.extend(row_sizes * padded)
+
+        return sql, params, sizes
+
+    def _save_sql(self, shape):
+        """
+        The T-SQL for one save chunk of the given shape:
+        (rows checked, ((changed_columns, rows), ...)).
+        """
+        checked, updates = shape
+        pk = self.primary_key_col
+        stamp = self.last_modified_col
+        table = self.table_name
+        select_list = self._select_list("t.")
+        output_list = self._select_list("inserted.")
+        # StatusDate as loaded, or NULL; chk = 0 skips the check
+        same_version = (
+            f"(v.chk = 0 OR t.{stamp} = v.tok "
+            f"OR (t.{stamp} IS NULL AND v.tok IS NULL))"
+        )
+
+        sql = ["SET NOCOUNT ON;"]
+
+        # 1. The rows somebody else has saved since we loaded them
+        if checked:
+            sql.append(
+                f"SELECT {select_list} FROM {table} t WITH (UPDLOCK, HOLDLOCK) "
+                f"JOIN (VALUES {', '.join('(?, ?, 1)' for _ in range(checked))}) "
+                f"AS v(k, tok, chk) ON t.{pk} = v.k "
+                f"WHERE NOT {same_version};"
+            )
+        else:
+            # Keep the results in the same shape: an (empty) conflicts result
+            sql.append(f"SELECT {select_list} FROM {table} t WHERE 1 = 0;")
+
+        # 2. One UPDATE per set of changed columns, all rows at once
+        for valid_keys, rows in updates:
+            names = [f"c{i}" for i in range(len(valid_keys))]
+            set_clause = ", ".join(
+                f"{col} = v.{name}" for col, name in zip(valid_keys, names)
+            )
+            placeholders = "(" + ", ".join("?" for _ in range(len(names) + 3)) + ")"
+            sql.append(
+                f"UPDATE t SET {set_clause}, {stamp} = GETDATE() "
+                f"OUTPUT {output_list} "
+                f"FROM {table} t JOIN (VALUES "
+                f"{', '.join(placeholders for _ in range(rows))}) "
+                f"AS v(k, tok, chk, {', '.join(names)}) ON t.{pk} = v.k "
+                f"WHERE {same_version};"
+            )
+
+        return "\n".join(sql)
+
+    def _insert_query(self, columns, output=False):
+        # Result: "INSERT INTO tblCohortMember (Surname, FirstName) VALUES (?, ?)"
+        col_str = ", ".join(columns)
+
+        # Create a string of question marks: "?, ?, ?" matching the number of columns
+        placeholders = ", ".join(["?" for _ in columns])
+
+        # Stamp new rows like updates, so they show up in "changed since" syncs
+        if self.last_modified_col not in columns:
+            col_str += f", {self.last_modified_col}"
+            placeholders += ", GETDATE()"
+
+        # output: also return the new row (with its RecID) in the same round trip
+        output_str = f" OUTPUT {self._select_list('inserted.')}" if output else ""
+
+        return (
+            f"INSERT INTO {self.table_name} ({col_str}){output_str} "
+            f"VALUES ({placeholders})"
+        )
+
+    def insert_record(self, data_dict):
+        """
+        Adds a new record to the database.
+        data_dict: dictionary of column names and their values.
+        Returns: {'headers': [...], 'row': the row as stored (new RecID,
+                  StatusDate...), 'message': 'Successfully added record.'}
+        """
+        # 1. We only insert columns that actually have data
+        columns = list(data_dict)
+        if not columns:
+            raise ValueError("No data provided.")
+
+        # 2. Build the query (OUTPUT inserted... reads the new row back)
+        self.load_schema()
+        query = self._statement(
+            ("insert", tuple(columns), True),
+            lambda: self._insert_query(columns, output=True),
+        )
+
+        # 3. Prepare values in the correct order
+        values = [data_dict[col] for col in columns]
+
+        with self._get_connection() as conn:
+            cursor = self.pool.cursor(conn, query)
+            self._set_input_sizes(
+                cursor, [self._input_size(col, data_dict[col]) for col in columns]
+            )
+            with tracer.span("execute", "db"):
+                cursor.execute(query, values)
+                headers = self._headers(cursor)
+                row = list(cursor.fetchone())
+            conn.commit()
+
+        return {"headers": headers, "row": row, "message": "Successfully added record."}
+
+    def bulk_insert(self, columns, rows):
+        """
+        SQL Server fast path: fast_executemany sends each batch of parameter
+        rows as one array, all inside a single transaction.
+        Returns: number of rows inserted
+        """
+        self.load_schema()
+        query = self._statement(
+            ("insert", tuple(columns), False), lambda: self._insert_query(columns)
+        )
+        count = 0
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.fast_executemany = True
+            # Declared types also stop fast_executemany guessing them from
+            # the first row (e.g. a None that later turns out to be a date)
+            self._set_input_sizes(cursor, [self._input_size(col) for col in columns])
+
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.BULK_BATCH_SIZE:
+                    with tracer.span("executemany", "db", rows=len(batch)):
+                        cursor.executemany(query, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                with tracer.span("executemany", "db", rows=len(batch)):
+                    cursor.executemany(query, batch)
+                count += len(batch)
+
+            conn.commit()
+        return count
+
+    def iter_changed_records(self, since=None, chunk_size=5000):
+        """
+        Streams the whole table, or only rows changed since the given
+        last_modified_col value, without loading it all into memory.
+        Yields: (headers, records) one chunk at a time
+        """
+        select_list = self._select_list()
+        query = self._statement(
+            ("changed", since is not None),
+            lambda: f"SELECT {select_list} FROM {self.table_name}" + (
+                f" WHERE {self.last_modified_col} >= ?" if since is not None else ""
+            ),
+        )
+        values = [] if since is None else [since]
+
+        with self._get_connection() as conn:
+            cursor = self.pool.cursor(conn, query)
+            self._set_input_sizes(cursor, None)
+            cursor.execute(query, values)
+            headers = self._headers(cursor)
+
+            while True:
+                records = cursor.fetchmany(chunk_size)
+                if not records:
+                    break
+                yield headers, [list(row) for row in records]
@@ -0,0 +1,129 @@
+import csv
+import os
+import time
+from src.ui.common.ui_helpers import display_text
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.has_headers = False
+
+    def write(self, headers, records):
+        if not self.has_headers:
+            self.writer.writerow(headers)
+            self.has_headers = True
+        # Same text the grid shows (dates as YYYY-MM-DD, no None)
+        self.writer.writerows([display_text(v) for v in row] for row in records)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """
+    Writes each chunk as a Parquet row group. Column types are taken from
+    the first chunk (columns that are empty there are stored as text).
+    """
+
+    def __init__(self, path):
+        # Only needed for Parquet exports, so only imported then
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, headers, records):
+        columns = list(zip(*records))
+        if self.schema is None:
+            fields = []
+            for name, values in zip(headers, columns):
+                column_type = self.pa.array(values).type
+                if self.pa.types.is_null(column_type):
+                    column_type = self.pa.string()
+                fields.append(self.pa.field(name, column_type))
+            self.schema = self.pa.schema(fields)
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+
+        arrays = [
+            self.pa.array(self._fit(values, field.type), type=field.type)
+            for values, field in zip(columns, self.schema)
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def _fit(self, values, column_type):
+        # A text column can still receive numbers/dates in later chunks
+        if self.pa.types.is_string(column_type):
+            return [None if v is None else display_text(v) for v in values]
+        return values
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class BulkExporter:
+    """
+    Streams the whole table, or a search result, to a .csv or .parquet file.
+
+    Rows are read CHUNK_SIZE at a time (fetchmany on one cursor, see
+    DataManager.iter_records) and each chunk is written out before the next
+    is read, so memory use stays the same however big the table is.
+    """
+
+    CHUNK_SIZE = 5000
+
+    WRITERS = {".csv": _CsvWriter, ".parquet": _ParquetWriter}
+
+    def __init__(self, data_manager, chunk_size=None):
+        self.data_manager = data_manager
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+    def run(self, path, search_params=None, progress=None, cancel_token=None):
+        """
+        Exports to path (the extension picks the format).
+        search_params: optional {'Surname': 'Smith'} filter, like search_records
+        progress: optional function, called after every chunk with the counts
+        cancel_token: optional token; stops the export (the file is removed)
+        Returns: {'rows': 120000, 'seconds': 2.4, 'rows_per_sec': 50000,
+                  'path': ..., 'cancelled': False}
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in self.WRITERS:
+            raise ValueError(
+                f"Can't export to '{extension}' files (use .csv or .parquet)."
+            )
+
+        writer = self.WRITERS[extension](path)
+        started = time.perf_counter()
+        summary = {"rows": 0, "seconds": 0.0, "rows_per_sec": 0, "path": path}
+        try:
+            for headers, records in self.data_manager.iter_records(
+                search_params=search_params,
+                chunk_size=self.chunk_size,
+                cancel_token=cancel_token,
+            ):
+                writer.write(headers, records)
+
+                summary["rows"] += len(records)
+                summary["seconds"] = time.perf_counter() - started
+                summary["rows_per_sec"] = int(summary["rows"] / summary["seconds"])
+                if progress is not None:
+                    progress(dict(summary))
+        except Exception:
+            # Cancelling stops the query mid-fetch, which shows up as an error
+            if not (cancel_token and cancel_token.cancelled):
+                raise
+        finally:
+            writer.close()
+            cancelled = bool(cancel_token and cancel_token.cancelled)
+            if cancelled and os.path.exists(path):
+                os.remove(path)  # Don't leave a half-finished export behind
+
+        summary["cancelled"] = cancelled
+        return summary
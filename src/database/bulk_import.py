@@ -0,0 +1,175 @@
+import csv
+import os
+from itertools import islice
+
+
+def read_rows(path):
+    """
+    Streams a .csv, .xlsx or .xlsm file one row at a time.
+    Yields: the header row first, then each data row (as lists)
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in (".xlsx", ".xlsm"):
+        # read_only mode streams the sheet instead of loading it all
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+    elif extension in (".csv", ".txt"):
+        # utf-8-sig: skips the marker Excel puts at the start of saved CSVs
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.reader(f)
+
+    else:
+        raise ValueError(f"Can't import '{extension}' files (use .csv or .xlsx).")
+
+
+class BulkImporter:
+    """
+    Streams a CSV/Excel file into the table, CHUNK_SIZE rows at a time, so
+    memory use stays the same however big the file is.
+
+    Each row is checked and converted by DataManager.validate_rows (the
+    same checks as saves and new records, see validation.py): dates,
+    Sex, required columns, lengths...
+    Valid rows go in with DataManager.bulk_insert - one transaction per
+    chunk, using the backend's fast path (fast_executemany on SQL Server).
+    Rejected rows are written to an error file: the original columns plus
+    an "Error" column, so it can be fixed and imported again.
+    """
+
+    CHUNK_SIZE = 5000
+
+    def __init__(self, data_manager, chunk_size=None):
+        self.data_manager = data_manager
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+    @staticmethod
+    def default_error_path(path):
+        """cohort.xlsx -> cohort_errors.csv (next to the file)"""
+        return os.path.splitext(path)[0] + "_errors.csv"
+
+    def run(self, path, error_path=None, progress=None, cancel_token=None):
+        """
+        Imports the file at path.
+        progress: optional function, called after every chunk with the counts
+        cancel_token: optional token; stops between chunks (chunks already
+                      imported stay imported)
+        Returns: {'read': 10000, 'imported': 9990, 'rejected': 10,
+                  'error_file': '..._errors.csv' or None, 'ignored_columns': [...],
+                  'cancelled': False}
+        """
+        error_path = error_path or self.default_error_path(path)
+        self.data_manager.load_schema()  # For the column types and lengths
+        rows = read_rows(path)
+
+        file_headers = [str(h).strip() if h is not None else "" for h in next(rows, [])]
+        columns = self._match_columns(file_headers)
+        if not columns:
+            raise ValueError(
+                "None of the file's columns can be imported. "
+                f"Expected some of: {', '.join(self.data_manager.insert_columns())}"
+            )
+
+        matched = {file_col for _, file_col in columns}
+        summary = {
+            "read": 0,
+            "imported": 0,
+            "rejected": 0,
+            "error_file": None,
+            "ignored_columns": [h for h in file_headers if h and h not in matched],
+            "cancelled": False,
+        }
+
+        error_file = None
+        error_writer = None
+        try:
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                if cancel_token is not None and cancel_token.cancelled:
+                    summary["cancelled"] = True
+                    break
+
+                valid, rejected = self._convert_chunk(file_headers, columns, chunk)
+                summary["read"] += len(chunk)
+
+                if valid:
+                    try:
+                        summary["imported"] += self.data_manager.bulk_insert(
+                            [col for col, _ in columns], [values for values, _ in valid]
+                        )
+                    except Exception as e:
+                        # The whole chunk was rolled back: send it to the error file
+                        reason = f"Database error: {e}"
+                        rejected.extend((raw, reason) for _, raw in valid)
+
+                if rejected:
+                    if error_writer is None:
+                        error_file = open(error_path, "w", newline="", encoding="utf-8")
+                        error_writer = csv.writer(error_file)
+                        error_writer.writerow(file_headers + ["Error"])
+                        summary["error_file"] = error_path
+                    for raw, reason in rejected:
+                        error_writer.writerow(list(raw) + [reason])
+                    summary["rejected"] += len(rejected)
+
+                if progress is not None:
+                    progress(dict(summary))
+        finally:
+            if error_file is not None:
+                error_file.close()
+
+        return summary
+
+    def _match_columns(self, file_headers):
+        """
+        Pairs the file's headers with the table's columns (ignoring case).
+        Only the insert columns (INSERT_FIELDS) are imported, like the Add
+        New Record dialog.
+        Returns: [(table_column, file_header), ...]
+        """
+        wanted = {col.casefold(): col for col in self.data_manager.insert_columns()}
+        return [
+            (wanted[header.casefold()], header)
+            for header in file_headers
+            if header.casefold() in wanted
+        ]
+
+    def _convert_chunk(self, file_headers, columns, chunk):
+        """
+        Returns: (valid, rejected)
+            valid: [(values in columns order, raw_row), ...]
+            rejected: [(raw_row, reason), ...]
+        """
+        positions = [file_headers.index(file_col) for _, file_col in columns]
+        raws = [
+            raw for raw in chunk
+            if any(cell not in (None, "") for cell in raw)  # Skip blank lines
+        ]
+        cells = [
+            [raw[idx] if idx < len(raw) else None for idx in positions] for raw in raws
+        ]
+        values, errors = self.data_manager.validate_rows(
+            [col for col, _ in columns], cells, labels=range(len(raws)), complete=True
+        )
+
+        reasons = {}  # {row position: ["Surname: is required", ...]}
+        for position, col, reason in errors:
+            reasons.setdefault(position, []).append(f"{col}: {reason}")
+        valid = [
+            (row, raw)
+            for position, (row, raw) in enumerate(zip(values, raws))
+            if position not in reasons
+        ]
+        rejected = [
+            (raws[position], "; ".join(lines)) for position, lines in reasons.items()
+        ]
+        return valid, rejected
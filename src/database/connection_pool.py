@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pyodbc import connect
+from src.diagnostics.tracer import tracer
+
+
+class ConnectionPool:
+    """
+    Keeps a small number of open pyodbc connections and hands them out again,
+    so each query doesn't pay for a fresh connect/login handshake.
+
+    - max_size: most connections open at once (busy + idle). Callers wait for
+      a free one when the limit is reached.
+    - idle_timeout: idle connections older than this (seconds) are closed.
+    - ping_after: connections idle longer than this (seconds) are checked with
+      a cheap "SELECT 1" before reuse; dead ones are replaced transparently.
+    - max_prepared: statements each connection keeps prepared (see cursor()).
+    """
+
+    def __init__(
+        self, conn_string, max_size=4, idle_timeout=300, ping_after=30,
+        wait_timeout=30, max_prepared=32,
+    ):
+        self.conn_string = conn_string
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.wait_timeout = wait_timeout
+        self.max_prepared = max_prepared
+
+        self._idle = []  # [(connection, time it was returned), ...]
+        self._open_count = 0
+        self._condition = threading.Condition()
+
+        # Each connection's cursors, one per recently run statement:
+        # {id(connection): OrderedDict(sql -> cursor)}
+        self._cursors = {}
+
+        # Metrics - "reused" is the number of connects avoided
+        self.stats = {
+            "connects": 0,
+            "reused": 0,
+            "reconnects": 0,
+            "expired": 0,
+            "discarded": 0,
+            "prepared": 0,
+            "prepared_reused": 0,
+        }
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the length of a 'with' block:
+            with pool.connection() as conn:
+                ...
+        Any open transaction is rolled back when it is given back,
+        and connections that broke during the block are thrown away.
+        The connection also goes back when the block is left early, e.g. a
+        generator using it is closed before it finishes (GeneratorExit).
+        """
+        with tracer.span("connect", "db") as span:
+            conn = self._acquire()
+            span["open"] = self._open_count
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = self.is_disconnect(e)
+            raise
+        finally:
+            self._release(conn, broken=broken)
+
+    def cursor(self, conn, sql):
+        """
+        A cursor on a borrowed connection for running sql: the same one as
+        the last time this connection ran that text, if it still has it.
+        pyodbc prepares a statement once per cursor and skips that step
+        when the cursor runs the same SQL again, so the server just
+        executes the handle it already has.
+        Use it for one statement at a time (e.g. not two open result sets).
+        """
+        with self._condition:
+            cursors = self._cursors.setdefault(id(conn), OrderedDict())
+            cursor = cursors.pop(sql, None)
+            self.stats["prepared" if cursor is None else "prepared_reused"] += 1
+            if cursor is None:
+                cursor = conn.cursor()
+            cursors[sql] = cursor
+            while len(cursors) > self.max_prepared:
+                _, old = cursors.popitem(last=False)
+                self._close_quietly(old)
+        return cursor
+
+    def close_all(self):
+        """Closes every idle connection (e.g. when the app exits)."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+            self._condition.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.wait_timeout
+
+        with self._condition:
+            while True:
+                # 1. Prefer the most recently used idle connection
+                while self._idle:
+                    conn, returned_at = self._idle.pop()
+                    idle_for = time.monotonic() - returned_at
+                    if idle_for <= self.idle_timeout:
+                        break
+                    # Too old - the server (or VPN) has probably dropped it
+                    self._open_count -= 1
+                    self.stats["expired"] += 1
+                    self._close_quietly(conn)
+                else:
+                    conn = None
+
+                if conn is not None:
+                    break
+
+                # 2. No idle connection: open a new one if we're under the limit
+                if self._open_count < self.max_size:
+                    self._open_count += 1
+                    break
+
+                # 3. Otherwise wait for someone to give one back
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise TimeoutError(
+                        "No database connection became free within "
+                        f"{self.wait_timeout}s."
+                    )
+
+        # The slow parts (ping / connect) happen outside the lock
+        if conn is not None:
+            if idle_for <= self.ping_after or self._is_alive(conn):
+                self._count("reused")
+                return conn
+            # Dead connection: replace it using the same slot
+            self._count("reconnects")
+            self._close_quietly(conn)
+
+        try:
+            conn = connect(self.conn_string)
+        except Exception:
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise
+
+        self._count("connects")
+        return conn
+
+    def _release(self, conn, broken=False):
+        if not broken:
+            try:
+                # Leave no half-finished transaction for the next user
+                conn.rollback()
+            except Exception:
+                broken = True
+
+        with self._condition:
+            if broken:
+                self._open_count -= 1
+                self.stats["discarded"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+        if broken:
+            self._close_quietly(conn)
+
+    def _count(self, stat):
+        with self._condition:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def is_disconnect(error):
+        """pyodbc puts the SQLSTATE first; class '08' means the connection failed."""
+        args = getattr(error, "args", ())
+        return bool(args) and str(args[0]).startswith("08")
+
+    def _close_quietly(self, conn):
+        """Closes a connection (with its kept cursors) or a cursor, ignoring errors."""
+        with self._condition:
+            cursors = self._cursors.pop(id(conn), {})
+        for obj in list(cursors.values()) + [conn]:
+            try:
+                obj.close()
+            except Exception:
+                pass
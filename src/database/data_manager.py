@@ -1,12 +1,45 @@
-from pyodbc import connect
+import os
 from os import getenv
-from dotenv import load_dotenv
+from src.database.duplicate_index import DuplicateIndex
+from src.database.search_cache import SearchCache
+from src.database.table_schema import SchemaCache
+from src.database.validation import ValidationError, Validator
+from src.diagnostics.tracer import traced, tracer
+from src.ui.common.enums import FieldType
+from src.ui.common.schema import (
+    COLUMN_MAP,
+    DUPLICATE_FIELDS,
+    FIELD_RULES,
+    GRID_COLUMNS,
+    INSERT_FIELDS,
+    SEARCH_FIELDS,
+)
 
 
 class DataManager:
-    def __init__(self):
+    """
+    The app's single entry point to the data. The actual storage is a
+    backend (SQL Server, SQLite or CSV, see backends/) chosen in .env,
+    so the Presenter and View never need to know which one is active.
+
+    One DataManager serves one table. In multi-table mode (TABLES_CONFIG,
+    see table_config.py) there is one per table, made by for_tables().
+    """
+
+    def __init__(self, table=None, share_with=None):
+        """
+        table: a TableConfig whose settings replace the CONFIGURATION
+               SECTION below and schema.py (multi-table mode)
+        share_with: another table's DataManager, whose connection pool and
+                    schema cache this one uses too
+        """
+        # Imported here, not at the top, so the window can open before it loads
+        from dotenv import load_dotenv
+
         load_dotenv()
-        self.conn_string = getenv("SQL_CONNECTION_STRING")
+
+        # Timings for the diagnostics dialog (off unless TRACE_ENABLED=1)
+        tracer.configure_from_env()
 
         # --- CONFIGURATION SECTION ---
         self.table_name = "tblCohortMember" # Was "tblTestAnimals" for temp testing
@@ -21,37 +54,311 @@ class DataManager:
         # can add other fields to ignore here if needed
         self.ignored_columns = ["AnimalID", "StatusDate", "Status"]
 
-    def _get_connection(self):
-        """Helper method to get a fresh connection every time"""
-        return connect(self.conn_string)
+        # Column stamped with GETDATE() on every update/insert.
+        # The offline replica uses it to fetch only rows changed since its last sync.
+        self.last_modified_col = "StatusDate"
+
+        # How many rows to fetch per page as the user scrolls down the grid
+        self.page_size = 500
+
+        # The column settings in schema.py
+        self.title = self.table_name
+        self.column_map = COLUMN_MAP
+        self.insert_fields = INSERT_FIELDS
+        self.search_fields = SEARCH_FIELDS
+        self.field_rules = FIELD_RULES
+        self.duplicate_fields = DUPLICATE_FIELDS
+        self.grid_columns = GRID_COLUMNS
+
+        # Multi-table mode: this table's own settings replace all of the above
+        if table is not None:
+            for name, value in table.settings().items():
+                setattr(self, name, value)
+        self._share_with = share_with
+
+        # How each searchable column matches (see SEARCH_FIELDS in schema.py).
+        # Columns not listed fall back to MatchMode.CONTAINS.
+        self.search_modes = dict(self.search_fields)
+
+        # Recent search results, so repeated/narrowing searches skip the server
+        self.search_cache = SearchCache(self.search_modes)
+        self._search_columns = None  # The columns its pages were fetched with
+
+        # Likely duplicates of a new record, looked up in memory
+        # (see DUPLICATE_FIELDS in schema.py). A candidate is shown when
+        # its score (0..1) is at least duplicate_threshold.
+        self.duplicate_threshold = 0.85
+        self.duplicate_index = DuplicateIndex(
+            self.primary_key_col, self.duplicate_fields, self.duplicate_threshold
+        )
+
+        # Checks every value before it is written (see validation.py),
+        # rebuilt once the database schema has been read
+        self._validator = None
+
+        # Column types/lengths read from the database, kept between runs
+        # (one file for every table)
+        if share_with is not None:
+            self.schema_cache = share_with.schema_cache
+        else:
+            self.schema_cache = SchemaCache(
+                getenv("SCHEMA_CACHE_PATH", "MVP_schema_cache.json")
+            )
+
+        # Where the table lives (see backends/ and the README, section E)
+        self.pool = None  # The SQL Server connection pool, if any
+        self.backend = self._create_backend(getenv("DATA_BACKEND", "sqlserver"))
+        if hasattr(self.backend, "on_pulled"):
+            # Rows a sync brings down are checked for duplicates too
+            self.backend.on_pulled = self.duplicate_index.add_rows
+
+        # OPTIONAL: save writes to a local journal first and upload them in
+        # the background (see write_journal.py). A LocalReplica already
+        # queues its writes, so it doesn't need one.
+        self.flusher = None
+        journal_path = getenv("WRITE_JOURNAL_PATH")
+        if journal_path and not hasattr(self.backend, "journal"):
+            from src.database.write_journal import JournalFlusher, WriteJournal
+            self.flusher = JournalFlusher(
+                WriteJournal.open(self._table_path(journal_path)),
+                self.backend,
+                self.primary_key_col,
+                self.last_modified_col,
+            ).start()
+
+    @staticmethod
+    def table_configs():
+        """
+        The tables listed in the TABLES_CONFIG file (.env), or [] if it
+        isn't set (the single table configured below and in schema.py).
+        """
+        from dotenv import load_dotenv
 
-    def get_all_records(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        load_dotenv()
+        path = getenv("TABLES_CONFIG")
+        if not path:
+            return []
+        from src.database.table_config import load_table_configs
+        return load_table_configs(path)
+
+    @classmethod
+    def for_tables(cls, tables):
+        """
+        One DataManager per TableConfig, sharing the first one's connection
+        pool and schema cache. Each keeps its own caches of rows and SQL.
+        """
+        managers = []
+        for table in tables:
+            managers.append(cls(table, share_with=managers[0] if managers else None))
+        return managers
 
-        # LOGIC: Use the custom sort if it exists, otherwise use Primary Key
-        sort_col = self.db_sort_order if self.db_sort_order else self.primary_key_col
+    def _table_path(self, path):
+        """
+        The file for this table: the first table uses path as it is, the
+        others get their own next to it (copy.db -> copy_tblFamily.db).
+        """
+        if self._share_with is None:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}_{self.table_name}{ext}"
 
-        # TODO: ability to select 1000 more
-        query = f"""
-            SELECT TOP 1000 * FROM {self.table_name}
-            ORDER BY {sort_col}
+    def _create_backend(self, name):
+        """
+        Picks the storage engine from DATA_BACKEND in .env.
+        Imports happen here so e.g. the CSV backend doesn't need pyodbc.
+        """
+        name = name.strip().lower()
+
+        if name == "sqlite":
+            from src.database.backends.sqlite_backend import SqliteBackend
+            # One SQLite file holds every table
+            return SqliteBackend(self, getenv("SQLITE_PATH", "MVP_data_entry.db"))
+
+        if name == "csv":
+            from src.database.backends.csv_backend import CsvBackend
+            return CsvBackend(
+                self, self._table_path(getenv("CSV_PATH", "MVP_data_entry.csv"))
+            )
+
+        if name == "sqlserver":
+            from src.database.backends.sqlserver_backend import SqlServerBackend
+            backend = SqlServerBackend(
+                self,
+                getenv("SQL_CONNECTION_STRING"),
+                pool_size=int(getenv("SQL_POOL_SIZE", "4")),
+                idle_timeout=float(getenv("SQL_POOL_IDLE_TIMEOUT", "300")),
+                ping_after=float(getenv("SQL_POOL_PING_AFTER", "30")),
+                pool=self._share_with.pool if self._share_with else None,
+            )
+            self.pool = backend.pool
+
+            # OPTIONAL: keep a local copy of the table (see local_replica.py)
+            replica_path = getenv("LOCAL_REPLICA_PATH")
+            if replica_path:
+                from src.database.local_replica import LocalReplica
+                return LocalReplica(self, self._table_path(replica_path), backend)
+            return backend
+
+        raise ValueError(
+            f"Unknown DATA_BACKEND '{name}' (use sqlserver, sqlite or csv)."
+        )
+
+    @traced()
+    def load_schema(self):
         """
+        The table's TableSchema (columns, types, indexes), or None if the
+        backend can't describe it. May query the database the first time.
+        """
+        return self.backend.load_schema()
 
-        cursor.execute(query)
+    def field_types(self):
+        """
+        {column: FieldType} for the table's columns: COLUMN_MAP (column_map)
+        where it says so, otherwise worked out from the database schema
+        (identity and computed columns are READONLY, date columns get a
+        date picker). Never queries the database - call load_schema()
+        first for the schema-based types.
+        """
+        schema = self.backend.schema
+        if schema is None:
+            return dict(self.column_map)
+
+        types = {}
+        for col in schema.column_names:
+            if col in self.column_map:
+                types[col] = self.column_map[col]
+            elif col in self.ignored_columns:
+                types[col] = FieldType.READONLY  # Never saved, so don't edit it
+            else:
+                types[col] = schema.field_type(col)
+        return types
 
-        # 1. Get the Column Names (Headers)
-        # cursor.description is a tuple of tuples.
-        # We just want the first item (name) from each.
-        headers = [column[0] for column in cursor.description]
+    def validator(self):
+        """
+        The Validator for the table's current column types and lengths
+        (FIELD_RULES in schema.py add the rest). Never queries the database.
+        """
+        schema = self.backend.schema
+        if self._validator is None or self._validator.schema is not schema:
+            field_types = self.field_types()
+            # The key and the concurrency token are passed through untouched
+            field_types[self.primary_key_col] = FieldType.READONLY
+            field_types[self.last_modified_col] = FieldType.READONLY
+            self._validator = Validator(
+                field_types, rules=self.field_rules, schema=schema
+            )
+        return self._validator
+
+    def insert_columns(self):
+        """
+        The columns a new record is entered in (the Add New Record dialog
+        and imports): INSERT_FIELDS (insert_fields), or if that isn't set
+        every column that can be edited.
+        """
+        if self.insert_fields is not None:
+            return list(self.insert_fields)
+        return [
+            col for col, field_type in self.field_types().items()
+            if field_type != FieldType.READONLY
+            and col not in (self.primary_key_col, self.last_modified_col)
+        ]
+
+    def validate_rows(self, columns, rows, labels=None, complete=False):
+        """
+        Checks and converts rows of values (lists in columns order), e.g. a
+        chunk of a bulk import, reporting every invalid cell.
+        complete: the rows are new records (required columns must be there)
+        Returns: (converted rows, [(row label, column, reason), ...])
+        """
+        return self.validator().validate_rows(columns, rows, labels, complete)
+
+    def validate_record(self, data_dict):
+        """
+        Checks a new record before it is added (e.g. while its dialog is open).
+        Returns: [(row label, column, reason), ...] - empty if it can be added
+        """
+        _, errors = self.validator().validate_records(
+            [data_dict], complete=True, labels=["New record"]
+        )
+        return errors
 
-        # 2. Get the Data
-        records = cursor.fetchall()
-        # Clean up
-        conn.close()
+    def _validated(self, records, complete=False):
+        """
+        Converted copies of records ({column: value} dicts), checked as one
+        batch. Raises ValidationError listing every invalid cell.
+        """
+        key_col = self.primary_key_col
+        labels = [
+            f"{key_col} {record[key_col]}" if key_col in record else "New record"
+            for record in records
+        ]
+        records, errors = self.validator().validate_records(records, complete, labels)
+        if errors:
+            raise ValidationError(errors)
+        return records
+
+    def pool_stats(self):
+        """Connection pool metrics, e.g. {'connects': 2, 'reused': 118, ...}"""
+        return self.backend.pool_stats()
+
+    def statement_stats(self):
+        """SQL statement cache metrics, e.g. {'hits': 95, 'misses': 5, ...}"""
+        return self.backend.statement_stats()
+
+    def close(self):
+        """Closes the backend's connections/files (call when the app exits)."""
+        if self.flusher is not None:
+            # Anything not uploaded yet stays in the journal for next time
+            self.flusher.stop()
+            self.flusher.journal.close()
+        self.backend.close()
+
+    @traced()
+    def get_page(
+        self, search_params=None, after_key=None, page_size=None, cancel_token=None,
+        columns=None,
+    ):
+        """
+        Fetches a single page of records using keyset pagination.
+        search_params: optional {'Surname': 'Smith'} filters (same as search_records).
+        after_key: the sort key of the last row already loaded (None = first page).
+        cancel_token: optional token; cancelling it stops the query on the server.
+        columns: the columns on show (None = all). The Primary Key,
+            last_modified_col and sort columns always come too. Wide
+            columns (notes, binary) come back as CellState.NOT_LOADED
+            where they hold something: see get_values.
+        Returns: (headers, records, next_key)
+            next_key is passed back in to get the following page,
+            it is None when there are no more rows.
+        """
+        headers, records, next_key = self.backend.get_page(
+            search_params=search_params,
+            after_key=after_key,
+            page_size=page_size,
+            cancel_token=cancel_token,
+            columns=columns,
+        )
+        self.duplicate_index.add_rows(headers, records)
+        return headers, records, next_key
+
+    @traced()
+    def get_all_records(self, after_key=None, cancel_token=None, columns=None):
+        """
+        Returns the first page of the table (or the page after after_key).
+        Returns: (headers, records, next_key)
+        """
+        return self.get_page(
+            after_key=after_key, cancel_token=cancel_token, columns=columns
+        )
 
-        # Convert to list of lists for the UI
-        return headers, [list(row) for row in records]
+    @traced()
+    def get_values(self, key, columns):
+        """
+        Reads some columns of one record, e.g. a wide column that get_page
+        left as CellState.NOT_LOADED, once its cell is opened.
+        Returns: {column: value}, or None if the record no longer exists
+        """
+        return self.backend.get_values(key, columns)
 
     def update_record(
         self, row_dict
@@ -60,141 +367,265 @@ class DataManager:
         Updates a single record in the database based on RecID.
         Returns: (Success_Boolean, Message_String)
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
+        return self.update_records([row_dict])
 
+    @traced()
+    def update_records(self, changes):
+        """
+        Saves many edited records in ONE transaction.
+        changes: list of dictionaries, each holding the Primary Key
+                 plus only the columns that changed, e.g.
+                 [{'RecID': 101, 'Surname': 'Smith'}, {'RecID': 102, 'Sex': 'F'}]
+        Returns: (Success_Boolean, Message_String)
+        """
         try:
-            # 2. Extract PrimaryKey <-- Primary Key update if changes
-            primary_key = row_dict.get(self.primary_key_col)
-            if not primary_key:
-                return False, f"Critical Error: Row is missing {self.primary_key_col}."
-
-            # 4. Filter the dictionary to get only the columns we want to update
-            valid_keys = [k for k in row_dict.keys() if k not in self.ignored_columns and k != self.primary_key_col]
-
-            if not valid_keys:
-                return False, "No changes detected or valid columns to update."
-            
-            # 5. Build the SQL Query Dynamically
-            # Step A: Create the "Field=?" strings
-            set_parts = [f"{key}=?" for key in valid_keys]
-
-            # Step B: Join them with commas( "Surname=?, FirstName=?")
-            set_clause = ", ".join(set_parts)
-
-            # Step C: Form the full query
-            # Always update StatusDate=GETDATE()
-            query = f"UPDATE {self.table_name} SET {set_clause}, StatusDate=GETDATE() WHERE {self.primary_key_col}=?"
-
-            # 6. Prepare the values list, in same order as valid_keys
-            values = [row_dict[key] for key in valid_keys]
-            
-            # Add RecID at the end for the "WHERE RecID=?" part
-            values.append(primary_key)
-
-            # 7. Execute
-            cursor.execute(query, values)
-            conn.commit()
-
-            return True, "Success"
-
-        except Exception as e:
+            changes = self._validated(changes)
+        except ValidationError as e:
             return False, str(e)
+        result = self.backend.update_records(changes)
+        if result[0]:
+            self.search_cache.clear()  # Cached results may now be out of date
+        return result
 
-        finally:
-            # 8. Clean up
-            conn.close()
-
-    def search_records(self, search_params):
+    @traced()
+    def save_records(self, changes):
+        """
+        Saves edited records with optimistic concurrency: include each row's
+        last_modified_col (StatusDate) as it was loaded, and the row is only
+        written if nobody else has saved it since.
+        changes: [{'RecID': 101, 'StatusDate': <as loaded>, 'Surname': 'Smith'}, ...]
+        Returns: {'headers': [...], 'written': [rows as now stored],
+                  'conflicts': [{'mine': change_dict, 'theirs': stored row or None}],
+                  'message': '...'}
+        With a write journal the changes are only queued, and the result
+        has nothing written yet, plus 'queued': [their keys]. What the
+        server made of them arrives later through take_uploaded().
+        Raises ValidationError (nothing is saved) if any value is invalid.
+        """
+        changes = self._validated(changes)
+        if self.flusher is not None:
+            return self._queue_saves(changes)
+
+        result = self.backend.save_records(changes)
+        if result["written"]:
+            self.search_cache.clear()  # Cached results may now be out of date
+            self.duplicate_index.add_rows(result["headers"], result["written"])
+        return result
+
+    @traced()
+    def search_records(
+        self, search_params, after_key=None, cancel_token=None, columns=None
+    ):
         """
         Searches records based on search_params dictionary.
         search_dict example: {'Surname': 'Smith', 'FamilySerial': '123'}
-        Returns: (headers, records)       
+        The first page is answered from search_cache when possible.
+        columns: the columns on show (None = all), see get_page
+        Returns: (headers, records, next_key) - one page, see get_page
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            # 1. Start with a base query that is always true (WHERE 1=1)
-            sort_col = self.db_sort_order if self.db_sort_order else self.primary_key_col
-            base_query = f"SELECT TOP 1000 * FROM {self.table_name} WHERE 1=1"
-            
-            values = []
-            conditions = []
-
-            # 2. Loop through the dictionary and build the "AND Col LIKE ?" parts
-            for col, search_term in search_params.items():
-                if search_term: # Only add if user actually typed something
-                    # We use generic syntax. 
-                    # SQL Server 'LIKE' is case-insensitive by default.
-                    conditions.append(f"{col} LIKE ?")
-                    
-                    # Wrap the term in %...% for wildcard search (contains)
-                    values.append(f"%{search_term}%")
-
-            # 3. Combine it
-            if conditions:
-                # Join them: "AND Surname LIKE ? AND FamilySerial LIKE ?"
-                full_where = " AND ".join(conditions)
-                query = f"{base_query} AND {full_where} ORDER BY {sort_col}"
-            else:
-                # If search is empty, just return the normal top 1000
-                query = f"{base_query} ORDER BY {sort_col}"
-
-            # 4. Execute
-            # print(f"DEBUG SEARCH: {query} with {values}")
-            cursor.execute(query, values)
-
-            headers = [column[0] for column in cursor.description]
-            records = cursor.fetchall()
-
-            return headers, [list(row) for row in records]
-
-        finally:
-            conn.close()
-    
+        if columns != self._search_columns:
+            # Cached pages hold the columns they were fetched with
+            self.search_cache.clear()
+            self._search_columns = columns
+
+        if after_key is None:
+            cached = self.search_cache.get(search_params)
+            if cached is not None:
+                return cached
+
+        result = self.get_page(
+            search_params=search_params,
+            after_key=after_key,
+            cancel_token=cancel_token,
+            columns=columns,
+        )
+
+        if after_key is None:
+            self.search_cache.put(search_params, result)
+        return result
+
+    @traced()
     def add_record(self, data_dict):
         """
         Adds a new record to the database.
         data_dict: dictionary of column names and their values.
         Returns: (Success_Boolean, Message_String)
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         try:
-            # 1. Filter out any keys that aren't in the data_dict (safety check)
-            # We only insert columns that actually have data
-            columns = [k for k in data_dict.keys()]
-            
-            if not columns:
-                return False, "No data provided."
-
-            # 2. Build the query
-            # Result: "INSERT INTO tblCohortMember (Surname, FirstName) VALUES (?, ?)"
-            col_str = ", ".join(columns)
-            
-            # Create a string of question marks: "?, ?, ?" matching the number of columns
-            placeholders = ", ".join(["?" for _ in columns])
-            
-            query = f"INSERT INTO {self.table_name} ({col_str}) VALUES ({placeholders})"
-            
-            # 3. Prepare values in the correct order
-            values = [data_dict[col] for col in columns]
-
-            cursor.execute(query, values)
-            conn.commit()
-
-            return True, "Successfully added record."
-
-        except Exception as e:
+            [data_dict] = self._validated([data_dict], complete=True)
+        except ValidationError as e:
             return False, str(e)
-            
+        result = self.backend.add_record(data_dict)
+        if result[0]:
+            self.search_cache.clear()  # Cached results may now be out of date
+        return result
+
+    @traced()
+    def insert_record(self, data_dict):
+        """
+        Adds a new record and returns it as stored (with its new RecID).
+        Returns: {'headers': [...], 'row': [...], 'message': '...'}
+        With a write journal it is only queued ('row' is None, 'queued'
+        holds a temporary key); the stored row arrives through take_uploaded().
+        Raises ValidationError if any value is invalid.
+        """
+        if not data_dict:
+            raise ValueError("No data provided.")
+        [data_dict] = self._validated([data_dict], complete=True)
+        if self.flusher is not None:
+            journal = self.flusher.journal
+            temp_key = journal.next_temp_key()
+            journal.append("insert", temp_key, data_dict)
+            self.flusher.wake()
+            return {
+                "headers": [],
+                "row": None,
+                "queued": [temp_key],
+                "message": "Record saved locally; uploading in the background.",
+            }
+
+        try:
+            result = self.backend.insert_record(data_dict)
         finally:
-            conn.close()
+            self.search_cache.clear()  # Cached results may now be out of date
+        if result["row"] is not None:
+            self.duplicate_index.add_rows(result["headers"], [result["row"]])
+        return result
+
+    @traced()
+    def bulk_insert(self, columns, rows):
+        """
+        Inserts many rows at once with the backend's fastest method.
+        rows: lists (or any iterable) of values in the same order as columns,
+              already checked (see validate_rows and bulk_import.py).
+        Returns: number of rows inserted
+        """
+        try:
+            return self.backend.bulk_insert(columns, rows)
+        finally:
+            self.search_cache.clear()
+
+    def iter_records(self, search_params=None, chunk_size=5000, cancel_token=None):
+        """
+        Streams the whole table (or a search result) in sort order,
+        without loading it all into memory (used by exports).
+        Yields: (headers, records) one chunk at a time
+        """
+        return self.backend.iter_records(
+            search_params=search_params,
+            chunk_size=chunk_size,
+            cancel_token=cancel_token,
+        )
+
+    def iter_changed_records(self, since=None, chunk_size=5000):
+        """
+        Streams the whole table, or only rows changed since the given
+        last_modified_col value, without loading it all into memory.
+        Yields: (headers, records) one chunk at a time
+        """
+        return self.backend.iter_changed_records(since=since, chunk_size=chunk_size)
+
+    @traced()
+    def get_changed_records(self, since):
+        """
+        Every row whose last_modified_col is at or after `since`, e.g. to
+        refresh the loaded rows after a save without reloading them all.
+        Returns: (headers, records)
+        """
+        headers, records = [], []
+        for headers, chunk in self.backend.iter_changed_records(since=since):
+            records.extend(chunk)
+        self.duplicate_index.add_rows(headers, records)
+        return headers, records
+
+    def find_duplicates(self, data_dict, limit=5):
+        """
+        Existing records that are probably the same person as data_dict
+        (a new record, before it is added), best match first.
+        Only as complete as the index: the records loaded or synced so far
+        (see DuplicateIndex).
+        Returns: [{'key': RecID, 'score': 0..1, 'record': {column: value}}, ...]
+        """
+        with tracer.span("find duplicates", "db") as span:
+            matches = self.duplicate_index.find(data_dict, limit)
+            span["found"] = len(matches)
+        return matches
+
+    @traced()
+    def sync(self):
+        """
+        Brings a local copy up to date (LocalReplica); the other backends
+        have nothing to do.
+        Returns: a short status message
+        """
+        result = self.backend.sync()
+        self.search_cache.clear()
+        if self.flusher is not None:
+            self.flusher.wake()
+            waiting = self.flusher.journal.pending_count()
+            if waiting:
+                result += f" {waiting} saved changes waiting to upload."
+        return result
+
+    def _queue_saves(self, changes):
+        """save_records with a write journal: queue the changes, return at once."""
+        key_col, token_col = self.primary_key_col, self.last_modified_col
+        writes = []
+        for change in changes:
+            data = {
+                col: value for col, value in change.items()
+                if col not in (key_col, token_col)
+            }
+            if data:
+                writes.append(("update", change[key_col], data, change.get(token_col)))
+        self.flusher.journal.append_all(writes)
+        self.flusher.wake()
+        return {
+            "headers": [],
+            "written": [],
+            "conflicts": [],
+            "queued": [key for _, key, _, _ in writes],
+            "message": (
+                f"{len(writes)} records saved locally; uploading in the background."
+            ),
+        }
+
+    def take_uploaded(self):
+        """
+        What the write journal has uploaded since the last call (see
+        JournalFlusher.results): save results, new records with their
+        RecIDs, and writes the server refused. With a LocalReplica: the
+        queued edits its uploads found in conflict.
+        """
+        results = []
+        if hasattr(self.backend, "take_conflicts"):
+            conflicts = self.backend.take_conflicts()
+            if conflicts:
+                results.append({
+                    "operation": "update",
+                    "headers": self.backend.headers,
+                    "written": [],
+                    "conflicts": conflicts,
+                    "message": (
+                        f"{len(conflicts)} queued changes were changed by "
+                        "someone else first."
+                    ),
+                })
+        if self.flusher is not None:
+            while not self.flusher.results.empty():
+                result = self.flusher.results.get()
+                if result.get("written"):
+                    self.duplicate_index.add_rows(result["headers"], result["written"])
+                elif result.get("row") is not None:
+                    self.duplicate_index.add_rows(result["headers"], [result["row"]])
+                results.append(result)
+            if results:
+                self.search_cache.clear()  # Cached results may now be out of date
+        return results
 
 
 if __name__ == "__main__":
     dm = DataManager()
     print(dm.get_all_records())
+    print(dm.pool_stats())
+    print(dm.statement_stats())
@@ -0,0 +1,232 @@
+import functools
+import threading
+import unicodedata
+from datetime import date, datetime
+from itertools import combinations
+from src.ui.common.enums import DuplicateCheck
+
+_SOUNDEX_DIGITS = {
+    letter: digit
+    for letters, digit in [
+        ("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"),
+        ("r", "6"),
+    ]
+    for letter in letters
+}
+
+# Names that sound alike count as at least this similar, however spelled
+SOUNDS_ALIKE = 0.7
+
+
+def normalize_name(value):
+    """" O'Brien-Smith " -> "obriensmith" (letters only, accents dropped)"""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value)).casefold()
+    return "".join(c for c in text if "a" <= c <= "z")
+
+
+def soundex(name):
+    """American Soundex of a normalized name: "robert" -> "R163" ("" if empty)"""
+    if not name:
+        return ""
+    code = name[0].upper()
+    last = _SOUNDEX_DIGITS.get(name[0], "")
+    for letter in name[1:]:
+        digit = _SOUNDEX_DIGITS.get(letter, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":  # h and w don't separate letters with the same code
+            last = digit
+    return code.ljust(4, "0")
+
+
+@functools.lru_cache(maxsize=65536)
+def name_key(value):
+    """
+    A name as compared: (normalized, Soundex), or None if it has no letters.
+    Cached, since the same names come up again and again.
+    """
+    name = normalize_name(value)
+    return (name, soundex(name)) if name else None
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_similarity(a, b):
+    """0..1: trigram (Dice) similarity of two name_key()s (more if they sound alike)"""
+    if a[0] == b[0]:
+        return 1.0
+    grams_a, grams_b = trigrams(a[0]), trigrams(b[0])
+    score = 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+    return max(score, SOUNDS_ALIKE) if a[1] == b[1] else score
+
+
+def normalize_date(value):
+    """A date, datetime or "yyyy-mm-dd..." text -> (year, month, day), or None."""
+    if isinstance(value, (date, datetime)):
+        return (value.year, value.month, value.day)
+    if value is None:
+        return None
+    try:
+        value = date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+    return (value.year, value.month, value.day)
+
+
+def date_similarity(a, b):
+    if a == b:
+        return 1.0
+    if a == (b[0], b[2], b[1]):
+        return 0.8  # Day and month swapped
+    if sum(x == y for x, y in zip(a, b)) == 2:
+        return 0.6  # One part mistyped
+    return 0.0
+
+
+def normalize_exact(value):
+    return "" if value is None else "".join(str(value).split()).casefold()
+
+
+class DuplicateIndex:
+    """
+    Finds existing records that are probably the same person as a new one,
+    in memory, so the Add dialog can warn in milliseconds instead of
+    running LIKE '%...%' scans on the server.
+
+    fields: {column: (DuplicateCheck, weight)}, see DUPLICATE_FIELDS in schema.py
+
+    Blocking: each record is filed under a few short keys - the Soundex of
+    each NAME column with the year of each DATE column, each pair of NAME
+    Soundex codes, and each EXACT value - so a lookup only scores the records
+    sharing a key with the new one (one typo in any field still shares a key).
+    Scoring: weighted similarity of the columns both records have filled in
+    (trigrams for names, see the helpers above), from 0 to 1.
+
+    Rows are added as they pass through DataManager (pages, searches,
+    refreshes, saves, inserts, and rows a LocalReplica sync brings down),
+    so it holds what has been loaded or synced: nothing is read just to
+    fill it.
+    """
+
+    def __init__(self, key_column, fields, threshold=0.85):
+        self.key_column = key_column
+        self.fields = dict(fields)
+        self.threshold = threshold
+
+        self._columns = list(self.fields)
+        self._checks = [check for check, _ in self.fields.values()]
+        self._weights = [weight for _, weight in self.fields.values()]
+
+        # {key: (normalized values, values as stored)} and {block key: {key, ...}}
+        self._records = {}
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def add_rows(self, headers, rows):
+        """Adds or updates records (rows in headers order)."""
+        if self.key_column not in headers:
+            return
+        key_idx = headers.index(self.key_column)
+        positions = [headers.index(col) if col in headers else None
+                     for col in self._columns]
+        if all(pos is None for pos in positions):
+            return
+
+        with self._lock:
+            for row in rows:
+                key = row[key_idx]
+                old = self._records.get(key)
+                values = tuple(
+                    row[pos] if pos is not None else (old[1][i] if old else None)
+                    for i, pos in enumerate(positions)
+                )
+                if old is not None:
+                    if old[1] == values:
+                        continue
+                    self._unfile(key, old[0])
+                normalized = self._normalize(values)
+                self._records[key] = (normalized, values)
+                for block in self._block_keys(normalized):
+                    self._blocks.setdefault(block, set()).add(key)
+
+    def find(self, data_dict, limit=5):
+        """
+        Existing records that look like data_dict ({column: value}),
+        best first.
+        Returns: [{'key': RecID, 'score': 0..1, 'record': {column: value}}, ...]
+        """
+        normalized = self._normalize(tuple(data_dict.get(col) for col in self._columns))
+        with self._lock:
+            keys = set()
+            for block in self._block_keys(normalized):
+                keys |= self._blocks.get(block, set())
+            candidates = [(key, self._records[key]) for key in keys]
+
+        matches = []
+        for key, (other, values) in candidates:
+            score = self._score(normalized, other)
+            if score >= self.threshold:
+                matches.append({
+                    "key": key,
+                    "score": score,
+                    "record": dict(zip(self._columns, values)),
+                })
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:limit]
+
+    def _normalize(self, values):
+        normalized = []
+        for check, value in zip(self._checks, values):
+            if check == DuplicateCheck.NAME:
+                normalized.append(name_key(value) if value is not None else None)
+            elif check == DuplicateCheck.DATE:
+                normalized.append(normalize_date(value))
+            else:
+                normalized.append(normalize_exact(value) or None)
+        return tuple(normalized)
+
+    def _block_keys(self, normalized):
+        names = [(i, value[1]) for i, value in enumerate(normalized)
+                 if value and self._checks[i] == DuplicateCheck.NAME]
+        years = [(i, value[0]) for i, value in enumerate(normalized)
+                 if value and self._checks[i] == DuplicateCheck.DATE]
+        keys = [(i, code, j, year) for i, code in names for j, year in years]
+        keys += [(i, a, j, b) for (i, a), (j, b) in combinations(names, 2)]
+        keys += [(i, value) for i, value in enumerate(normalized)
+                 if value and self._checks[i] == DuplicateCheck.EXACT]
+        return keys
+
+    def _unfile(self, key, normalized):
+        for block in self._block_keys(normalized):
+            keys = self._blocks.get(block)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._blocks[block]
+
+    def _score(self, mine, theirs):
+        total = weights = 0.0
+        compared = 0
+        for check, weight, a, b in zip(self._checks, self._weights, mine, theirs):
+            if a is None or b is None:
+                continue  # Only compare what both records have
+            if check == DuplicateCheck.NAME:
+                similarity = name_similarity(a, b)
+            elif check == DuplicateCheck.DATE:
+                similarity = date_similarity(a, b)
+            else:
+                similarity = 1.0 if a == b else 0.0
+            total += weight * similarity
+            weights += weight
+            compared += 1
+        return total / weights if compared >= 2 else 0.0
@@ -0,0 +1,377 @@
+from datetime import datetime, timedelta
+from src.database.backends.sqlite_backend import SqliteBackend
+from src.database.write_journal import WriteJournal
+
+
+class LocalReplica(SqliteBackend):
+    """
+    A local SQLite copy of the server's table (DATA_BACKEND=sqlserver plus
+    LOCAL_REPLICA_PATH in .env).
+
+    Reads and searches are answered from the local file (milliseconds, and
+    they work offline). Edits and new records are saved locally straight away
+    and queued; the queue is pushed to the server whenever it is reachable.
+
+    sync() keeps the copy current: it pushes queued writes, then pulls only
+    the rows whose last_modified_col (StatusDate) changed since the last sync.
+    The first sync copies the whole table.
+
+    Queued edits carry the StatusDate they were made against, so the server
+    still refuses an edit of a record someone else saved meanwhile; those
+    conflicts are handed back by take_conflicts().
+
+    Note: rows deleted on the server are only removed by full_resync().
+    """
+
+    # Re-read this much before the watermark, to catch rows stamped just
+    # before the last sync but committed after it
+    SYNC_OVERLAP = timedelta(minutes=5)
+
+    def __init__(self, config, path, server):
+        # The local table is created from the server's columns on first sync
+        super().__init__(config, path, create_from_schema=False)
+        self.server = server
+
+        # {temporary key: server RecID} for new records uploaded by push_pending
+        self._uploaded_keys = {}
+
+        # Queued edits the server refused because someone else saved the
+        # record first, until take_conflicts() hands them back
+        self._conflicts = []
+
+        # Optional: called with (headers, rows) for the rows an incremental
+        # sync brings down (not the first copy of the whole table)
+        self.on_pulled = None
+
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS _sync_state (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+        # Writes waiting for the server, in the same file as the rows
+        self.journal = WriteJournal(self._conn, self._lock)
+
+    # --- Sync ---
+
+    def sync(self):
+        """
+        Pushes queued writes, then pulls rows changed since the last sync.
+        Raises if the server can't be reached (the local copy is still usable).
+        Returns: a short status message
+        """
+        pushed = self.push_pending()
+
+        watermark = self._get_state("watermark")
+        since = None
+        if watermark and self.headers:
+            since = datetime.fromisoformat(watermark) - self.SYNC_OVERLAP
+
+        pulled = self._pull(since)
+        self.load_schema()
+        waiting = self.pending_count()
+
+        message = f"Synced: {pulled} rows updated from the server"
+        if pushed:
+            message += f", {pushed} local changes uploaded"
+        if self._conflicts:
+            message += (
+                f" ({len(self._conflicts)} refused: changed on the server first)"
+            )
+        if waiting:
+            message += f", {waiting} still waiting to upload"
+        return message + "."
+
+    def full_resync(self):
+        """Throws away the local rows and copies the whole table again."""
+        self.push_pending()
+        with self._lock, self._conn:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            self._conn.execute("DELETE FROM _sync_state")
+            self.headers = []
+        return self._pull(None)
+
+    def _pull(self, since):
+        pending_keys = self._pending_keys()
+        pulled = 0
+        newest = None
+
+        for headers, records in self.server.iter_changed_records(since=since):
+            with self._lock, self._conn:
+                if not self.headers:
+                    self._create_table(headers)
+
+                key_idx = headers.index(self.primary_key_col)
+                modified_idx = headers.index(self.last_modified_col)
+
+                # Don't overwrite rows that still have local edits to upload
+                rows = [row for row in records if row[key_idx] not in pending_keys]
+                self._upsert(headers, rows)
+                pulled += len(rows)
+
+                stamps = [row[modified_idx] for row in records if row[modified_idx]]
+                if stamps:
+                    newest = max([newest] + stamps) if newest else max(stamps)
+
+            if since is not None and self.on_pulled is not None:
+                self.on_pulled(headers, rows)
+
+        if not self.headers:
+            # Server table is empty: still copy its columns
+            headers, _, _ = self.server.get_page(page_size=1)
+            with self._lock, self._conn:
+                self._create_table(headers)
+
+        if newest is not None:
+            self._set_state("watermark", self._stamp_text(newest))
+        return pulled
+
+    def push_pending(self):
+        """
+        Sends queued writes to the server, oldest first: runs of edits in one
+        transaction (repeated edits of a record merged), new records one by
+        one. Stops at the first failure so writes are never applied out of order.
+        Edits are checked against the StatusDate they were made against, like
+        a direct save; the ones the server refuses are kept for
+        take_conflicts(), and the local copy gets the server's version.
+        Returns: number of queued writes uploaded
+        """
+        pushed = 0
+        while True:
+            batch = self.journal.next_batch()
+            if batch is None:
+                break
+
+            if batch["operation"] == "insert":
+                try:
+                    inserted = self.server.insert_record(batch["data"])
+                except Exception:
+                    break
+            else:
+                changes = []
+                for key, token, data in batch["changes"]:
+                    change = dict(data, **{self.primary_key_col: key})
+                    if token is not None:
+                        # As a datetime, the type the server's column has
+                        change[self.last_modified_col] = self._stamp(token)
+                    changes.append(change)
+                try:
+                    saved = self.server.save_records(changes)
+                except Exception:
+                    break
+
+            with self._lock, self._conn:
+                self.journal.remove(batch["ids"])
+                if batch["operation"] == "update" and saved["conflicts"]:
+                    self._take_theirs(saved["headers"], saved["conflicts"])
+                if batch["operation"] == "insert":
+                    # Swap the temporary row for the server's (with its real RecID)
+                    self._conn.execute(
+                        f'DELETE FROM "{self.table_name}" '
+                        f'WHERE "{self.primary_key_col}"=?',
+                        [batch["record_key"]],
+                    )
+                    self._upsert(inserted["headers"], [inserted["row"]])
+                    key_idx = inserted["headers"].index(self.primary_key_col)
+                    self._uploaded_keys[batch["record_key"]] = inserted["row"][key_idx]
+            pushed += len(batch["ids"])
+        return pushed
+
+    def pending_count(self):
+        return self.journal.pending_count()
+
+    def take_conflicts(self):
+        """
+        Queued edits the server refused since the last call, as in
+        StorageBackend.save_records: [{'mine': change, 'theirs': row or None}]
+        """
+        with self._lock:
+            conflicts, self._conflicts = self._conflicts, []
+        return conflicts
+
+    # --- Reads: served from the local file ---
+
+    def get_page(
+        self, search_params=None, after_key=None, page_size=None, cancel_token=None,
+        columns=None,
+    ):
+        # Wide columns are read with the rest: the local file is cheap to read
+        if not self.headers:
+            self.sync()  # Never synced: copy the table first
+        return super().get_page(
+            search_params, after_key, page_size, cancel_token, columns
+        )
+
+    # --- Writes: saved locally at once, queued for the server ---
+
+    def save_records(self, changes):
+        """
+        Applies the edits to the local copy and queues them for the server
+        (with the StatusDate they were made against), then tries to upload
+        straight away. Conflicts come from the local copy's check, and from
+        the server's for whatever the upload sent.
+        See StorageBackend.save_records for the result.
+        """
+        # The edit and its journal entry are committed together
+        with self._lock, self._conn:
+            result = self._save_rows(changes)
+
+            key_idx = result["headers"].index(self.primary_key_col)
+            written_keys = {row[key_idx] for row in result["written"]}
+            writes = []
+            for row_dict in changes:
+                if row_dict[self.primary_key_col] not in written_keys:
+                    continue
+                data = {
+                    k: v for k, v in row_dict.items()
+                    if k not in self.ignored_columns and k != self.primary_key_col
+                }
+                if data:
+                    writes.append((
+                        "update",
+                        row_dict[self.primary_key_col],
+                        self._to_json(data),
+                        self._to_sqlite(row_dict.get(self.last_modified_col)),
+                    ))
+            self.journal.stage(writes)
+
+        waiting = self._try_push("")
+        result["conflicts"] += self.take_conflicts()
+        refused = {c["mine"][self.primary_key_col] for c in result["conflicts"]}
+        with self._lock:
+            # The upload may have brought back the server's StatusDate
+            result["written"] = [
+                row for _, row in self._rows_by_key(list(written_keys - refused))
+            ]
+        result["message"] = (
+            self._save_message(result["written"], result["conflicts"]) + waiting
+        )
+        return result
+
+    def insert_record(self, data_dict):
+        """
+        Adds the record to the local copy (with a temporary negative key)
+        and queues it for the server, then tries to upload straight away.
+        See StorageBackend.insert_record for the result (the row has its
+        server RecID if the upload worked, else the temporary key).
+        """
+        with self._lock, self._conn:
+            if not self.headers:
+                raise RuntimeError(
+                    "The local copy hasn't been synced with the server yet."
+                )
+
+            temp_key = self.journal.next_temp_key()
+            row = dict(data_dict, **{self.primary_key_col: temp_key})
+            columns = [col for col in row if col in self.headers]
+            self._insert_rows(columns, [[row[col] for col in columns]])
+            self.journal.stage([("insert", temp_key, self._to_json(data_dict), None)])
+
+        message = self._try_push("Successfully added record.")
+        with self._lock:
+            key = self._uploaded_keys.pop(temp_key, temp_key)
+            found = self._rows_by_key([key])
+        return {
+            "headers": self.headers,
+            "row": found[0][1] if found else None,
+            "message": message,
+        }
+
+    def bulk_insert(self, columns, rows):
+        """Big imports go straight to the server, then come back with a sync."""
+        count = self.server.bulk_insert(columns, rows)
+        self.sync()
+        return count
+
+    def load_schema(self):
+        """The server's schema (None while offline: COLUMN_MAP is used instead)."""
+        if self.schema is None:
+            try:
+                self.schema = self.server.load_schema()
+            except Exception as e:
+                if not self.server.is_offline_error(e):
+                    raise
+                # Offline: try again next time
+        return self.schema
+
+    def pool_stats(self):
+        return self.server.pool_stats()
+
+    def statement_stats(self):
+        return self.server.statement_stats()
+
+    def close(self):
+        super().close()
+        self.server.close()
+
+    # --- Helpers ---
+
+    def _try_push(self, message):
+        try:
+            # Upload, then pull the server's version (new RecIDs, StatusDate)
+            self.sync()
+        except Exception:
+            pass  # Offline: it stays queued for the next sync
+        waiting = self.pending_count()
+        if waiting:
+            message += f" ({waiting} changes saved locally, waiting to upload.)"
+        return message
+
+    def _pending_keys(self):
+        return self.journal.pending_keys("update")
+
+    def _take_theirs(self, headers, conflicts):
+        """
+        Gives the local copy the server's version of rows whose queued edits
+        were refused, and keeps the conflicts for take_conflicts()
+        (caller holds the lock).
+        """
+        theirs = [c["theirs"] for c in conflicts if c["theirs"] is not None]
+        self._upsert(headers, theirs)
+        self._conn.executemany(
+            f'DELETE FROM "{self.table_name}" WHERE "{self.primary_key_col}"=?',
+            [[c["mine"][self.primary_key_col]] for c in conflicts
+             if c["theirs"] is None],
+        )
+        self._conflicts.extend(conflicts)
+
+    def _upsert(self, headers, rows):
+        """
+        Writes server rows into the local copy. Their StatusDate is stored as
+        "YYYY-MM-DD HH:MM:SS.fff", like the local stamps (see
+        iter_changed_records).
+        """
+        placeholders = ", ".join("?" for _ in headers)
+        column_list = ", ".join(f'"{col}"' for col in headers)
+        stamp_idx = (
+            headers.index(self.last_modified_col)
+            if self.last_modified_col in headers else None
+        )
+
+        def local_values(row):
+            values = [self._to_sqlite(value) for value in row]
+            if stamp_idx is not None:
+                values[stamp_idx] = self._stamp_text(row[stamp_idx])
+            return values
+
+        self._conn.executemany(
+            f'INSERT OR REPLACE INTO "{self.table_name}" ({column_list}) '
+            f"VALUES ({placeholders})",
+            map(local_values, rows),
+        )
+
+    def _get_state(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM _sync_state WHERE key=?", [key]
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO _sync_state (key, value) VALUES (?, ?)",
+                [key, value],
+            )
+
+    @classmethod
+    def _to_json(cls, data):
+        return {col: cls._to_sqlite(value) for col, value in data.items()}
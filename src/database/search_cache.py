@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from src.ui.common.enums import MatchMode
+
+
+def matches(value, mode, term):
+    """
+    Python version of the search predicates the backends send to the database.
+    term must already be normalized (stripped and casefolded).
+    """
+    if value is None:
+        return False
+    text = str(value).strip().casefold()
+    if mode == MatchMode.EXACT:
+        return text == term
+    if mode == MatchMode.PREFIX:
+        return text.startswith(term)
+    if mode == MatchMode.CONTAINS:
+        return term in text
+    return True  # FULLTEXT: only reached for a term the server already applied
+
+
+class SearchCache:
+    """
+    Small LRU cache of search results, keyed on the normalized search_params.
+
+    If a new search only narrows a cached one whose results were complete
+    (e.g. "Smi" -> "Smith"), it is answered by filtering the cached rows
+    in memory instead of asking the server again. What "narrows" means
+    depends on each column's MatchMode (see SEARCH_FIELDS).
+    """
+
+    def __init__(self, match_modes=None, max_entries=32, ttl=60):
+        self.match_modes = match_modes or {}
+        self.max_entries = max_entries
+        self.ttl = ttl  # Seconds before a cached result is considered stale
+        # key -> (time stored, headers, records, next_key)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "refined": 0, "misses": 0}
+
+    @staticmethod
+    def normalize(search_params):
+        """{'Surname': ' Smith '} -> (('Surname', 'smith'),) - ignores empty boxes"""
+        return tuple(
+            sorted(
+                (col, str(term).strip().casefold())
+                for col, term in search_params.items()
+                if str(term).strip()
+            )
+        )
+
+    def get(self, search_params):
+        """Returns (headers, records, next_key) or None if we have to ask the server."""
+        key = self.normalize(search_params)
+
+        with self._lock:
+            self._drop_stale()
+
+            # 1. Exact match
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                _, headers, records, next_key = entry
+                return headers, list(records), next_key
+
+            # 2. A broader search we can filter down
+            for cached_key, (_, headers, records, next_key) in reversed(
+                self._entries.items()
+            ):
+                if (
+                    next_key is None
+                    and all(col in headers for col, _ in key)
+                    and self._refines(key, cached_key)
+                ):
+                    self.stats["refined"] += 1
+                    break
+            else:
+                self.stats["misses"] += 1
+                return None
+
+        records = self._filter(headers, records, key)
+        self.put(search_params, (headers, records, None))
+        return headers, list(records), None
+
+    def put(self, search_params, result):
+        headers, records, next_key = result
+        key = self.normalize(search_params)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), headers, list(records), next_key)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def narrows(self, search_params, base_params):
+        """
+        True if search_params can only match rows that base_params matched,
+        so complete base results can be filtered in memory instead
+        (e.g. by the grid's quick filters).
+        """
+        return self._refines(self.normalize(search_params), self.normalize(base_params))
+
+    def clear(self):
+        """Forget everything (call after any write to the table)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _drop_stale(self):
+        cutoff = time.monotonic() - self.ttl
+        for key in [k for k, entry in self._entries.items() if entry[0] < cutoff]:
+            del self._entries[key]
+
+    def _mode(self, col):
+        return self.match_modes.get(col, MatchMode.CONTAINS)
+
+    def _refines(self, key, cached_key):
+        """True if the new search can only return a subset of the cached one."""
+        new_terms = dict(key)
+        for col, term in cached_key:
+            if col not in new_terms:
+                return False
+            mode = self._mode(col)
+            if mode == MatchMode.CONTAINS and term not in new_terms[col]:
+                return False
+            if mode == MatchMode.PREFIX and not new_terms[col].startswith(term):
+                return False
+            if mode in (MatchMode.EXACT, MatchMode.FULLTEXT) and term != new_terms[col]:
+                # Full-text word breaking can't be reproduced here, so only
+                # an identical term is safe
+                return False
+        # Any new column has to be one we can check in memory
+        cached_cols = dict(cached_key)
+        return all(
+            col in cached_cols or self._mode(col) != MatchMode.FULLTEXT
+            for col in new_terms
+        )
+
+    def _filter(self, headers, records, key):
+        checks = [(headers.index(col), self._mode(col), term) for col, term in key]
+        return [
+            row
+            for row in records
+            if all(matches(row[idx], mode, term) for idx, mode, term in checks)
+        ]
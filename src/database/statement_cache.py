@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+
+def bucket(count):
+    """
+    Rounds a row count up to the next power of two (1, 2, 4, 8...), so
+    statements with a row per value come in a few shapes instead of one
+    per count.
+    """
+    size = 1
+    while size < count:
+        size *= 2
+    return size
+
+
+class StatementCache:
+    """
+    Generated SQL text, keyed on the shape of the call (operation, columns,
+    match modes, row count...) rather than on its values.
+
+    Each shape is built once and the same text (the same str object) is
+    handed out after that. That matters on the server: SQL Server caches
+    one plan per distinct statement text, so calls of the same shape share
+    a plan instead of compiling and caching their own. It also lets a
+    connection re-run a statement it has already prepared (see
+    ConnectionPool.cursor).
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> SQL text
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, build):
+        """The SQL for key, calling build() to write it the first time."""
+        with self._lock:
+            sql = self._entries.get(key)
+            if sql is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return sql
+
+        sql = build()
+        with self._lock:
+            self.stats["misses"] += 1
+            sql = self._entries.setdefault(key, sql)  # Another thread may have won
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+        return sql
+
+    def clear(self):
+        """Forget every statement (e.g. once the table's columns are known)."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,110 @@
+import json
+from datetime import date
+from src.ui.common.enums import DuplicateCheck, FieldType, MatchMode
+
+
+class TableConfig:
+    """
+    One table's settings in multi-table mode: the DataManager CONFIGURATION
+    SECTION plus what schema.py holds for the single table, read from the
+    TABLES_CONFIG file (see load_table_configs) instead of the source code.
+    Attributes have the same names as on DataManager.
+    """
+
+    def __init__(
+        self,
+        table_name,
+        primary_key_col,
+        title=None,
+        db_sort_order=None,
+        ignored_columns=None,
+        last_modified_col="StatusDate",
+        page_size=500,
+        column_map=None,
+        insert_fields=None,
+        search_fields=None,
+        field_rules=None,
+        duplicate_fields=None,
+        grid_columns=None,
+    ):
+        self.table_name = table_name
+        self.primary_key_col = primary_key_col
+        self.title = title or table_name
+        self.db_sort_order = db_sort_order
+        self.ignored_columns = list(ignored_columns or [])
+        self.last_modified_col = last_modified_col
+        self.page_size = page_size
+        self.column_map = dict(column_map or {})
+        # None: every column that can be edited (see DataManager.insert_columns)
+        self.insert_fields = insert_fields
+        self.search_fields = dict(search_fields or {})
+        self.field_rules = dict(field_rules or {})
+        self.duplicate_fields = dict(duplicate_fields or {})
+        self.grid_columns = grid_columns
+
+    def settings(self):
+        """{DataManager attribute: value}"""
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reads one entry of the TABLES_CONFIG file. Enum members are given
+        by name ("DATE", "PREFIX", "NAME"), and rule bounds may be
+        "yyyy-mm-dd" dates or "today".
+        Raises ValueError naming the table and the setting that is wrong.
+        """
+        name = data.get("table_name", "?")
+        try:
+            data = dict(data)
+            data["column_map"] = {
+                col: FieldType[kind] for col, kind in data.pop("columns", {}).items()
+            }
+            data["search_fields"] = {
+                col: MatchMode[mode]
+                for col, mode in data.get("search_fields", {}).items()
+            }
+            data["field_rules"] = {
+                col: {key: _rule_value(value) for key, value in rule.items()}
+                for col, rule in data.get("field_rules", {}).items()
+            }
+            data["duplicate_fields"] = {
+                col: (DuplicateCheck[check], float(weight))
+                for col, (check, weight) in data.get("duplicate_fields", {}).items()
+            }
+            return cls(**data)
+        except KeyError as e:
+            raise ValueError(f"Table '{name}': unknown name {e}") from None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Table '{name}': {e}") from None
+
+
+def _rule_value(value):
+    """FIELD_RULES values as written in JSON: "today" and ISO dates become dates."""
+    if value == "today":
+        return date.today
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+def load_table_configs(path):
+    """
+    The tables listed in a TABLES_CONFIG file:
+        {"tables": [{"table_name": "tblCohortMember", "primary_key_col": "RecID",
+                     "title": "Members", "columns": {"Sex": "SEX_COMBOBOX"},
+                     "search_fields": {"Surname": "PREFIX"}, ...}, ...]}
+    Returns: [TableConfig, ...] in the order their tabs appear
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    tables = [TableConfig.from_dict(entry) for entry in data.get("tables", [])]
+    if not tables:
+        raise ValueError(f"{path} lists no tables.")
+    names = [table.table_name for table in tables]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path} lists a table more than once.")
+    return tables
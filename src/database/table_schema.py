@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+from src.ui.common.enums import FieldType
+
+# Database types shown with a date picker
+DATE_TYPES = {"date"}
+
+# Database types the user can never edit (the server fills them in)
+READONLY_TYPES = {"timestamp", "rowversion"}
+
+# Database types too big to fetch for every row of the grid (see is_wide)
+WIDE_TYPES = {"text", "ntext", "image", "xml", "binary", "varbinary"}
+
+# Text types that are only wide as (max)
+MAX_TEXT_TYPES = {"varchar", "nvarchar"}
+
+
+class TableSchema:
+    """
+    What the database says about one table: its columns (type, length,
+    nullability, identity/computed) and indexes.
+
+    columns: [{'name': 'Surname', 'type': 'nvarchar', 'max_length': 50,
+               'precision': 0, 'scale': 0, 'nullable': True,
+               'identity': False, 'computed': False}, ...]
+             max_length is in characters (None for (max) types)
+    indexes: [{'name': 'IX_Surname', 'unique': False, 'columns': ['Surname']}, ...]
+    version: changes whenever the table is altered (used to check the cache)
+    """
+
+    def __init__(self, table_name, columns, indexes=None, version=None):
+        self.table_name = table_name
+        self.columns = columns
+        self.indexes = indexes or []
+        self.version = version
+        self._by_name = {col["name"]: col for col in columns}
+
+    @property
+    def column_names(self):
+        return [col["name"] for col in self.columns]
+
+    def column(self, name):
+        """The column's details, or None if the table has no such column."""
+        return self._by_name.get(name)
+
+    def field_type(self, name):
+        """The FieldType the column would get if COLUMN_MAP didn't mention it."""
+        col = self._by_name.get(name)
+        if col is None:
+            return FieldType.TEXT
+        if col["identity"] or col["computed"] or col["type"] in READONLY_TYPES:
+            return FieldType.READONLY
+        if col["type"] in DATE_TYPES:
+            return FieldType.DATE
+        return FieldType.TEXT
+
+    def is_wide(self, name):
+        """
+        True for notes and binary columns (varchar(max), varbinary, xml...),
+        which the grid only fetches when a cell is opened.
+        """
+        col = self._by_name.get(name)
+        if col is None:
+            return False
+        return col["type"] in WIDE_TYPES or (
+            col["type"] in MAX_TEXT_TYPES and col["max_length"] is None
+        )
+
+    def to_dict(self):
+        return {
+            "table_name": self.table_name,
+            "version": self.version,
+            "columns": self.columns,
+            "indexes": self.indexes,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["table_name"], data["columns"], data["indexes"], data["version"]
+        )
+
+
+class SchemaCache:
+    """
+    Keeps TableSchemas in a small JSON file, so the app doesn't have to
+    re-read the database's catalog every time it starts.
+    An entry is only used while its version matches the table's current
+    version; after an ALTER TABLE it is read again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, table_name, version):
+        """The cached TableSchema, or None if missing or out of date."""
+        data = self._read().get(table_name)
+        if data is None or data["version"] != version:
+            return None
+        return TableSchema.from_dict(data)
+
+    def put(self, schema):
+        with self._lock:
+            entries = self._read()
+            entries[schema.table_name] = schema.to_dict()
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(temp_path, self.path)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}  # No cache yet (or a damaged one): just read the catalog
@@ -0,0 +1,245 @@
+from datetime import date, datetime
+from src.ui.common.enums import FieldType
+from src.ui.common.schema import FIELD_RULES
+
+# Date formats accepted when typed or imported (tried in this order)
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d"]
+
+# What people actually type in the Sex column
+SEX_VALUES = {"m": "M", "male": "M", "f": "F", "female": "F"}
+
+# Database types whose max_length limits the text (see TableSchema)
+TEXT_TYPES = {"char", "nchar", "varchar", "nvarchar"}
+
+# How many invalid cells a ValidationError spells out
+MAX_REPORTED = 20
+
+
+class ValidationError(ValueError):
+    """
+    Raised when a batch holds invalid values, listing every invalid cell
+    (not just the first), so they can all be fixed in one go.
+    errors: [(row label, column, reason), ...]
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        lines = [f"{label}, {col}: {reason}" for label, col, reason in errors]
+        if len(lines) > MAX_REPORTED:
+            lines[MAX_REPORTED:] = [f"... and {len(lines) - MAX_REPORTED} more"]
+        super().__init__("\n".join(lines))
+
+
+def to_date(value):
+    """A date from a date, datetime or text in one of DATE_FORMATS."""
+    if isinstance(value, datetime):  # Excel dates arrive as datetimes
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip().split(" ")[0]  # "2001-02-03 00:00:00" -> "2001-02-03"
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"can't read '{value}' as a date")
+
+
+def coerce_value(field_type, value):
+    """
+    Turns one value (typed, imported, or edited in the grid) into the
+    value we store. Empty values become None.
+    Raises ValueError with a short, user-readable reason.
+    """
+    if value is None:
+        return None
+    if field_type == FieldType.READONLY:
+        return value  # Never written, so nothing to check
+
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel stores 123 as 123.0
+    if not isinstance(value, (date, datetime)):
+        if not str(value).strip():
+            return None
+
+    if field_type == FieldType.DATE:
+        return to_date(value)
+
+    text = str(value).strip()
+    if field_type == FieldType.SEX_COMBOBOX:
+        if text.casefold() not in SEX_VALUES:
+            raise ValueError(f"'{value}' is not M or F")
+        return SEX_VALUES[text.casefold()]
+    return text
+
+
+_MISSING = object()
+
+
+class _Invalid:
+    """A value that failed, remembered so its repeats fail without re-checking."""
+
+    __slots__ = ("reason",)
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+class Validator:
+    """
+    Checks and converts values before they are written, the same way for
+    grid saves, new records and bulk imports: each column's FieldType
+    (COLUMN_MAP, then the database schema) says how to read it, and
+    FIELD_RULES (schema.py) adds required columns, date ranges and
+    allowed values. Text longer than the database column allows is
+    refused here rather than by the server.
+
+    Batches are checked a column at a time, and each distinct value in a
+    column is converted once, so a 5000-row import chunk with a few
+    hundred distinct dates costs a few hundred conversions. Every invalid
+    cell is reported, not just the first.
+    """
+
+    def __init__(self, field_types, rules=None, schema=None):
+        """
+        field_types: {column: FieldType}, see DataManager.field_types()
+        rules: {column: {...}}, defaults to FIELD_RULES
+        schema: optional TableSchema, for the text columns' lengths
+        """
+        self.field_types = field_types
+        self.rules = FIELD_RULES if rules is None else rules
+        self.schema = schema
+        self.max_lengths = {}
+        if schema is not None:
+            for col in schema.columns:
+                if col["type"] in TEXT_TYPES and col["max_length"]:
+                    self.max_lengths[col["name"]] = col["max_length"]
+
+    def check_column(self, column, values):
+        """
+        Converts one column of values.
+        Returns: (converted values, {position: reason})
+        """
+        field_type = self.field_types.get(column, FieldType.TEXT)
+        if field_type == FieldType.READONLY:
+            return list(values), {}
+
+        rule = self.rules.get(column, {})
+        required = rule.get("required", False)
+        limits = self._limits(column, rule)
+
+        converted, errors = [], {}
+        seen = {}  # (type, value) -> converted value or _Invalid
+        for position, value in enumerate(values):
+            try:
+                key = (type(value), value)
+                result = seen.get(key, _MISSING)
+            except TypeError:  # Unhashable: check it every time
+                key, result = None, _MISSING
+            if result is _MISSING:
+                try:
+                    result = self._check(coerce_value(field_type, value), limits)
+                except ValueError as e:
+                    result = _Invalid(str(e))
+                if key is not None:
+                    seen[key] = result
+
+            if isinstance(result, _Invalid):
+                errors[position] = result.reason
+                result = value  # Left as it was
+            elif result is None and required:
+                errors[position] = "is required"
+            converted.append(result)
+        return converted, errors
+
+    def validate_rows(self, columns, rows, labels=None, complete=False):
+        """
+        Converts rows of values (lists in columns order), column by column.
+        labels: how to name each row in errors (default "Row 1", "Row 2"...)
+        complete: the rows are new, so required columns must be among columns
+        Returns: (converted rows, errors) - errors as in ValidationError
+        """
+        if not rows:
+            return [], []
+        checked = []
+        errors = {}  # row position -> [(column, reason), ...]
+        if complete:
+            for column in self._required():
+                if column not in columns:
+                    for position in range(len(rows)):
+                        errors.setdefault(position, []).append((column, "is required"))
+        # zip(*rows) turns the rows inside out: one tuple per column
+        for column, values in zip(columns, zip(*rows)):
+            values, col_errors = self.check_column(column, values)
+            checked.append(values)
+            for position, reason in col_errors.items():
+                errors.setdefault(position, []).append((column, reason))
+        return [list(row) for row in zip(*checked)], self._label(errors, labels)
+
+    def validate_records(self, records, complete=False, labels=None):
+        """
+        Converts records given as dictionaries (e.g. the edited cells of
+        each row), column by column across the whole batch.
+        complete: the records are new, so required columns must be present
+        Returns: (converted records, errors) - errors as in ValidationError
+        """
+        converted = [dict(record) for record in records]
+        columns = {col: None for record in records for col in record}
+        if complete:
+            columns.update((col, None) for col in self._required())
+
+        errors = {}
+        for column in columns:
+            positions = [
+                i for i, record in enumerate(records) if complete or column in record
+            ]
+            values, col_errors = self.check_column(
+                column, [records[i].get(column) for i in positions]
+            )
+            for position, value in zip(positions, values):
+                if column in records[position]:
+                    converted[position][column] = value
+            for position, reason in col_errors.items():
+                errors.setdefault(positions[position], []).append((column, reason))
+        return converted, self._label(errors, labels)
+
+    def _required(self):
+        return [
+            col for col, rule in self.rules.items()
+            if rule.get("required")
+            and self.field_types.get(col, FieldType.TEXT) != FieldType.READONLY
+        ]
+
+    def _limits(self, column, rule):
+        limits = dict(rule)
+        if column in self.max_lengths:
+            limits.setdefault("max_length", self.max_lengths[column])
+        for bound in ("min", "max"):
+            if callable(limits.get(bound)):
+                limits[bound] = limits[bound]()  # e.g. date.today
+        return limits
+
+    @staticmethod
+    def _check(value, limits):
+        """Applies a column's rules to one converted value."""
+        if value is None:
+            return None
+        max_length = limits.get("max_length")
+        if max_length is not None and len(str(value)) > max_length:
+            raise ValueError(f"longer than {max_length} characters")
+        if "min" in limits and value < limits["min"]:
+            raise ValueError(f"{value} is before {limits['min']}")
+        if "max" in limits and value > limits["max"]:
+            raise ValueError(f"{value} is after {limits['max']}")
+        choices = limits.get("choices")
+        if choices is not None and value not in choices:
+            raise ValueError(f"'{value}' is not one of {', '.join(map(str, choices))}")
+        return value
+
+    @staticmethod
+    def _label(errors, labels):
+        return [
+            (labels[i] if labels is not None else f"Row {i + 1}", column, reason)
+            for i in sorted(errors)
+            for column, reason in errors[i]
+        ]
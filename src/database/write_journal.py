@@ -0,0 +1,417 @@
+import json
+import queue
+import random
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from src.diagnostics.tracer import tracer
+
+
+def _encode(value):
+    """JSON for one value, keeping dates/Decimals so they go back as they came."""
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and len(value) == 1:
+        (tag, text), = value.items()
+        if tag == "$datetime":
+            return datetime.fromisoformat(text)
+        if tag == "$date":
+            return date.fromisoformat(text)
+        if tag == "$decimal":
+            return Decimal(text)
+    return value
+
+
+def _dumps(data):
+    return json.dumps({col: _encode(value) for col, value in data.items()})
+
+
+def _loads(text):
+    return {col: _decode(value) for col, value in json.loads(text).items()}
+
+
+class WriteJournal:
+    """
+    Durable, append-only queue of writes waiting for the server, in a
+    SQLite table. Appending is one local insert (milliseconds), so saves
+    and new records never wait for the network, and nothing typed is lost
+    if the connection drops: the writes stay here until they are replayed
+    (see JournalFlusher, and LocalReplica.push_pending).
+
+    Each entry is an 'update' (record_key = Primary Key, token = the
+    last_modified_col value the edit was made against, or None to write
+    unconditionally) or an 'insert' (record_key = a temporary negative key).
+    Entries the server rejected for good are kept, with the error, but
+    skipped. Temporary keys come from a counter kept in the same file, so
+    none is ever handed out twice (see next_temp_key).
+    """
+
+    TABLE = "_pending_writes"
+
+    def __init__(self, conn, lock):
+        """conn/lock: a sqlite3 connection (shared with its owner) and its RLock"""
+        self._conn = conn
+        self._lock = lock
+
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    operation TEXT NOT NULL,  -- 'update' or 'insert'
+                    record_key,               -- Primary Key (temporary for inserts)
+                    payload TEXT NOT NULL,    -- JSON of column -> value
+                    token TEXT,               -- JSON of the StatusDate edited against
+                    error TEXT                -- Set when the server rejected it
+                )
+            """)
+            # Journals written before tokens/errors were recorded
+            columns = {
+                row[1] for row in self._conn.execute(f"PRAGMA table_info({self.TABLE})")
+            }
+            for column in ("token", "error"):
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE {self.TABLE} ADD COLUMN {column} TEXT"
+                    )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS _journal_meta "
+                "(key TEXT PRIMARY KEY, value INTEGER)"
+            )
+
+    @classmethod
+    def open(cls, path):
+        """A journal in its own file (WRITE_JOURNAL_PATH)."""
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return cls(conn, threading.RLock())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Appending ---
+
+    def append(self, operation, record_key, data, token=None):
+        """
+        Queues one write. An update of a record that is itself still queued
+        as an insert (negative key) is folded into that insert instead.
+        """
+        self.append_all([(operation, record_key, data, token)])
+
+    def append_all(self, writes):
+        """Queues [(operation, record_key, data, token), ...] in one transaction."""
+        with self._lock, self._conn:
+            self.stage(writes)
+
+    def stage(self, writes):
+        """
+        Like append_all, but inside the caller's transaction: the caller
+        holds the lock and commits, e.g. together with the local edit the
+        writes come from.
+        """
+        for operation, record_key, data, token in writes:
+            self._append(operation, record_key, data, token)
+
+    def _append(self, operation, record_key, data, token):
+        if operation == "update" and token is not None:
+            # Edited again while still queued: check it against the version
+            # the first edit was made against (the one the server has)
+            earlier = self._conn.execute(
+                f"SELECT token FROM {self.TABLE} WHERE operation='update' "
+                "AND record_key=? AND error IS NULL AND token IS NOT NULL "
+                "ORDER BY id LIMIT 1",
+                [record_key],
+            ).fetchone()
+            if earlier:
+                token = _decode(json.loads(earlier[0]))
+
+        if operation == "update" and record_key is not None and record_key < 0:
+            queued = self._conn.execute(
+                f"SELECT id, payload FROM {self.TABLE} "
+                "WHERE operation='insert' AND record_key=?",
+                [record_key],
+            ).fetchone()
+            if queued:
+                self._conn.execute(
+                    f"UPDATE {self.TABLE} SET payload=? WHERE id=?",
+                    [_dumps(dict(_loads(queued[1]), **data)), queued[0]],
+                )
+                return
+
+        self._conn.execute(
+            f"INSERT INTO {self.TABLE} (operation, record_key, payload, token) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                operation,
+                record_key,
+                _dumps(data),
+                None if token is None else json.dumps(_encode(token)),
+            ],
+        )
+
+    def next_temp_key(self):
+        """
+        A negative key for a new record: one below the last handed out,
+        even after that insert was uploaded, so a row still showing an old
+        temporary key never gets mixed up with a new record.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM _journal_meta WHERE key='last_temp_key'"
+            ).fetchone()
+            if row is not None:
+                last = row[0]
+            else:
+                # Journals written before the counter was kept
+                last = self._conn.execute(
+                    f"SELECT MIN(record_key) FROM {self.TABLE} "
+                    "WHERE operation='insert'"
+                ).fetchone()[0]
+            key = min(last or 0, 0) - 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO _journal_meta (key, value) "
+                "VALUES ('last_temp_key', ?)",
+                [key],
+            )
+        return key
+
+    # --- Replaying ---
+
+    def next_batch(self, max_rows=200):
+        """
+        The oldest queued writes that can be sent together, or None if
+        there are none:
+        - {'operation': 'insert', 'ids': [id], 'record_key': temp_key,
+           'data': {...}}
+        - {'operation': 'update', 'ids': [...],
+           'changes': [(record_key, token, {column: value}), ...]}
+          a run of updates, with repeated edits of the same record merged
+          into one (latest values win, the first edit's token is kept,
+          since that is the version the user started from)
+        """
+        with self._lock:
+            entries = self._conn.execute(
+                f"SELECT id, operation, record_key, payload, token FROM {self.TABLE} "
+                "WHERE error IS NULL ORDER BY id LIMIT ?",
+                [max_rows],
+            ).fetchall()
+        if not entries:
+            return None
+
+        write_id, operation, record_key, payload, _ = entries[0]
+        if operation == "insert":
+            return {
+                "operation": "insert",
+                "ids": [write_id],
+                "record_key": record_key,
+                "data": _loads(payload),
+            }
+
+        ids, merged = [], {}  # {record_key: [token, data]}, in first-seen order
+        for write_id, operation, record_key, payload, token in entries:
+            if operation != "update":
+                break  # Inserts go one at a time, in order
+            ids.append(write_id)
+            if record_key in merged:
+                merged[record_key][1].update(_loads(payload))
+            else:
+                token = None if token is None else _decode(json.loads(token))
+                merged[record_key] = [token, _loads(payload)]
+        return {
+            "operation": "update",
+            "ids": ids,
+            "changes": [(key, token, data) for key, (token, data) in merged.items()],
+        }
+
+    def remove(self, ids):
+        """Drops entries once the server has them."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"DELETE FROM {self.TABLE} WHERE id=?", [[i] for i in ids]
+            )
+
+    def reject(self, ids, error):
+        """Keeps entries the server refused (they are skipped from now on)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"UPDATE {self.TABLE} SET error=? WHERE id=?",
+                [[error, i] for i in ids],
+            )
+
+    # --- Inspecting ---
+
+    def pending_count(self):
+        """Writes still waiting to be sent (not counting rejected ones)."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.TABLE} WHERE error IS NULL"
+            ).fetchone()[0]
+
+    def pending_keys(self, operation="update"):
+        with self._lock:
+            return {
+                row[0] for row in self._conn.execute(
+                    f"SELECT record_key FROM {self.TABLE} "
+                    "WHERE operation=? AND error IS NULL",
+                    [operation],
+                )
+            }
+
+
+class JournalFlusher:
+    """
+    Background thread that replays a WriteJournal to the server backend:
+    runs of edits go as one save_records call (one transaction), new
+    records one at a time. It runs when woken (after each write) and,
+    while the server is unreachable, retries with exponential backoff.
+
+    What each replay returned is put on `results`, for the Presenter to
+    show (rows as stored, conflicts, new RecIDs):
+        {'operation': 'update', 'headers', 'written', 'conflicts', 'message'}
+        {'operation': 'insert', 'record_key': temp_key, 'headers', 'row', 'message'}
+        {'operation': ..., 'error': '...', 'count': n}  (rejected by the server)
+
+    Writes are sent at least once: if the app dies between the server
+    committing and the journal entry being removed, it is sent again.
+    """
+
+    def __init__(
+        self, journal, backend, key_column, token_column,
+        batch_size=200, retry_delay=1.0, max_retry_delay=60.0,
+    ):
+        self.journal = journal
+        self.backend = backend
+        self.key_column = key_column
+        self.token_column = token_column
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.results = queue.SimpleQueue()
+        self.stats = {"batches": 0, "writes": 0, "retries": 0, "rejected": 0}
+
+        # Consecutive failed attempts (0 = online)
+        self.failures = 0
+
+        # {record_key: (token sent, token now stored)}: a later edit made
+        # against the version we replaced is sent with the new token,
+        # so the user's own earlier save doesn't count as a conflict
+        self._tokens = {}
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="journal-flusher", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        self.wake()  # Send whatever was left from the last run
+        return self
+
+    def wake(self):
+        """Asks for a flush now (ignored while backing off after a failure)."""
+        if self.failures == 0:
+            self._wake.set()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            delay = None  # Sleep until woken
+            try:
+                self.flush()
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                self.stats["retries"] += 1
+                delay = min(
+                    self.max_retry_delay, self.retry_delay * 2 ** (self.failures - 1)
+                ) * random.uniform(1.0, 1.2)  # Jitter: don't retry in lockstep
+                tracer.instant(
+                    "journal retry", "db", error=str(e), delay_s=round(delay, 1),
+                    waiting=self.journal.pending_count(),
+                )
+            self._wake.wait(delay)
+
+    def flush(self):
+        """
+        Sends every queued write. Raises (leaving the rest queued) if the
+        server can't be reached.
+        """
+        while not self._stop.is_set():
+            batch = self.journal.next_batch(self.batch_size)
+            if batch is None:
+                return
+            with tracer.span(
+                "journal flush", "db", operation=batch["operation"],
+                rows=len(batch["ids"]),
+            ):
+                if batch["operation"] == "insert":
+                    self._send_insert(batch)
+                else:
+                    self._send_updates(batch)
+            self.stats["batches"] += 1
+            self.stats["writes"] += len(batch["ids"])
+
+    def _send_updates(self, batch):
+        changes = []
+        for key, token, data in batch["changes"]:
+            change = dict(data, **{self.key_column: key})
+            if token is not None:
+                sent, stored = self._tokens.get(key, (None, None))
+                change[self.token_column] = stored if token == sent else token
+            changes.append(change)
+
+        try:
+            result = self.backend.save_records(changes)
+        except Exception as e:
+            self._reject_or_raise(batch, e)
+            return
+        self.journal.remove(batch["ids"])
+
+        headers = result["headers"]
+        if self.key_column in headers and self.token_column in headers:
+            key_idx = headers.index(self.key_column)
+            token_idx = headers.index(self.token_column)
+            sent = {change[self.key_column]: change.get(self.token_column)
+                    for change in changes}
+            for row in result["written"]:
+                self._tokens[row[key_idx]] = (sent.get(row[key_idx]), row[token_idx])
+        self.results.put(dict(result, operation="update"))
+
+    def _send_insert(self, batch):
+        try:
+            result = self.backend.insert_record(batch["data"])
+        except Exception as e:
+            self._reject_or_raise(batch, e)
+            return
+        self.journal.remove(batch["ids"])
+        self.results.put(
+            dict(result, operation="insert", record_key=batch["record_key"])
+        )
+
+    def _reject_or_raise(self, batch, error):
+        """Offline: raise (retry later). Anything else: the write itself is bad."""
+        if self.backend.is_offline_error(error):
+            raise error
+        self.journal.reject(batch["ids"], str(error))
+        self.stats["rejected"] += len(batch["ids"])
+        self.results.put({
+            "operation": batch["operation"],
+            "error": str(error),
+            "count": len(batch["ids"]),
+        })
@@ -0,0 +1,42 @@
+import json
+import sys
+import time
+from datetime import datetime
+
+
+class StartupReport:
+    """
+    Times the steps from launch to the first page of records on screen,
+    e.g. "imports", "window shown", "first paint", "first page".
+    Run the app with --startup-report to print it (and append it as one
+    JSON line to a file, if one is given: --startup-report=startup.jsonl).
+
+    start: time.perf_counter() taken as early as possible in main.py
+    """
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.steps = []  # [(step, ms since start), ...]
+
+    def mark(self, step):
+        self.steps.append((step, (time.perf_counter() - self.start) * 1000))
+
+    def as_dict(self):
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "steps_ms": {step: round(ms, 1) for step, ms in self.steps},
+        }
+
+    def format(self):
+        lines = ["Startup (ms since launch):"]
+        previous = 0
+        for step, ms in self.steps:
+            lines.append(f"  {ms:8.1f}  (+{ms - previous:7.1f})  {step}")
+            previous = ms
+        return "\n".join(lines)
+
+    def report(self, path=None):
+        print(self.format(), file=sys.stderr)
+        if path:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.as_dict()) + "\n")
@@ -0,0 +1,260 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+def payload_bytes(records):
+    """Rough size of a result as text (what "bytes" means in a span)."""
+    return sum(len(str(value)) for row in records for value in row if value is not None)
+
+
+class _NullSpan:
+    """What span() hands out while tracing is off: accepts and ignores everything."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def __bool__(self):
+        return False  # So "if span:" skips work only needed for tracing
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span(dict):
+    """
+    One timed operation. It is a dict of details (rows, bytes, ...) that
+    the code being timed can fill in before the block ends.
+    """
+
+    __slots__ = ("tracer", "name", "category", "start")
+
+    def __init__(self, tracer, name, category, details):
+        super().__init__(details)
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.start = 0
+
+    def __bool__(self):
+        return True  # Even with no details yet (see _NullSpan)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self.start
+        if exc is not None:
+            self["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._record(self.name, self.category, self.start, duration, dict(self))
+        return False
+
+
+class Tracer:
+    """
+    Records how long database calls and UI updates take (connect, execute,
+    fetch, render...), with row counts and sizes, in a fixed-size ring buffer.
+
+    Off by default; while off, span() returns a shared do-nothing object,
+    so instrumented code pays one attribute check per call.
+    Turn it on with TRACE_ENABLED=1 in .env or from the diagnostics dialog
+    (Ctrl+Shift+D). TRACE_LOG_PATH also writes every span to a rotating log.
+
+    Each event: {'name', 'category', 'start_ns', 'duration_ns', 'thread', 'tid',
+                 'details'}
+    """
+
+    def __init__(self, capacity=5000):
+        self.enabled = False
+        self._events = deque(maxlen=capacity)
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def configure(
+        self, enabled=None, capacity=None, log_path=None, log_max_bytes=1_000_000,
+        log_backups=3,
+    ):
+        with self._lock:
+            if capacity is not None and capacity != self._events.maxlen:
+                self._events = deque(self._events, maxlen=capacity)
+            if log_path:
+                # Imported here: logging costs start-up time and is rarely used
+                import logging
+                from logging.handlers import RotatingFileHandler
+
+                logger = logging.getLogger("data_entry.trace")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+                handler = RotatingFileHandler(
+                    log_path, maxBytes=log_max_bytes, backupCount=log_backups,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                logger.addHandler(handler)
+                self._logger = logger
+        if enabled is not None:
+            self.enabled = enabled
+
+    def configure_from_env(self, environ=os.environ):
+        """Reads TRACE_ENABLED, TRACE_BUFFER_SIZE and TRACE_LOG_PATH."""
+        self.configure(
+            enabled=environ.get("TRACE_ENABLED", "").strip().lower()
+            in ("1", "true", "yes"),
+            capacity=int(environ.get("TRACE_BUFFER_SIZE", "5000")),
+            log_path=environ.get("TRACE_LOG_PATH") or None,
+        )
+
+    # --- Recording ---
+
+    def span(self, name, category="data", **details):
+        """
+        Times a 'with' block:
+            with tracer.span("fetch", "db") as span:
+                records = cursor.fetchall()
+                span["rows"] = len(records)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, details)
+
+    def instant(self, name, category="data", **details):
+        """Records a point-in-time event (e.g. an error) with no duration."""
+        if self.enabled:
+            self._record(name, category, time.perf_counter_ns(), 0, details)
+
+    def _record(self, name, category, start_ns, duration_ns, details):
+        event = {
+            "name": name,
+            "category": category,
+            "start_ns": start_ns - self._origin,
+            "duration_ns": duration_ns,
+            "thread": threading.current_thread().name,
+            "tid": threading.get_ident(),
+            "details": details,
+        }
+        self._events.append(event)  # deque.append is thread-safe
+        if self._logger is not None:
+            self._logger.info(
+                "%s %s %.2fms %s", category, name, duration_ns / 1e6,
+                json.dumps(details, default=str),
+            )
+
+    # --- Reading ---
+
+    def events(self):
+        """A copy of the buffered events, oldest first."""
+        return list(self._events)
+
+    def clear(self):
+        self._events.clear()
+
+    def summary(self):
+        """
+        Per operation: [{'category', 'name', 'count', 'total_ms', 'mean_ms',
+                         'p95_ms', 'max_ms', 'rows', 'errors'}, ...]
+        slowest total first
+        """
+        groups = {}
+        for event in self.events():
+            groups.setdefault((event["category"], event["name"]), []).append(event)
+
+        rows = []
+        for (category, name), events in groups.items():
+            durations = sorted(e["duration_ns"] / 1e6 for e in events)
+            rows.append({
+                "category": category,
+                "name": name,
+                "count": len(events),
+                "total_ms": sum(durations),
+                "mean_ms": sum(durations) / len(durations),
+                "p95_ms": durations[min(len(durations) - 1,
+                                        int(len(durations) * 0.95))],
+                "max_ms": durations[-1],
+                "rows": sum(e["details"].get("rows", 0) for e in events),
+                "errors": sum(1 for e in events if "error" in e["details"]),
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def chrome_trace(self):
+        """The events in Chrome's trace format (chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        trace = []
+        threads = {}
+        for event in self.events():
+            threads[event["tid"]] = event["thread"]
+            trace.append({
+                "name": event["name"],
+                "cat": event["category"],
+                "ph": "X" if event["duration_ns"] else "i",
+                "ts": event["start_ns"] / 1000,  # Microseconds
+                "dur": event["duration_ns"] / 1000,
+                "pid": pid,
+                "tid": event["tid"],
+                "args": event["details"],
+            })
+        # Name the rows in the viewer after the threads
+        for tid, thread_name in threads.items():
+            trace.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": thread_name},
+            })
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+
+# The app's one tracer (configured from .env by DataManager)
+tracer = Tracer()
+
+
+def traced(name=None, category="data"):
+    """
+    Decorator: times every call of the function as a span.
+    Results shaped like (headers, records, ...) or {'written': [...]} also
+    get their row count and size recorded.
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(label, category) as span:
+                result = fn(*args, **kwargs)
+                records = _result_records(result)
+                if records is not None:
+                    span["rows"] = len(records)
+                    span["bytes"] = payload_bytes(records)
+                return result
+        return wrapper
+    return decorate
+
+
+def _result_records(result):
+    """The list of rows in a DataManager result, if it has one."""
+    if isinstance(result, tuple) and len(result) >= 2 and isinstance(result[1], list):
+        return result[1]
+    if isinstance(result, dict) and isinstance(result.get("written"), list):
+        return result["written"]
+    return None
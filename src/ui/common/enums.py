@@ -4,4 +4,21 @@ class FieldType(Enum):
     READONLY = auto()
     TEXT = auto()
     DATE = auto()
-    SEX_COMBOBOX = auto()
\ No newline at end of file
+    SEX_COMBOBOX = auto()
+
+
+class MatchMode(Enum):
+    EXACT = auto()     # Col = 'term'          (index seek)
+    PREFIX = auto()    # Col LIKE 'term%'      (index seek)
+    CONTAINS = auto()  # Col LIKE '%term%'     (full scan - use sparingly)
+    FULLTEXT = auto()  # CONTAINS(Col, 'term*') (needs a full-text index)
+
+
+class DuplicateCheck(Enum):
+    NAME = auto()   # Sounds alike (Soundex) and spelled alike (trigrams)
+    DATE = auto()   # Same date, or day/month swapped, or 2 of 3 parts equal
+    EXACT = auto()  # Same value (ignoring case and spaces)
+
+
+class CellState(Enum):
+    NOT_LOADED = auto()  # A wide column's value, fetched when its cell is opened
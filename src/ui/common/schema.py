@@ -1,4 +1,5 @@
-from src.ui.common.enums import FieldType
+from datetime import date
+from src.ui.common.enums import DuplicateCheck, FieldType, MatchMode
 
 # "Single Source of Truth" for  column definitions.
 COLUMN_MAP = {
@@ -31,10 +32,49 @@ INSERT_FIELDS = [
     "Status"
 ]
 
+# --- GRID CONFIGURATION ---
+# Which columns the table shows (None = all of them). Only these are read
+# from the database, plus the Primary Key, StatusDate and sort columns
+# (fetched but hidden unless listed here). Columns keep the table's order.
+# Wide columns (notes, binary) are fetched one cell at a time, when opened.
+GRID_COLUMNS = None
+
 # --- SEARCH CONFIGURATION ---
-# Define which columns get a search box in the UI.
+# Define which columns get a search box in the UI, and how each one matches.
 # Order matters: They will appear left-to-right.
-SEARCH_FIELDS = ["Surname", "FirstName", "FamilySerial", "CohortMemberID"]
+# EXACT and PREFIX can use an index on the column; CONTAINS has to read
+# every row; FULLTEXT only works if the column has a full-text index.
+SEARCH_FIELDS = {
+    "Surname": MatchMode.PREFIX,
+    "FirstName": MatchMode.PREFIX,
+    "FamilySerial": MatchMode.PREFIX,
+    "CohortMemberID": MatchMode.EXACT,
+}
+
+# --- VALIDATION CONFIGURATION ---
+# Checks on top of each column's FieldType, applied the same way to grid
+# saves, new records and imports (see validation.py):
+#   "required": True       - can't be left empty
+#   "min" / "max"          - lowest/highest value (a function is called
+#                            each time, e.g. date.today)
+#   "choices": [...]       - the only values allowed
+#   "max_length": n        - normally read from the database instead
+FIELD_RULES = {
+    "Surname": {"required": True},
+    "DateOfBirth": {"min": date(1900, 1, 1), "max": date.today},
+}
+
+# --- DUPLICATE CHECK CONFIGURATION ---
+# Columns compared with existing records when a new one is added, how each
+# one is compared, and how much it counts towards the match score.
+# Candidates share a Soundex code of a NAME column plus the year of a DATE
+# column, two NAME codes, or an EXACT value (see duplicate_index.py).
+DUPLICATE_FIELDS = {
+    "Surname": (DuplicateCheck.NAME, 0.35),
+    "FirstName": (DuplicateCheck.NAME, 0.25),
+    "DateOfBirth": (DuplicateCheck.DATE, 0.25),
+    "FamilySerial": (DuplicateCheck.EXACT, 0.15),
+}
 
 
 # --- TEMPORARY TEST SCHEMA ---
@@ -1,6 +1,27 @@
+from datetime import date, datetime
 from PyQt6.QtWidgets import QLineEdit, QComboBox, QDateEdit
 from PyQt6.QtCore import QDate
-from .enums import FieldType
+from .enums import CellState, FieldType
+
+# Shown for a wide column's value until its cell is opened
+NOT_LOADED_TEXT = "..."
+
+
+def display_text(value):
+    """
+    Converts a database value into the text shown in the table.
+    This is also the form used to compare the table against the snapshot.
+    """
+    if value is None:
+        return ""
+    if value is CellState.NOT_LOADED:
+        return NOT_LOADED_TEXT
+    if isinstance(value, datetime):
+        return str(value)
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return str(value).strip()
+
 
 class WidgetFactory:
     @staticmethod
@@ -9,51 +30,63 @@ class WidgetFactory:
         Factory that creates and populates a widget based on FieldType.
         Returns: The configured widget (QComboBox, QDateEdit, or QLineEdit).
         """
-        
+
         # --- 1. COMBOBOX ---
         if field_type == FieldType.SEX_COMBOBOX:
             widget = QComboBox()
             widget.addItems(["", "M", "F"])
-            if value:
-                widget.setCurrentText(str(value).strip())
-            return widget
 
         # --- 2. DATE EDIT ---
         elif field_type == FieldType.DATE:
             widget = QDateEdit()
             widget.setDisplayFormat("yyyy-MM-dd")
             widget.setCalendarPopup(True)
-            
-            # -- data handling --
-            if not value:
-                # Case 1: Value is Empty/None -> Default to Today
-                widget.setDate(QDate.currentDate())
-            
-            elif isinstance(value, str):
-                # Case 2: It's a String (e.g. from SQLite) -> Parse it
-                qdate = QDate.fromString(value, "yyyy-MM-dd")
-                if qdate.isValid():
-                    widget.setDate(qdate)
-                else:
-                    # String was garbage? Default to Today
-                    widget.setDate(QDate.currentDate())
+            # The lowest date stands for "no date" and shows as a blank box
+            widget.setSpecialValueText(" ")
 
-            else:
-                # Case 3: It's a Python Date/Datetime Object (e.g. from Postgres)
-                try:
-                    widget.setDate(QDate(value.year, value.month, value.day))
-                except AttributeError:
-                    # Case 4: It's some unknown type -> Default to Today to prevent crash
-                    print(f"Warning: Could not convert {type(value)} to QDate")
-                    widget.setDate(QDate.currentDate())
-            return widget
-        
         # --- 3. TEXT ---
         else:
             widget = QLineEdit()
-            if value:
-                widget.setText(str(value))
-            return widget
+
+        WidgetFactory.set_widget_value(widget, value)
+        return widget
+
+    @staticmethod
+    def set_widget_value(widget, value):
+        """Puts a database value into a widget made by create_widget."""
+
+        # --- 1. COMBOBOX ---
+        if isinstance(widget, QComboBox):
+            widget.setCurrentText(str(value).strip() if value else "")
+
+        # --- 2. DATE EDIT ---
+        elif isinstance(widget, QDateEdit):
+            qdate = WidgetFactory.to_qdate(value)
+            if qdate is None:
+                # Empty, or not a date: show a blank box rather than a made-up
+                # date. Unreadable text is handed back as it was by
+                # extract_value (unless a date is picked), so it isn't lost.
+                widget.setDate(widget.minimumDate())
+                widget.unreadable_value = str(value).strip() if value else ""
+            else:
+                widget.setDate(qdate)
+                widget.unreadable_value = ""
+
+        # --- 3. TEXT ---
+        else:
+            widget.setText(display_text(value))
+
+    @staticmethod
+    def to_qdate(value):
+        """A QDate from a date/datetime or "yyyy-mm-dd..." text, or None."""
+        if not value:
+            return None
+        if isinstance(value, str):
+            qdate = QDate.fromString(value.strip()[:10], "yyyy-MM-dd")
+            return qdate if qdate.isValid() else None
+        if isinstance(value, (date, datetime)):
+            return QDate(value.year, value.month, value.day)
+        return None
 
     @staticmethod
     def extract_value(obj):
@@ -62,11 +95,12 @@ class WidgetFactory:
         if isinstance(obj, QComboBox):
             return obj.currentText()
         if isinstance(obj, QDateEdit):
+            if obj.date() == obj.minimumDate():
+                return getattr(obj, "unreadable_value", "")  # Left blank
             return obj.date().toString("yyyy-MM-dd")
         #  Handle Standard Items (QLineEdit, QTableWidgetItem, etc.)
         if hasattr(obj, 'text'):
             return obj.text().strip()
-            
+
         #  Final Fallback: If it's not None, but not a known text type
         return ""
-        
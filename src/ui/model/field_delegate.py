@@ -0,0 +1,25 @@
+from PyQt6.QtWidgets import QStyledItemDelegate
+from PyQt6.QtCore import Qt
+from src.ui.common.ui_helpers import WidgetFactory
+
+
+class FieldTypeDelegate(QStyledItemDelegate):
+    """
+    Creates the right editor (QLineEdit/QComboBox/QDateEdit) for a cell,
+    but only while that cell is being edited. Every other cell is just painted.
+    """
+
+    def createEditor(self, parent, option, index):
+        field_type = index.model().field_type(index.column())
+        editor = WidgetFactory.create_widget(field_type)
+        editor.setParent(parent)
+        return editor
+
+    def setEditorData(self, editor, index):
+        WidgetFactory.set_widget_value(editor, index.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, WidgetFactory.extract_value(editor))
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
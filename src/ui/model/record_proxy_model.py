@@ -0,0 +1,345 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from PyQt6.QtCore import QAbstractProxyModel, QModelIndex, Qt
+from src.ui.common.enums import FieldType, MatchMode
+
+# Numeric text: IDs like "0042" sort as 42, "F0042" stays text
+_NUMBER = re.compile(r"[+-]?\d+(\.\d+)?")
+
+# Dates stored as text (SQLite, CSV): ISO text sorts in date order as it is
+_ISO_DATE = re.compile(r"\d{4}-\d\d-\d\d")
+
+_NUMBER_GROUP, _DATE_GROUP, _TEXT_GROUP = 0, 1, 2
+
+
+def sort_key(value, is_date=False):
+    """
+    Typed sort key for one cell: numbers (and numeric text) sort as numbers,
+    dates as dates, everything else as case-insensitive text.
+    Mixed columns sort numbers first, then dates, then text.
+    Returns None for blanks, which always go last.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return (_NUMBER_GROUP, value)
+    if isinstance(value, datetime):
+        return (_DATE_GROUP, value.isoformat(" "))
+    if isinstance(value, date):
+        return (_DATE_GROUP, value.isoformat())
+
+    text = value.strip() if isinstance(value, str) else str(value).strip()
+    if not text:
+        return None
+    # Cheapest checks first: this runs once per cell of a sorted column
+    if text.isdigit() and text.isascii():
+        return (_NUMBER_GROUP, int(text))
+    if is_date and _ISO_DATE.match(text):
+        return (_DATE_GROUP, text.replace("T", " ", 1))
+    if text[0] in "+-0123456789" and _NUMBER.fullmatch(text):
+        return (_NUMBER_GROUP, float(text))
+    return (_TEXT_GROUP, text.casefold())
+
+
+def filter_text(value):
+    """A cell as the quick filters see it (same as search_cache.matches)."""
+    return None if value is None else str(value).strip().casefold()
+
+
+class RecordProxyModel(QAbstractProxyModel):
+    """
+    Sorts and filters the loaded rows in memory, in front of a
+    RecordTableModel, so clicking a header or typing in a search box
+    needs no new query.
+
+    Instead of comparing cells one pair at a time (QSortFilterProxyModel
+    calls back into Python for every comparison), each column's sort keys
+    and filter text are worked out once, kept until its cells change, and
+    the whole order is computed with one sorted() call.
+
+    Edited rows stay where they are until the next sort or filter, so a
+    row doesn't jump away while the user is working on it.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # Current sort (-1 = the order the rows were loaded in)
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+        # {col_idx: (MatchMode, normalized term)} - a row must match them all
+        self.filters = {}
+
+        # Proxy row -> source row, and back (None = same as the source)
+        self._rows = None
+        self._source_rows = None
+
+        # Per-column caches: {col_idx: [value per source row]}
+        self._sort_keys = {}
+        self._filter_texts = {}
+
+        # Every source row in the current sort order (reused while filtering)
+        self._sorted = None
+
+    def setSourceModel(self, source):
+        old = self.sourceModel()
+        if old is not None:
+            old.modelAboutToBeReset.disconnect(self._on_about_to_be_reset)
+            old.modelReset.disconnect(self._on_reset)
+            old.rowsAboutToBeInserted.disconnect(self._on_rows_about_to_be_inserted)
+            old.rowsInserted.disconnect(self._on_rows_inserted)
+            old.dataChanged.disconnect(self._on_data_changed)
+            old.headerDataChanged.disconnect(self.headerDataChanged)
+
+        self.beginResetModel()
+        super().setSourceModel(source)
+        self._forget()
+        self._remap()
+        self.endResetModel()
+
+        source.modelAboutToBeReset.connect(self._on_about_to_be_reset)
+        source.modelReset.connect(self._on_reset)
+        source.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        source.rowsInserted.connect(self._on_rows_inserted)
+        source.dataChanged.connect(self._on_data_changed)
+        source.headerDataChanged.connect(self.headerDataChanged)
+
+    # --- Sorting and filtering ---
+
+    @property
+    def is_identity(self):
+        """True when rows show in load order, unfiltered."""
+        return self.sort_column < 0 and not self.filters
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Called by the view when a header is clicked (column -1 = unsorted)."""
+        self.sort_column = column
+        self.sort_order = order
+        self._sorted = None
+        self._relayout()
+
+    def set_filters(self, filters):
+        """
+        filters: {col_idx: (MatchMode, term)}, terms already stripped and
+        casefolded (see SearchCache.normalize). {} shows every row.
+        Returns: how many rows now show
+        """
+        self.filters = dict(filters)
+        self._relayout()
+        return self.rowCount()
+
+    def field_type(self, col_idx):
+        return self.sourceModel().field_type(col_idx)
+
+    def _compute_rows(self):
+        """Which source rows to show, in order (None = all, in load order)."""
+        if self.is_identity:
+            return None
+
+        source = self.sourceModel()
+        row_count = source.rowCount()
+        if self.sort_column >= source.columnCount():
+            self.sort_column = -1  # The columns changed under us
+
+        if self.sort_column >= 0:
+            if self._sorted is None:
+                self._sorted = self._sort_order(self.sort_column, row_count)
+            rows = self._sorted
+        else:
+            rows = range(row_count)
+
+        for col_idx, (mode, term) in self.filters.items():
+            texts = self._column_texts(col_idx)
+            if mode == MatchMode.EXACT:
+                rows = [i for i in rows if texts[i] == term]
+            elif mode == MatchMode.PREFIX:
+                rows = [i for i in rows if texts[i] is not None
+                        and texts[i].startswith(term)]
+            else:
+                # CONTAINS (FULLTEXT never reaches here - the Presenter
+                # leaves it to the server)
+                rows = [i for i in rows if texts[i] is not None and term in texts[i]]
+        return list(rows)
+
+    def _sort_order(self, col_idx, row_count):
+        keys = self._column_keys(col_idx)
+        filled = [i for i in range(row_count) if keys[i] is not None]
+        blanks = [i for i in range(row_count) if keys[i] is None]
+        # sorted() is stable both ways, so equal keys keep their load order
+        filled.sort(
+            key=keys.__getitem__,
+            reverse=self.sort_order == Qt.SortOrder.DescendingOrder,
+        )
+        return filled + blanks
+
+    def _column_keys(self, col_idx):
+        keys = self._sort_keys.get(col_idx)
+        if keys is None:
+            keys = self._sort_keys[col_idx] = self._keys_for(
+                col_idx, self._column(col_idx)
+            )
+        return keys
+
+    def _column_texts(self, col_idx):
+        texts = self._filter_texts.get(col_idx)
+        if texts is None:
+            texts = self._filter_texts[col_idx] = self._texts_for(
+                col_idx, self._column(col_idx)
+            )
+        return texts
+
+    def _keys_for(self, col_idx, values):
+        is_date = self.field_type(col_idx) == FieldType.DATE
+        return [sort_key(value, is_date) for value in values]
+
+    def _texts_for(self, col_idx, values):
+        return [filter_text(value) for value in values]
+
+    def _caches(self):
+        """Each per-column cache with the function that fills it."""
+        return (
+            (self._sort_keys, self._keys_for),
+            (self._filter_texts, self._texts_for),
+        )
+
+    def _column(self, col_idx):
+        return self.sourceModel().store.columns[col_idx]
+
+    def _remap(self):
+        self._rows = self._compute_rows()
+        if self._rows is None:
+            self._source_rows = None
+            return
+        source_rows = [-1] * self.sourceModel().rowCount()
+        for proxy_row, source_row in enumerate(self._rows):
+            source_rows[source_row] = proxy_row
+        self._source_rows = source_rows
+
+    def _relayout(self):
+        """Recomputes the rows shown, keeping the selection and current cell."""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        sources = [self.mapToSource(index) for index in persistent]
+        self._remap()
+        self.changePersistentIndexList(
+            persistent, [self.mapFromSource(index) for index in sources]
+        )
+        self.layoutChanged.emit()
+
+    def _forget(self, col_idx=None):
+        """Drops cached keys/text (for one column, or all of them)."""
+        if col_idx is None:
+            self._sort_keys.clear()
+            self._filter_texts.clear()
+        else:
+            self._sort_keys.pop(col_idx, None)
+            self._filter_texts.pop(col_idx, None)
+        if col_idx is None or col_idx == self.sort_column:
+            self._sorted = None
+
+    # --- Following the source model ---
+
+    def _on_about_to_be_reset(self):
+        self.beginResetModel()
+
+    def _on_reset(self):
+        self._forget()
+        self._remap()
+        self.endResetModel()
+
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        if self.is_identity:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        # Extend the caches for just the new rows (pages arrive at the end)
+        for cache, build in self._caches():
+            for col_idx, values in list(cache.items()):
+                if len(values) == first:
+                    values.extend(build(col_idx, self._column(col_idx)[first:]))
+                else:
+                    del cache[col_idx]
+        self._sorted = None
+
+        if self.is_identity:
+            self.endInsertRows()
+        else:
+            self._relayout()  # Sort/filter the new rows into place
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        first_row, last_row = top_left.row(), bottom_right.row()
+        first_col, last_col = top_left.column(), bottom_right.column()
+
+        # Refresh the cached keys of the changed cells
+        for col_idx in range(first_col, last_col + 1):
+            for cache, build in self._caches():
+                values = cache.get(col_idx)
+                if values is not None:
+                    values[first_row:last_row + 1] = build(
+                        col_idx, self._column(col_idx)[first_row:last_row + 1]
+                    )
+            if col_idx == self.sort_column:
+                self._sorted = None
+
+        # Repaint wherever those rows are showing now
+        for row_idx in range(first_row, last_row + 1):
+            proxy_row = self._proxy_row(row_idx)
+            if proxy_row >= 0:
+                self.dataChanged.emit(
+                    self.index(proxy_row, first_col),
+                    self.index(proxy_row, last_col),
+                    roles,
+                )
+
+    def _proxy_row(self, source_row):
+        if self._source_rows is None:
+            return source_row
+        return self._source_rows[source_row]
+
+    # --- QAbstractProxyModel interface ---
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row()
+        if self._rows is not None:
+            row = self._rows[row]
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self._proxy_row(source_index.row())
+        if row < 0:
+            return QModelIndex()  # Filtered out
+        return self.index(row, source_index.column())
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        if self._rows is None:
+            return self.sourceModel().rowCount()
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        # Row numbers are the row's place in the loaded order, so they
+        # stay with the row when it is sorted
+        if orientation == Qt.Orientation.Vertical and self._rows is not None:
+            if 0 <= section < len(self._rows):
+                section = self._rows[section]
+        return self.sourceModel().headerData(section, orientation, role)
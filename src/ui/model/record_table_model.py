@@ -0,0 +1,218 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtGui import QBrush
+from src.ui.common.enums import CellState, FieldType
+from src.ui.common.schema import COLUMN_MAP
+from src.ui.common.ui_helpers import display_text
+from src.ui.model.row_store import RowStore
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Qt model over a RowStore.
+    The view only asks for the cells it is drawing, so the cost of showing
+    the table depends on the visible rows, not how many rows are loaded.
+    """
+
+    # Emitted when the view scrolls to the bottom and more rows exist
+    more_rows_requested = pyqtSignal()
+
+    READONLY_BRUSH = QBrush(Qt.GlobalColor.lightGray)
+    EDITED_BRUSH = QBrush(Qt.GlobalColor.yellow)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = RowStore()
+        self.field_types = []
+
+        # {column: FieldType} from DataManager.field_types(); columns it
+        # doesn't cover fall back to COLUMN_MAP, then TEXT
+        self.column_types = {}
+
+        # Set by the Presenter (via the View) when another page is available
+        self.more_available = False
+
+    # --- Loading data ---
+
+    def set_data(self, headers, rows):
+        """Replaces everything in the model."""
+        self.beginResetModel()
+        self.store = RowStore(headers, rows)
+        self.field_types = [
+            self.column_types.get(col) or COLUMN_MAP.get(col, FieldType.TEXT)
+            for col in headers
+        ]
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Adds a page of rows to the bottom."""
+        if not rows:
+            return
+        start_row = self.store.row_count
+        self.beginInsertRows(QModelIndex(), start_row, start_row + len(rows) - 1)
+        self.store.append_rows(rows)
+        self.endInsertRows()
+
+    def update_rows(self, key_column, headers, rows, skip_edited=False):
+        """
+        Patches rows in place, matched on key_column (e.g. with the rows a
+        save just wrote). Scroll position and other edits are kept.
+        skip_edited: leave rows with unsaved edits alone (their Save still
+        needs the StatusDate they were loaded with)
+        Returns: the rows whose key isn't loaded
+        """
+        store = self.store
+        if key_column not in store.headers or key_column not in headers:
+            return list(rows)
+        key_idx = store.headers.index(key_column)
+        row_key_idx = headers.index(key_column)
+        positions = [headers.index(col) if col in headers else None
+                     for col in store.headers]
+
+        missing = []
+        for row in rows:
+            row_idx = store.find_row(key_idx, row[row_key_idx])
+            if row_idx is None:
+                missing.append(row)
+                continue
+            if skip_edited and store.is_row_dirty(row_idx):
+                continue
+            store.replace_row(row_idx, [
+                row[pos] if pos is not None else store.value(row_idx, col_idx)
+                for col_idx, pos in enumerate(positions)
+            ])
+            self._row_changed(row_idx)
+        return missing
+
+    def load_cells(self, key_column, key, values):
+        """
+        Fills in cells fetched later ({column: value}, e.g. a wide column
+        opened by the user) on the row with this key, leaving its edits alone.
+        Returns: the row's index, or None if it isn't loaded
+        """
+        store = self.store
+        row_idx = store.find_row(store.headers.index(key_column), key)
+        if row_idx is None:
+            return None
+        for col, value in values.items():
+            if col in store.headers:
+                store.load_value(row_idx, store.headers.index(col), value)
+        self._row_changed(row_idx)
+        return row_idx
+
+    def is_loaded(self, row_idx, col_idx):
+        """False while a wide column's cell is still waiting to be fetched."""
+        return self.store.value(row_idx, col_idx) is not CellState.NOT_LOADED
+
+    def revert_rows(self, key_column, keys):
+        """Throws away the edits on the rows with these keys."""
+        key_idx = self.store.headers.index(key_column)
+        for key in keys:
+            row_idx = self.store.find_row(key_idx, key)
+            if row_idx is not None:
+                self.store.revert_row(row_idx)
+                self._row_changed(row_idx)
+
+    def apply_saved(self, key_column, sent, headers=None, rows=None):
+        """
+        Takes in a save of the rows in sent (as from get_changed_rows), so
+        only the cells that were sent change: to their value in rows (as
+        now stored, with the new StatusDate), or with rows=None (queued,
+        nothing stored yet) to the value sent. Rows that weren't written
+        (e.g. conflicts) are left alone, and cells edited again while the
+        save ran keep their newer value.
+        """
+        store = self.store
+        key_idx = store.headers.index(key_column)
+        if rows is not None:
+            row_key_idx = headers.index(key_column)
+            stored_rows = {row[row_key_idx]: row for row in rows}
+
+        for row_dict in sent:
+            row_idx = store.find_row(key_idx, row_dict[key_column])
+            if row_idx is None:
+                continue
+            values = {
+                store.headers.index(col): value for col, value in row_dict.items()
+                if col != key_column and col in store.headers
+            }
+            if rows is None:
+                stored = values
+            elif row_dict[key_column] in stored_rows:
+                row = stored_rows[row_dict[key_column]]
+                stored = {
+                    col_idx: row[headers.index(store.headers[col_idx])]
+                    for col_idx in values if store.headers[col_idx] in headers
+                }
+            else:
+                continue
+            store.apply_saved(row_idx, values, stored)
+            self._row_changed(row_idx)
+
+    def _row_changed(self, row_idx):
+        self.dataChanged.emit(
+            self.index(row_idx, 0), self.index(row_idx, self.columnCount() - 1)
+        )
+
+    def field_type(self, col_idx):
+        return self.field_types[col_idx]
+
+    # --- Lazy fetching (called by the view as the user scrolls) ---
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.more_available
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self.more_rows_requested.emit()
+
+    # --- QAbstractTableModel interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.store.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.store.headers[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return display_text(self.store.value(index.row(), index.column()))
+
+        if role == Qt.ItemDataRole.EditRole:
+            return self.store.value(index.row(), index.column())
+
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if self.field_types[index.column()] == FieldType.READONLY:
+                return self.READONLY_BRUSH
+            if self.store.is_dirty(index.row(), index.column()):
+                return self.EDITED_BRUSH
+
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if (
+            index.isValid()
+            and self.field_types[index.column()] != FieldType.READONLY
+            and self.is_loaded(index.row(), index.column())
+        ):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        self.store.set_value(index.row(), index.column(), value)
+        self.dataChanged.emit(
+            index, index, [role, Qt.ItemDataRole.BackgroundRole]
+        )
+        return True
@@ -0,0 +1,258 @@
+import sys
+from array import array
+from src.ui.common.ui_helpers import display_text
+
+_INT_MIN, _INT_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+class CodedColumn:
+    """
+    A column with few distinct values (Sex, Title, Status...): each value is
+    kept once and every cell is a 1-byte code pointing at it.
+    Behaves like a list for what RowStore and the proxy model need.
+    """
+
+    # More distinct values than this and it is no longer worth it
+    # (RowStore turns it back into a plain list)
+    MAX_VALUES = 255
+
+    __slots__ = ("values", "code_of", "codes")
+
+    def __init__(self, values=()):
+        self.values = []  # code -> value
+        self.code_of = {}  # (type, value) -> code; type keeps 1, 1.0 and True apart
+        self.codes = array("B")
+        self.extend(values)
+
+    def accepts(self, values):
+        """True if values fit (hashable, and not too many new distinct ones)."""
+        try:
+            new = {(type(value), value) for value in values} - self.code_of.keys()
+        except TypeError:
+            return False  # Unhashable
+        return len(self.values) + len(new) <= self.MAX_VALUES
+
+    def _code(self, value):
+        key = (type(value), value)
+        code = self.code_of.get(key)
+        if code is None:
+            code = self.code_of[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def extend(self, values):
+        self.codes.extend(map(self._code, values))
+
+    def index(self, value):
+        try:
+            code = self.code_of[(type(value), value)]
+        except (KeyError, TypeError):
+            raise ValueError(f"{value!r} is not in column") from None
+        return self.codes.index(code)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.values[code] for code in self.codes[idx]]
+        return self.values[self.codes[idx]]
+
+    def __setitem__(self, idx, value):
+        self.codes[idx] = self._code(value)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self.codes)
+
+
+def _all_ints(values):
+    return all(type(value) is int for value in values) and (
+        not values or (min(values) >= _INT_MIN and max(values) <= _INT_MAX)
+    )
+
+
+class RowStore:
+    """
+    Compact column-oriented storage for the loaded records. It is the one
+    copy of the rows: the Presenter reads it through the View instead of
+    keeping its own.
+
+    Each column is the cheapest container its first rows fit in:
+    - whole numbers (RecID...): array('q'), 8 bytes a cell instead of a
+      pointer plus an int object
+    - few distinct values (Sex, Title, Status...): a CodedColumn, 1 byte a cell
+    - anything else: a plain list
+    A column falls back to a plain list the first time a value doesn't fit.
+    """
+
+    # First-page columns with at most this many distinct values are coded
+    CODED_MAX_DISTINCT = 32
+
+    def __init__(self, headers=None, rows=None):
+        self.headers = list(headers or [])
+        self.columns = [[] for _ in self.headers]
+
+        # Dirty-cell tracking: {(row_idx, col_idx): value as originally loaded}
+        self.edited = {}
+
+        if rows:
+            self.append_rows(rows)
+
+    @property
+    def row_count(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def append_rows(self, rows):
+        """Adds rows (list of lists, same order as headers) to the end."""
+        if not rows:
+            return
+        first = self.row_count == 0
+        # zip(*rows) turns the rows inside out: one tuple per column
+        for col_idx, values in enumerate(zip(*rows)):
+            if first:
+                self.columns[col_idx] = self._new_column(values)
+            else:
+                self._fit(col_idx, values).extend(values)
+
+    def _new_column(self, values):
+        """Picks the container for a column from its first rows."""
+        if _all_ints(values):
+            return array("q", values)
+        try:
+            distinct = len(set(values))
+        except TypeError:
+            return list(values)  # Unhashable values
+        if distinct <= self.CODED_MAX_DISTINCT and distinct * 2 <= len(values):
+            return CodedColumn(values)
+        return list(values)
+
+    def _fit(self, col_idx, values):
+        """The column, turned into a plain list first if values don't fit it."""
+        column = self.columns[col_idx]
+        if isinstance(column, list):
+            return column
+        if isinstance(column, array):
+            fits = _all_ints(values)
+        else:
+            fits = column.accepts(values)
+        if not fits:
+            column = self.columns[col_idx] = list(column)
+        return column
+
+    def value(self, row_idx, col_idx):
+        return self.columns[col_idx][row_idx]
+
+    def set_value(self, row_idx, col_idx, value):
+        """Changes a cell and remembers whether it now differs from the original."""
+        key = (row_idx, col_idx)
+        original = self.edited.get(key, self.columns[col_idx][row_idx])
+
+        # Compare as displayed text, so a date and "yyyy-mm-dd" count as equal
+        if display_text(value) == display_text(original):
+            self.edited.pop(key, None)  # Edited back to how it was
+        else:
+            self.edited[key] = original
+
+        self._fit(col_idx, (value,))[row_idx] = value
+
+    def load_value(self, row_idx, col_idx, value):
+        """Fills in a cell fetched later (e.g. a wide column), not marked as edited."""
+        self._fit(col_idx, (value,))[row_idx] = value
+
+    def find_row(self, col_idx, value):
+        """Index of the first row holding value in col_idx, or None."""
+        try:
+            return self.columns[col_idx].index(value)
+        except (ValueError, TypeError):  # TypeError: e.g. text in an int array
+            return None
+
+    def replace_row(self, row_idx, values):
+        """Overwrites a row with fresh values from the database (drops its edits)."""
+        for col_idx, value in enumerate(values[:len(self.columns)]):
+            self._fit(col_idx, (value,))[row_idx] = value
+            self.edited.pop((row_idx, col_idx), None)
+
+    def revert_row(self, row_idx):
+        """Puts a row's edited cells back to how they were loaded."""
+        for row, col_idx in [key for key in self.edited if key[0] == row_idx]:
+            original = self.edited.pop((row, col_idx))
+            self._fit(col_idx, (original,))[row] = original
+
+    def apply_saved(self, row_idx, sent, stored):
+        """
+        Takes in a save of some of a row's cells: sent {col_idx: value as
+        sent}, stored {col_idx: value as now stored}. A cell edited again
+        while the save ran keeps its newer value and stays edited (against
+        the stored value); the row's other cells aren't touched.
+        """
+        for col_idx, value in stored.items():
+            key = (row_idx, col_idx)
+            current = self.columns[col_idx][row_idx]
+            edited_since = key in self.edited and col_idx in sent and (
+                display_text(current) != display_text(sent[col_idx])
+            )
+            if edited_since and display_text(current) != display_text(value):
+                self.edited[key] = value
+            else:
+                self.edited.pop(key, None)
+                self._fit(col_idx, (value,))[row_idx] = value
+
+    def is_dirty(self, row_idx, col_idx):
+        return (row_idx, col_idx) in self.edited
+
+    def is_row_dirty(self, row_idx):
+        return any(key[0] == row_idx for key in self.edited)
+
+    def dirty_rows(self):
+        """
+        Groups the edited cells by row.
+        Returns: {row_idx: {col_idx: new_value}}
+        """
+        rows = {}
+        for row_idx, col_idx in self.edited:
+            rows.setdefault(row_idx, {})[col_idx] = self.columns[col_idx][row_idx]
+        return rows
+
+    def row(self, row_idx):
+        """Rebuilds a single row as a list (only when a whole row is needed)."""
+        return [column[row_idx] for column in self.columns]
+
+    def rows(self):
+        """Iterates over every row as a list."""
+        for row_idx in range(self.row_count):
+            yield self.row(row_idx)
+
+    def memory_usage(self, sample=1000):
+        """
+        Approximate memory held by the loaded rows (values included).
+        Plain-list columns are estimated from up to `sample` of their cells.
+        Returns: {'rows': n, 'bytes': total,
+                  'columns': {header: {'kind': 'int'|'coded'|'list', 'bytes': n}}}
+        """
+        columns = {}
+        for header, column in zip(self.headers, self.columns):
+            if isinstance(column, array):
+                kind, size = "int", sys.getsizeof(column)
+            elif isinstance(column, CodedColumn):
+                kind = "coded"
+                size = sys.getsizeof(column) + sum(
+                    sys.getsizeof(value) for value in column.values
+                )
+            else:
+                kind, size = "list", sys.getsizeof(column)
+                if column:
+                    step = max(1, len(column) // sample)
+                    cells = column[::step]
+                    # Shared objects (None, small ints, interned text) count once
+                    distinct = {id(value): value for value in cells}
+                    per_cell = sum(map(sys.getsizeof, distinct.values())) / len(cells)
+                    size += int(per_cell * len(column))
+            columns[header] = {"kind": kind, "bytes": size}
+        return {
+            "rows": self.row_count,
+            "bytes": sum(column["bytes"] for column in columns.values()),
+            "columns": columns,
+        }
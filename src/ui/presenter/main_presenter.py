@@ -1,128 +1,584 @@
-from datetime import date, datetime
+from PyQt6.QtCore import QTimer
+from src.database.bulk_export import BulkExporter
+from src.database.bulk_import import BulkImporter
+from src.diagnostics.tracer import traced, tracer
+from src.ui.common.enums import MatchMode
+from src.ui.presenter.task_runner import TaskRunner
 from src.ui.view.add_record_dialog import AddRecordDialog
+from src.ui.view.diagnostics_dialog import DiagnosticsDialog
 
 
 class MainPresenter:
-    def __init__(self, view, data_manager):
+    # How often to sync in the background (only does work with a LocalReplica)
+    SYNC_INTERVAL_MS = 60_000
+
+    # How often to pick up what the write journal has uploaded (if one is used)
+    UPLOAD_CHECK_MS = 1000
+
+    def __init__(self, view, data_manager, runner=None, load_now=True):
+        """
+        runner: a TaskRunner shared with other tables' presenters (one set
+                of background threads for all of them)
+        load_now: load the first page straight away; otherwise it waits
+                  for ensure_loaded() (e.g. until the table's tab is shown)
+        """
         self.view = view
         self.data_manager = data_manager
 
-        # Internal storage for snapshot comparison
+        # Database calls run in the background through this (see task_runner.py)
+        self.runner = runner or TaskRunner()
+        self.runner.busy_changed.connect(self.view.set_busy)
+
+        # Columns of the loaded rows. The rows themselves live only in the
+        # View's RowStore (view.current_data), never copied here.
         self.headers = []
-        self.original_data = []
+
+        # Paging state: where the next page starts and which search is active
+        self.next_key = None
+        self.active_search = {}
+
+        # Search applied to the loaded rows in memory ({} = none), when they
+        # already hold every match (see handle_search)
+        self.quick_search = {}
+
+        # Newest StatusDate seen: after a write, only rows changed since
+        # then are fetched (see refresh_changed)
+        self.watermark = None
 
         # Connect to View signals
-        self.view.btn_refresh.clicked.connect(self.load_data)
+        self.view.btn_refresh.clicked.connect(self.handle_refresh)
         self.view.btn_save.clicked.connect(self.handle_save)
 
         self.view.btn_search.clicked.connect(self.handle_search)
         self.view.btn_clear.clicked.connect(self.handle_clear_search)
 
+        # Search as you type (the View waits for a pause in typing first)
+        self.view.search_requested.connect(self.handle_search)
+
         # Connect Add New Record button
         self.view.btn_add.clicked.connect(self.handle_add_record)
+        self.view.btn_import.clicked.connect(self.handle_import)
+        self.view.btn_export.clicked.connect(self.handle_export)
+
+        # Fetch the next page when the user scrolls to the bottom
+        self.view.more_rows_requested.connect(self.load_more)
+
+        # Fetch a wide column's value when its cell is opened
+        self.view.cell_load_requested.connect(self.load_cell)
+
+        # Hidden timings panel (Ctrl+Shift+D)
+        self.diagnostics_dialog = None
+        self.view.diagnostics_requested.connect(self.handle_diagnostics)
+
+        # Keep a local copy (if any) up to date in the background
+        self.sync_timer = QTimer()
+        self.sync_timer.timeout.connect(self.sync)
+        self.sync_timer.start(self.SYNC_INTERVAL_MS)
+
+        # Saves queued in a write journal are uploaded in the background;
+        # show the outcome as it arrives (see write_journal.py)
+        self.upload_timer = QTimer()
+        self.upload_timer.timeout.connect(self.check_uploads)
+        if self.data_manager.flusher is not None:
+            self.upload_timer.start(self.UPLOAD_CHECK_MS)
+
+        # Initial Load - once the event loop runs, so the window paints first
+        if load_now:
+            QTimer.singleShot(0, self.load_data)
+
+    def ensure_loaded(self):
+        """
+        Loads the first page unless it is loaded or on its way. Rows already
+        loaded are kept as they are (switching back to a tab doesn't query).
+        """
+        if not self.headers and not self.is_pending("records"):
+            self.load_data()
+
+    def _submit(self, name, fn, *args, **kwargs):
+        """
+        runner.submit, with the task's key scoped to this table: a shared
+        runner must not let one table's load supersede another's.
+        """
+        key = None if name is None else (self.data_manager.table_name, name)
+        return self.runner.submit(key, fn, *args, **kwargs)
+
+    def is_pending(self, name):
+        """True while this table's task called name (e.g. "records") hasn't finished."""
+        return self.runner.is_pending((self.data_manager.table_name, name))
 
-        # Initial Load
-        self.load_data()
+    def handle_refresh(self):
+        """Discards unsaved edits: syncs (if using a local copy), then reloads."""
+        self.sync(then=self.load_data)
 
+    def sync(self, then=None):
+        """
+        Runs data_manager.sync() in the background and shows the result.
+        then: optional function to call afterwards, even if the sync failed
+        """
+        def finished(message):
+            self.view.show_status(message)
+            self.check_uploads()  # Queued edits the upload found in conflict
+            if then is not None:
+                then()
+
+        self._submit(
+            "sync",
+            self.data_manager.sync,
+            on_result=finished,
+            on_error=lambda error: finished(f"Working offline: {error}"),
+        )
+
+    @traced(category="ui")
     def load_data(self):
-        """Fetches data from Model and updates View"""
-        self.headers, self.original_data = self.data_manager.get_all_records()
-        self.view.set_table_data(self.headers, self.original_data)
+        """Fetches the first page from Model and updates View"""
+        self.active_search = {}
+        self._load_first_page(self.data_manager.get_all_records)
+
+    def _load_first_page(self, fetch, *args):
+        """
+        Starts a background query for the first page.
+        Everything that replaces the table shares the "records" key,
+        so starting a new load/search supersedes the one still running.
+        """
+        self.view.set_more_rows_available(False)
+        self._submit(
+            "records",
+            fetch,
+            *args,
+            columns=self.view.visible_columns,
+            on_result=self._on_first_page_loaded,
+            on_error=self._on_load_failed,
+            cancellable=True,
+        )
+
+    @traced(category="ui")
+    def _on_first_page_loaded(self, result):
+        self.headers, records, self.next_key = result
+        self.watermark = self._newest_stamp(self.headers, records, None)
+        # The schema has been read by now (the query needed it)
+        self.view.set_field_types(self.data_manager.field_types())
+        self.view.set_more_rows_available(self.next_key is not None)
+        if self.quick_search:
+            self.quick_search = {}
+            self.view.set_quick_filters({})
+        self.view.set_table_data(self.headers, records)
+
+    @traced(category="ui")
+    def load_more(self):
+        """Fetches the next page (of the full table or the active search)"""
+        if self.next_key is None or self.is_pending("records"):
+            return  # Everything is already loaded, or a page is on its way
+
+        self.view.set_more_rows_available(False)
+        self._submit(
+            "records",
+            self.data_manager.get_page,
+            search_params=self.active_search,
+            after_key=self.next_key,
+            columns=self.view.visible_columns,
+            on_result=self._on_next_page_loaded,
+            on_error=self._on_load_failed,
+            cancellable=True,
+        )
+
+    @traced(category="ui")
+    def _on_next_page_loaded(self, result):
+        _, records, self.next_key = result
+        self.view.set_more_rows_available(self.next_key is not None)
+        self.view.append_table_data(records)
+
+    def _on_load_failed(self, error):
+        self.view.show_error("Error", f"Could not load records: {error}")
+
+    def load_cell(self, row_idx, column):
+        """
+        Fetches one cell the page left out (a wide column) by its row's
+        Primary Key, then opens it for editing.
+        """
+        key_column = self.data_manager.primary_key_col
+        store = self.view.current_data
+        key = store.value(row_idx, store.headers.index(key_column))
+
+        def loaded(values):
+            if values is None:
+                self.view.show_status(f"{key_column} {key} no longer exists.")
+                return
+            self.view.load_cells(key_column, key, values, edit_column=column)
+
+        # Opening another cell supersedes this one
+        self._submit(
+            "cell",
+            self.data_manager.get_values,
+            key,
+            [column],
+            on_result=loaded,
+            on_error=lambda error: self.view.show_error(
+                "Error", f"Could not load {column}: {error}"
+            ),
+        )
 
     def handle_save(self):
-        """Orchestrates the save logic: View -> Compare -> Model"""
-        changes_count = 0
-        errors = []
-
-        # 1. Get the Current UI Data from View
-        all_rows_ui_data = self.view.get_all_data()
-
-        # Loop through every row
-        for row_idx, new_data in enumerate(all_rows_ui_data):
-
-            # 2. Get the Original Data (Snapshot)
-            if row_idx >= len(self.original_data):
-                break  # Safety check
-
-            original_row = self.original_data[row_idx]
-
-            # Convert original to string list for fair comparison
-            original_strings = []
-            for val in original_row:
-                if val is None:
-                    original_strings.append("")
-                elif isinstance(val, datetime):
-                    original_strings.append(str(val))
-                elif isinstance(val, date):
-                    original_strings.append(val.strftime("%Y-%m-%d"))
-                else:
-                    original_strings.append(str(val).strip())
-
-            # 3. COMPARE: Did anything change?
-            if new_data != original_strings:
-
-                # Instead of manually finding indexes for every single column,
-                # the list is turned into a dictionary.
-                # headers: ['RecID', 'Surname', 'FirstName', ...]
-                # new_data: ['101', 'Smith', 'John', ...]
-                # Result: {'RecID': '101', 'Surname': 'Smith', ...}
-
-                # Optional: Debug print
-                # print(f"DEBUG: Row {row_idx} changed.")
-
-                # zip automatically pairs headers with new_data
-                row_dict = dict(zip(self.headers, new_data))
-
-                success, msg = self.data_manager.update_record(row_dict)
-
-                if success:
-                    changes_count += 1
-                else:
-                    print(f"DEBUG SQL ERROR: {msg}")
-                    errors.append(f"Row {row_idx + 1}: Failed to save. Please check your data.")
-
-
-        # 4. Final Report
-        if errors:
-            self.view.show_error("Warnings", "\n".join(errors))
-        if changes_count > 0:
-            self.view.show_message("Saved", f"Successfully updated {changes_count} records.")
-            self.load_data()  # Reload from DB to get fresh Snapshot
-        else:
+        """Orchestrates the save logic: View (edited cells only) -> Model"""
+
+        # 1. Ask the View for just the edited cells, grouped per row, plus
+        # each row's StatusDate as loaded (to spot rows saved by someone else)
+        # [{'RecID': 101, 'StatusDate': ..., 'Surname': 'Smith'}, ...]
+        changed_rows = self.view.get_changed_rows(
+            self.data_manager.primary_key_col, self.data_manager.last_modified_col
+        )
+
+        if not changed_rows:
             self.view.show_message("No Changes", "No modifications were detected.")
+            return
+
+        # 2. Send them all to the database in one transaction (in the background)
+        self._save(changed_rows)
+
+    def _save(self, changed_rows):
+        self.view.btn_save.setEnabled(False)
+        self._submit(
+            "save",
+            self.data_manager.save_records,
+            changed_rows,
+            on_result=lambda result: self._on_save_finished(result, changed_rows),
+            on_error=lambda error: self._on_save_failed(error, len(changed_rows)),
+        )
 
+    def _on_save_finished(self, result, changed_rows):
+        self.view.btn_save.setEnabled(True)
+        key_column = self.data_manager.primary_key_col
+        self.view.show_status(result["message"])
+
+        if result.get("queued"):
+            # Only in the write journal so far: safe, so stop showing them as
+            # edited. check_uploads() reports what the server made of them.
+            self.view.apply_saved(key_column, changed_rows)
+            return
+
+        # 3. Show the saved cells (and new StatusDate) as now stored, in place:
+        # no reload, so the scroll position and any newer edits stay as they are
+        self.view.apply_saved(
+            key_column, changed_rows, result["headers"], result["written"]
+        )
+
+        if result["conflicts"]:
+            self._resolve_conflicts(result)
+        else:
+            self.view.show_message(
+                "Saved", f"Successfully updated {len(result['written'])} records."
+            )
+
+        # 4. Pick up whatever anyone else saved meanwhile
+        self.refresh_changed()
+
+    def _resolve_conflicts(self, result):
+        """Lets the user merge rows someone else saved first, then saves again."""
+        key_column = self.data_manager.primary_key_col
+        conflicts = result["conflicts"]
+
+        resave = self.view.resolve_conflicts(
+            conflicts, result["headers"], key_column,
+            self.data_manager.last_modified_col,
+        )
+        if resave is None:
+            self.view.show_status(
+                f"{len(conflicts)} records were not saved: "
+                "someone else changed them since they were loaded."
+            )
+            return
+
+        # Show what is stored now (deleted rows just lose their edits),
+        # then write back the values the user chose to keep
+        self.view.update_rows(
+            key_column,
+            result["headers"],
+            [c["theirs"] for c in conflicts if c["theirs"] is not None],
+        )
+        deleted = [c["mine"][key_column] for c in conflicts if c["theirs"] is None]
+        self.view.revert_rows(key_column, deleted)
+        if resave:
+            self._save(resave)
+
+    def _on_save_failed(self, error, row_count):
+        self.view.btn_save.setEnabled(True)
+        tracer.instant("save failed", "error", rows=row_count, error=str(error))
+        self.view.show_error(
+            "Warnings",
+            f"Failed to save {row_count} records. Please check your data.\n\n{error}",
+        )
+
+    @traced(category="ui")
     def handle_search(self):
         """
         1. Get params from View
-        2. Ask DataManager to find records
-        3. Update View with results
+        2. Filter the loaded rows if they hold every match, otherwise
+           ask DataManager to find records (in the background)
+        3. Update View with results when they arrive
         """
+        self.view.cancel_pending_search()  # In case the Search button beat the timer
         search_params = self.view.get_search_params()
 
-        # Fetch filtered data from DataManager
-        headers, filtered_data = self.data_manager.search_records(search_params)
+        if self._can_filter_loaded(search_params):
+            self._filter_loaded(search_params)
+            return
+
+        self.active_search = search_params
+
+        # Fetch the first page of filtered data from DataManager.
+        self._load_first_page(self.data_manager.search_records, self.active_search)
 
-        # Update the View with filtered data
-        self.view.set_table_data(headers, filtered_data)
-    
     def handle_clear_search(self):
-        """Clears search inputs and reloads full data."""
+        """Clears search inputs and shows the full data (reloading if needed)."""
         self.view.clear_search_fields()
-        self.load_data() # This calls the original get_all_records
+        if self._can_filter_loaded({}):
+            self._filter_loaded({})
+        else:
+            self.load_data() # This calls the original get_all_records
+
+    def _can_filter_loaded(self, search_params):
+        """
+        True if every row the search can match is already loaded: the
+        loaded rows are complete (no more pages) and the search only
+        narrows the one they were loaded with. Otherwise the server has
+        to be asked.
+        """
+        return (
+            bool(self.headers)
+            and self.next_key is None
+            and not self.is_pending("records")
+            and all(col in self.headers for col in search_params)
+            and self.data_manager.search_cache.narrows(
+                search_params, self.active_search
+            )
+        )
+
+    def _filter_loaded(self, search_params):
+        """Filters the loaded rows in memory (quick filters, no query)."""
+        self.quick_search = search_params
+        modes = self.data_manager.search_modes
+        # A FULLTEXT term can only get here unchanged (see narrows), and the
+        # loaded rows already matched it on the server
+        shown = self.view.set_quick_filters({
+            col: (modes.get(col, MatchMode.CONTAINS), term)
+            for col, term in self.data_manager.search_cache.normalize(search_params)
+            if modes.get(col) != MatchMode.FULLTEXT
+        })
+        self.view.show_status(
+            f"Showing {shown:,} of {self.view.current_data.row_count:,} loaded records."
+        )
 
     def handle_add_record(self):
         """Opens the dialog and saves the new record if confirmed."""
-        dialog = AddRecordDialog(self.view)
-        
+        dialog = AddRecordDialog(
+            self.view,
+            self.data_manager.field_types(),
+            find_duplicates=self.data_manager.find_duplicates,
+            validate=self.data_manager.validate_record,
+            fields=self.data_manager.insert_columns(),
+        )
+
         # This pauses the code until the user clicks OK or Cancel
-        if dialog.exec(): 
+        if dialog.exec():
             new_data = dialog.get_data()
-            
-            # Send to DataManager
-            success, msg = self.data_manager.add_record(new_data)
-            
-            if success:
-                self.view.show_message("Success", "Record added successfully!")
-                self.load_data() # Refresh table to show the new row
+
+            # Send to DataManager (in the background)
+            # No key: a second add must not supersede the first
+            self._submit(
+                None,
+                self.data_manager.insert_record,
+                new_data,
+                on_result=self._on_add_finished,
+                on_error=self._on_add_failed,
+            )
+
+    def _on_add_finished(self, result):
+        self.view.show_status(result["message"])
+        if result.get("queued"):
+            return  # Shown once uploaded (see check_uploads)
+        self.view.show_message("Success", "Record added successfully!")
+
+        # Show the new row (as stored, with its RecID) without reloading
+        if result["row"] is not None:
+            self._merge_rows(result["headers"], [result["row"]])
+        self.refresh_changed()
+
+    def _on_add_failed(self, error):
+        self.view.show_error("Error", f"Failed to add record: {error}")
+
+    def refresh_changed(self):
+        """
+        Fetches only the rows changed since the watermark (by anyone) and
+        patches them into the table, instead of reloading it all.
+        """
+        if self.watermark is None:
+            return  # Nothing loaded yet (or no StatusDates): nothing to compare
+        self._submit(
+            "refresh",
+            self.data_manager.get_changed_records,
+            self.watermark,
+            on_result=self._on_changed_loaded,
+            on_error=lambda error: self.view.show_status(
+                f"Could not refresh changed records: {error}"
+            ),
+        )
+
+    @traced(category="ui")
+    def _on_changed_loaded(self, result):
+        headers, records = result
+        # Rows with unsaved edits keep the StatusDate their Save checks against
+        self._merge_rows(headers, records, skip_edited=True)
+        self.watermark = self._newest_stamp(headers, records, self.watermark)
+
+    def check_uploads(self):
+        """
+        Shows what the write journal uploaded since the last check: saved
+        rows are patched in, new records appear, conflicts are offered for
+        merging and refused writes are reported.
+        """
+        results = self.data_manager.take_uploaded()
+        if not results:
+            return
+
+        key_column = self.data_manager.primary_key_col
+        uploaded = 0
+        for result in results:
+            if "error" in result:
+                tracer.instant("upload refused", "error", **result)
+                self.view.show_error(
+                    "Error",
+                    f"The server refused {result['count']} saved changes; they are "
+                    f"kept in the write journal.\n\n{result['error']}",
+                )
+            elif result["operation"] == "insert":
+                uploaded += 1
+                self._merge_rows(result["headers"], [result["row"]])
             else:
-                self.view.show_error("Error", f"Failed to add record: {msg}")
\ No newline at end of file
+                uploaded += len(result["written"])
+                # Rows edited again since keep their edits (and loaded StatusDate)
+                self.view.update_rows(
+                    key_column, result["headers"], result["written"], skip_edited=True
+                )
+                if result["conflicts"]:
+                    self._resolve_conflicts(result)
+
+        if uploaded:
+            self.view.show_status(f"Uploaded {uploaded} saved changes to the server.")
+        self.refresh_changed()
+
+    def _merge_rows(self, headers, rows, skip_edited=False):
+        """
+        Patches rows into the table in place. Rows that aren't loaded are
+        added at the end, but only when the whole unfiltered table is showing
+        (otherwise they arrive with a later page, or don't belong).
+        """
+        missing = self.view.update_rows(
+            self.data_manager.primary_key_col, headers, rows, skip_edited
+        )
+        if (
+            missing
+            and self.next_key is None
+            and not self.active_search
+            and all(col in headers for col in self.headers)
+        ):
+            # In the loaded columns' order (the page may have fetched fewer)
+            positions = [headers.index(col) for col in self.headers]
+            self.view.append_table_data(
+                [[row[i] for i in positions] for row in missing]
+            )
+
+    def _newest_stamp(self, headers, rows, newest):
+        """The latest last_modified_col value among rows (or newest, if later)."""
+        column = self.data_manager.last_modified_col
+        if column not in headers:
+            return newest
+        idx = headers.index(column)
+        stamps = [row[idx] for row in rows if row[idx] is not None]
+        if newest is not None:
+            stamps.append(newest)
+        return max(stamps) if stamps else None
+
+    def handle_import(self):
+        """Bulk imports a CSV/Excel file chosen by the user (in the background)."""
+        path = self.view.ask_import_file()
+        if not path:
+            return
+
+        self.view.btn_import.setEnabled(False)
+        importer = BulkImporter(self.data_manager)
+        self._submit(
+            "import",
+            importer.run,
+            path,
+            on_result=self._on_import_finished,
+            on_error=self._on_import_failed,
+            on_progress=lambda counts: self.view.show_status(
+                f"Importing... {counts['read']:,} rows read, "
+                f"{counts['imported']:,} imported, {counts['rejected']:,} rejected"
+            ),
+            cancellable=True,
+        )
+
+    def _on_import_finished(self, summary):
+        self.view.btn_import.setEnabled(True)
+        message = f"Imported {summary['imported']:,} of {summary['read']:,} rows."
+        if summary["ignored_columns"]:
+            message += f"\nIgnored columns: {', '.join(summary['ignored_columns'])}"
+        if summary["error_file"]:
+            message += (
+                f"\n{summary['rejected']:,} rows were rejected and written to:"
+                f"\n{summary['error_file']}"
+            )
+        self.view.show_status(message.splitlines()[0])
+        self.view.show_message("Import Finished", message)
+        self.load_data()  # Show the new rows
+
+    def _on_import_failed(self, error):
+        self.view.btn_import.setEnabled(True)
+        self.view.show_error("Error", f"Import failed: {error}")
+
+    def handle_export(self):
+        """Exports the whole table, or the active search, in the background."""
+        path = self.view.ask_export_file()
+        if not path:
+            return
+
+        self.view.btn_export.setEnabled(False)
+        exporter = BulkExporter(self.data_manager)
+        self._submit(
+            "export",
+            exporter.run,
+            path,
+            search_params=dict(self.quick_search or self.active_search),
+            on_result=self._on_export_finished,
+            on_error=self._on_export_failed,
+            on_progress=lambda counts: self.view.show_status(
+                f"Exporting... {counts['rows']:,} rows "
+                f"({counts['rows_per_sec']:,} rows/s)"
+            ),
+            cancellable=True,
+        )
+
+    def _on_export_finished(self, summary):
+        self.view.btn_export.setEnabled(True)
+        message = (
+            f"Exported {summary['rows']:,} rows in {summary['seconds']:.1f}s "
+            f"({summary['rows_per_sec']:,} rows/s)."
+        )
+        self.view.show_status(message)
+        self.view.show_message("Export Finished", f"{message}\n{summary['path']}")
+
+    def _on_export_failed(self, error):
+        self.view.btn_export.setEnabled(True)
+        self.view.show_error("Error", f"Export failed: {error}")
+
+    def handle_diagnostics(self):
+        """Opens (or brings back) the diagnostics panel."""
+        if self.diagnostics_dialog is None:
+            self.diagnostics_dialog = DiagnosticsDialog(
+                self.view, tracer, self.data_manager.pool_stats,
+                memory_stats=lambda: self.view.current_data.memory_usage(),
+                statement_stats=self.data_manager.statement_stats,
+            )
+        self.diagnostics_dialog.refresh()
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
@@ -0,0 +1,185 @@
+import threading
+import time
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from src.diagnostics.tracer import tracer
+
+
+class CancelToken:
+    """
+    Handed to cancellable tasks. The task registers what to call to stop
+    its work (e.g. cursor.cancel), and the runner calls it when superseded.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()  # Already cancelled - stop straight away
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # The work may have just finished; nothing left to stop
+
+
+class _TaskSignals(QObject):
+    """Signals must live on a QObject; QRunnable isn't one."""
+
+    finished = pyqtSignal(object)  # the function's return value
+    failed = pyqtSignal(object)  # the exception it raised
+    progress = pyqtSignal(object)  # whatever the function reports on the way
+
+
+class _Task(QRunnable):
+    def __init__(self, fn, args, kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+        self.token = CancelToken()
+        self.queued_at = time.perf_counter()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def run(self):
+        # Runs on a worker thread - never touch widgets in here
+        if self.cancelled:
+            self.signals.finished.emit(None)  # Still report back, result is ignored
+            return
+        try:
+            if tracer.enabled:
+                # Time spent waiting for a free worker thread, then the call
+                wait_ms = round((time.perf_counter() - self.queued_at) * 1000, 3)
+                name = getattr(self.fn, "__qualname__", str(self.fn))
+                with tracer.span(name, "task", wait_ms=wait_ms):
+                    result = self.fn(*self.args, **self.kwargs)
+            else:
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """
+    Runs DataManager calls on background threads so the window never freezes.
+    Results come back to the GUI thread through Qt signals.
+
+    Tasks are submitted under a key (e.g. "records"). Submitting a new task
+    with the same key supersedes the old one: it is taken off the queue if it
+    hasn't started yet, and its result is ignored if it has.
+    """
+
+    # True while at least one task is running (drives the busy indicator)
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+
+        self._latest = {}  # key -> the newest task for that key
+        self._active = set()  # tasks started and not yet reported back
+
+    def submit(
+        self,
+        key,
+        fn,
+        *args,
+        on_result=None,
+        on_error=None,
+        on_progress=None,
+        cancellable=False,
+        **kwargs,
+    ):
+        """
+        Runs fn(*args, **kwargs) in the background.
+        on_result(result) / on_error(exception) are called on the GUI thread,
+        only if this is still the newest task for its key.
+        key=None: the task is never superseded (e.g. adding a record).
+        cancellable=True: fn also gets cancel_token=..., so a superseded task
+        can stop its query on the server instead of running to the end.
+        on_progress: fn also gets progress=..., a function it can call from the
+        worker thread; each value is passed to on_progress on the GUI thread.
+        """
+        if key is None:
+            key = object()  # A key nobody else can use
+        self.cancel(key)
+
+        task = _Task(fn, args, kwargs)
+        if cancellable:
+            kwargs["cancel_token"] = task.token
+        if on_progress is not None:
+            kwargs["progress"] = task.signals.progress.emit
+            task.signals.progress.connect(
+                lambda value: self._on_progress(key, task, on_progress, value)
+            )
+        task.setAutoDelete(False)  # We keep our own reference until it reports back
+
+        task.signals.finished.connect(
+            lambda result: self._on_done(key, task, on_result, result)
+        )
+        task.signals.failed.connect(
+            lambda error: self._on_done(key, task, on_error, error)
+        )
+
+        self._latest[key] = task
+        self._active.add(task)
+        if len(self._active) == 1:
+            self.busy_changed.emit(True)
+
+        self.pool.start(task)
+        return task
+
+    def cancel(self, key):
+        """Supersedes the pending task for key (if any)."""
+        task = self._latest.pop(key, None)
+        if task is None:
+            return
+        task.token.cancel()
+        if self.pool.tryTake(task):
+            # It never started, so it will never report back
+            self._forget(task)
+
+    def is_pending(self, key):
+        return key in self._latest
+
+    def shutdown(self):
+        """Drops queued tasks and waits for running ones (call on exit)."""
+        for key in list(self._latest):
+            self.cancel(key)
+        self.pool.waitForDone()
+
+    def _on_done(self, key, task, callback, value):
+        self._forget(task)
+        if task.cancelled or self._latest.get(key) is not task:
+            return  # Superseded by a newer task - nobody wants this result
+        del self._latest[key]
+        if callback is not None:
+            callback(value)
+
+    def _on_progress(self, key, task, callback, value):
+        if not task.cancelled and self._latest.get(key) is task:
+            callback(value)
+
+    def _forget(self, task):
+        self._active.discard(task)
+        if not self._active:
+            self.busy_changed.emit(False)
@@ -8,7 +8,10 @@ from ..common.enums import FieldType
 from ..common.ui_helpers import WidgetFactory
 
 class AddRecordDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(
+        self, parent=None, field_types=None, find_duplicates=None, validate=None,
+        fields=None,
+    ):
         super().__init__(parent)
         self.setWindowTitle("Add New Record")
         self.resize(400, 500)
@@ -19,9 +22,16 @@ class AddRecordDialog(QDialog):
         # Dictionary to hold the input widgets so we can read them later
         self.inputs = {}
 
+        # Optional: DataManager.validate_record and .find_duplicates,
+        # checked when OK is clicked
+        self.validate = validate
+        self.find_duplicates = find_duplicates
+
         # --- DYNAMICALLY BUILD FORM ---
-        for field in INSERT_FIELDS:
-            field_type = COLUMN_MAP.get(field, FieldType.TEXT)
+        # fields: DataManager.insert_columns() (falls back to INSERT_FIELDS)
+        for field in fields or INSERT_FIELDS:
+            # field_types: DataManager.field_types() (falls back to COLUMN_MAP)
+            field_type = (field_types or COLUMN_MAP).get(field, FieldType.TEXT)
             
             widget = WidgetFactory.create_widget(field_type, value=None)
             
@@ -40,6 +50,44 @@ class AddRecordDialog(QDialog):
         self.layout.addWidget(self.buttons)
         self.setLayout(self.layout)
 
+    def accept(self):
+        """
+        Refuses invalid values (listing them all), then warns about likely
+        duplicates (the user can still add), before closing.
+        """
+        if self.validate is not None:
+            errors = self.validate(self.get_data())
+            if errors:
+                QMessageBox.warning(
+                    self,
+                    "Invalid Values",
+                    "\n".join(f"{col}: {reason}" for _, col, reason in errors),
+                )
+                return  # Stay open, so the entry can be corrected
+        if self.find_duplicates is not None:
+            matches = self.find_duplicates(self.get_data())
+            if matches and not self._confirm_duplicates(matches):
+                return  # Stay open, so the entry can be corrected or cancelled
+        super().accept()
+
+    def _confirm_duplicates(self, matches):
+        lines = []
+        for match in matches:
+            values = ", ".join(
+                str(value) for value in match["record"].values() if value is not None
+            )
+            lines.append(f"RecID {match['key']}: {values} ({match['score']:.0%} match)")
+        answer = QMessageBox.question(
+            self,
+            "Possible Duplicate",
+            "This person may already be in the cohort:\n\n"
+            + "\n".join(lines)
+            + "\n\nAdd the new record anyway?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        return answer == QMessageBox.StandardButton.Yes
+
     def get_data(self):
         """Extracts data from the widgets into a dictionary."""
         data = {}
@@ -0,0 +1,117 @@
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QComboBox,
+    QDialogButtonBox,
+    QHeaderView,
+)
+from PyQt6.QtCore import Qt
+from ..common.ui_helpers import display_text
+
+KEEP_MINE = "Yours"
+KEEP_THEIRS = "Theirs"
+
+
+class ConflictDialog(QDialog):
+    """
+    Shown when a save finds rows that someone else saved after they were
+    loaded. Lists each field the user changed on those rows, next to the value
+    now in the database, and lets the user pick which one to keep.
+
+    conflicts: [{'mine': change_dict, 'theirs': stored row or None}, ...]
+               (see StorageBackend.save_records)
+    headers: column names for the 'theirs' rows
+    """
+
+    COLUMNS = ["Record", "Field", "Yours", "Theirs", "Keep"]
+
+    def __init__(self, parent, conflicts, headers, key_column, token_column):
+        super().__init__(parent)
+        self.setWindowTitle("Records Changed by Someone Else")
+        self.resize(700, 400)
+
+        self.conflicts = conflicts
+        self.headers = headers
+        self.key_column = key_column
+        self.token_column = token_column
+
+        # One (conflict, field, QComboBox) per table row, to read back later
+        self.choices = []
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(
+            "These records were saved by someone else after you loaded them.\n"
+            "Choose which value to keep for each field you changed. "
+            "Cancel keeps your edits unsaved."
+        ))
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+
+        for conflict in conflicts:
+            mine = conflict["mine"]
+            theirs = conflict["theirs"]
+            for field, value in mine.items():
+                if field in (key_column, token_column):
+                    continue
+                if theirs is None:
+                    self._add_row(mine[key_column], field, value, "(deleted)", None)
+                    continue
+                combo = QComboBox()
+                combo.addItems([KEEP_MINE, KEEP_THEIRS])
+                their_value = theirs[headers.index(field)]
+                self._add_row(mine[key_column], field, value, their_value, combo)
+                self.choices.append((conflict, field, combo))
+
+        layout.addWidget(self.table)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+    def _add_row(self, key, field, mine, theirs, combo):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for col, value in enumerate([key, field, mine, theirs]):
+            item = QTableWidgetItem(display_text(value))
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.table.setItem(row, col, item)
+        if combo is not None:
+            self.table.setCellWidget(row, 4, combo)
+        else:
+            item = QTableWidgetItem("Discard")
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.table.setItem(row, 4, item)
+
+    def get_resolution(self):
+        """
+        Returns: rows to save again, as change dicts carrying the token of the
+        row now stored (so they only overwrite what the user just looked at):
+        [{'RecID': 101, 'StatusDate': <theirs>, 'Surname': 'Smith'}, ...]
+        Fields left as "Theirs" and deleted rows are simply not resent.
+        """
+        resave = {}
+        for conflict, field, combo in self.choices:
+            if combo.currentText() != KEEP_MINE:
+                continue
+            mine = conflict["mine"]
+            key = mine[self.key_column]
+            if key not in resave:
+                row = {self.key_column: key}
+                if self.token_column in self.headers:
+                    token_idx = self.headers.index(self.token_column)
+                    row[self.token_column] = conflict["theirs"][token_idx]
+                resave[key] = row
+            resave[key][field] = mine[field]
+        return list(resave.values())
@@ -0,0 +1,184 @@
+import json
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QCheckBox,
+    QLabel,
+    QPushButton,
+    QTabWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QFileDialog,
+    QMessageBox,
+)
+from PyQt6.QtCore import QTimer
+
+
+class DiagnosticsDialog(QDialog):
+    """
+    Hidden diagnostics panel (Ctrl+Shift+D): what the tracer has recorded,
+    summarised per operation and as a list of the latest events.
+
+    tracer: the app's Tracer (src/diagnostics/tracer.py)
+    pool_stats: optional function returning the connection pool metrics
+    memory_stats: optional function returning RowStore.memory_usage()
+    statement_stats: optional function returning the SQL statement cache metrics
+    """
+
+    SUMMARY_COLUMNS = ["Category", "Operation", "Count", "Mean ms", "p95 ms",
+                       "Max ms", "Total ms", "Rows", "Errors"]
+    EVENT_COLUMNS = ["At (s)", "Category", "Operation", "ms", "Thread", "Details"]
+
+    # Latest events listed (the whole buffer goes into an export)
+    RECENT_EVENTS = 300
+
+    REFRESH_MS = 1000
+
+    def __init__(
+        self, parent, tracer, pool_stats=None, memory_stats=None, statement_stats=None
+    ):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(900, 500)
+
+        self.tracer = tracer
+        self.pool_stats = pool_stats
+        self.memory_stats = memory_stats
+        self.statement_stats = statement_stats
+
+        layout = QVBoxLayout()
+
+        self.chk_enabled = QCheckBox("Record timings")
+        self.chk_enabled.setChecked(tracer.enabled)
+        self.chk_enabled.toggled.connect(self._set_enabled)
+        layout.addWidget(self.chk_enabled)
+
+        self.pool_label = QLabel()
+        layout.addWidget(self.pool_label)
+
+        self.statement_label = QLabel()
+        layout.addWidget(self.statement_label)
+
+        self.memory_label = QLabel()
+        layout.addWidget(self.memory_label)
+
+        self.summary_table = self._make_table(self.SUMMARY_COLUMNS)
+        self.events_table = self._make_table(self.EVENT_COLUMNS)
+        tabs = QTabWidget()
+        tabs.addTab(self.summary_table, "Summary")
+        tabs.addTab(self.events_table, "Recent Events")
+        layout.addWidget(tabs)
+
+        buttons = QHBoxLayout()
+        for text, handler in [
+            ("Refresh", self.refresh),
+            ("Clear", self._clear),
+            ("Export Chrome Trace...", self._export),
+            ("Close", self.close),
+        ]:
+            button = QPushButton(text)
+            button.clicked.connect(handler)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        # Keep the numbers current while the dialog is open
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+        self.refresh()
+
+    @staticmethod
+    def _make_table(columns):
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _fill(table, rows):
+        table.setRowCount(len(rows))
+        for row_idx, values in enumerate(rows):
+            for col_idx, value in enumerate(values):
+                if isinstance(value, float):
+                    value = f"{value:.2f}"
+                table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+
+    def refresh(self):
+        if self.pool_stats is not None:
+            stats = self.pool_stats()
+            self.pool_label.setText(
+                "Connection pool: "
+                + (", ".join(f"{k} {v}" for k, v in stats.items()) or "not used")
+            )
+
+        if self.statement_stats is not None:
+            stats = self.statement_stats()
+            self.statement_label.setText(
+                "SQL statements: "
+                + (", ".join(f"{k} {v}" for k, v in stats.items()) or "not used")
+            )
+
+        if self.memory_stats is not None:
+            memory = self.memory_stats()
+            kinds = {}
+            for column in memory["columns"].values():
+                kinds[column["kind"]] = kinds.get(column["kind"], 0) + 1
+            self.memory_label.setText(
+                f"Loaded rows: {memory['rows']:,}, about "
+                f"{memory['bytes'] / 1e6:.1f} MB ("
+                + ", ".join(f"{n} {kind}" for kind, n in sorted(kinds.items()))
+                + " columns)"
+            )
+
+        self._fill(self.summary_table, [
+            [row["category"], row["name"], row["count"], row["mean_ms"],
+             row["p95_ms"], row["max_ms"], row["total_ms"], row["rows"], row["errors"]]
+            for row in self.tracer.summary()
+        ])
+
+        # Newest first
+        events = self.tracer.events()[-self.RECENT_EVENTS:][::-1]
+        self._fill(self.events_table, [
+            [event["start_ns"] / 1e9, event["category"], event["name"],
+             event["duration_ns"] / 1e6, event["thread"],
+             json.dumps(event["details"], default=str)]
+            for event in events
+        ])
+
+    def _set_enabled(self, enabled):
+        self.tracer.enabled = enabled
+
+    def _clear(self):
+        self.tracer.clear()
+        self.refresh()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Chrome Trace", "trace.json", "Trace files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            self.tracer.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not export: {e}")
+            return
+        QMessageBox.information(
+            self, "Exported",
+            f"Saved {len(self.tracer.events())} events to {path}.\n"
+            "Open it in chrome://tracing or ui.perfetto.dev.",
+        )
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -3,39 +3,90 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QVBoxLayout,
     QWidget,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
-    QComboBox,
-    QDateEdit,
     QGroupBox,
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QMessageBox
+    QMessageBox,
+    QProgressBar,
+    QFileDialog,
 )
-from PyQt6.QtCore import QDate, Qt
-from src.ui.common.enums import FieldType
-from src.ui.common.schema import COLUMN_MAP, SEARCH_FIELDS
-from src.ui.common.ui_helpers import WidgetFactory
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QKeySequence, QShortcut
+from src.diagnostics.tracer import tracer
+from src.ui.common.schema import GRID_COLUMNS, SEARCH_FIELDS
+from src.ui.model.field_delegate import FieldTypeDelegate
+from src.ui.model.record_proxy_model import RecordProxyModel
+from src.ui.model.record_table_model import RecordTableModel
 
 
+class _TimedTableView(QTableView):
+    """A QTableView that reports how long each repaint takes (when tracing)."""
+
+    def paintEvent(self, event):
+        if not tracer.enabled:
+            return super().paintEvent(event)
+        with tracer.span("paint table", "ui"):
+            return super().paintEvent(event)
 
 
 class MainView(QMainWindow):
-    def __init__(self):
+    # Emitted when the user scrolls to the bottom of the loaded rows
+    more_rows_requested = pyqtSignal()
+
+    # Emitted once the user pauses typing in the search boxes
+    search_requested = pyqtSignal()
+
+    # Emitted by the hidden Ctrl+Shift+D shortcut
+    diagnostics_requested = pyqtSignal()
+
+    # Emitted when the user opens a cell whose value hasn't been fetched
+    # yet (a wide column): (row index in the model, column name)
+    cell_load_requested = pyqtSignal(int, str)
+
+    # How long to wait after the last keystroke before searching
+    SEARCH_DELAY_MS = 300
+
+    def __init__(self, search_fields=SEARCH_FIELDS, grid_columns=GRID_COLUMNS):
+        """
+        search_fields / grid_columns: the table's SEARCH_FIELDS and
+        GRID_COLUMNS (DataManager.search_fields / .grid_columns when
+        there are several tables)
+        """
         super().__init__()
 
         self.setWindowTitle("UCL Data Haven - Table View")
         self.resize(1000, 600)  # Make it wide like Excel
 
-        # 1. Store Data & Headers
-        self.headers = []
-        self.current_data = []
+        self.search_fields = search_fields
+
+        # The columns to show (None = all), read by the Presenter so only
+        # these are fetched (see GRID_COLUMNS in schema.py)
+        self.visible_columns = list(grid_columns) if grid_columns else None
+
+        # 1. The table model holds the Data & Headers (column by column)
+        self.model = RecordTableModel(self)
+        self.model.more_rows_requested.connect(self.more_rows_requested)
+
+        # The table shows the model through this, so sorting and filtering
+        # the loaded rows happens in memory (see record_proxy_model.py)
+        self.proxy = RecordProxyModel(self)
+        self.proxy.setSourceModel(self.model)
 
         # 2. Setup the UI
         self.setup_ui()
 
+        # 3. Hidden diagnostics panel (see diagnostics_dialog.py)
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        # Only while this view has the focus: with several tables, each
+        # tab has its own shortcut
+        self.diagnostics_shortcut.setContext(
+            Qt.ShortcutContext.WidgetWithChildrenShortcut
+        )
+        self.diagnostics_shortcut.activated.connect(self.diagnostics_requested)
+
     def setup_ui(self):
         # Main Layout
         layout = QVBoxLayout()
@@ -45,7 +96,23 @@ class MainView(QMainWindow):
         layout.addWidget(self.search_group)
 
         # --- THE TABLE ---
-        self.table = QTableWidget()
+        # The view only paints visible cells; editors are created by the
+        # delegate while a cell is being edited, never for the whole table.
+        self.table = _TimedTableView()
+        self.table.setModel(self.proxy)
+        self.table.setItemDelegate(FieldTypeDelegate(self.table))
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        # Click a header to sort the loaded rows; a third click goes back
+        # to the database order
+        header.setSortIndicatorClearable(True)
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        # Fixed row heights: Qt doesn't need to measure every row
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        # Wide columns are fetched when their cell is opened
+        self.table.doubleClicked.connect(self._on_cell_opened)
         layout.addWidget(self.table)
 
         # --- REFRESH BUTTON (To reload from DB) ---
@@ -58,6 +125,14 @@ class MainView(QMainWindow):
         self.btn_add.setStyleSheet("background-color: #008CBA; color: white; font-weight: bold;")
         layout.addWidget(self.btn_add)
 
+        # --- IMPORT BUTTON (Bulk load a CSV/Excel file) ---
+        self.btn_import = QPushButton("Import from CSV / Excel...")
+        layout.addWidget(self.btn_import)
+
+        # --- EXPORT BUTTON (The whole table, or the current search) ---
+        self.btn_export = QPushButton("Export to CSV / Parquet...")
+        layout.addWidget(self.btn_export)
+
         # --- SAVE BUTTON (Iterates table to save changes) ---
         self.btn_save = QPushButton("Save Changes to Database")
         self.btn_save.setStyleSheet(
@@ -70,6 +145,13 @@ class MainView(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        # --- BUSY INDICATOR (shown while the database is working) ---
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)  # No known end: animated "busy" bar
+        self.busy_bar.setMaximumWidth(150)
+        self.busy_bar.hide()
+        self.statusBar().addPermanentWidget(self.busy_bar)
+
     def setup_search_bar(self):
         """Creates the search input fields above the table."""
         self.search_group = QGroupBox("Search Filters")
@@ -77,11 +159,20 @@ class MainView(QMainWindow):
       
         self.search_inputs = {}
 
-        for field in SEARCH_FIELDS:
+        # Debounce: every keystroke restarts the timer, so we only search
+        # once the user stops typing for SEARCH_DELAY_MS
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_requested)
+
+        for field in self.search_fields:
             # Create a label and input for each
             label = QLabel(field + ":")
             line_edit = QLineEdit()
             line_edit.setPlaceholderText(f"Search {field}...")
+            line_edit.textChanged.connect(lambda _text: self.search_timer.start())
+            line_edit.returnPressed.connect(self.search_requested)
             
             # Add to layout
             self.search_layout.addWidget(label)
@@ -115,76 +206,168 @@ class MainView(QMainWindow):
         """Clears all text boxes."""
         for widget in self.search_inputs.values():
             widget.clear()
+        # Clearing counts as typing; don't fire a search for it
+        self.cancel_pending_search()
+
+    def cancel_pending_search(self):
+        """Stops a search that is waiting for the user to finish typing."""
+        self.search_timer.stop()
+
+    @property
+    def headers(self):
+        return self.model.store.headers
+
+    @property
+    def current_data(self):
+        return self.model.store
+
+    def set_field_types(self, field_types):
+        """Called by Presenter with {column: FieldType} (used from the next load)"""
+        self.model.column_types = dict(field_types)
 
     def set_table_data(self, headers, data):
         """Called by Presenter to display data"""
-        self.headers = headers
-        self.current_data = data
-
-        self.table.setColumnCount(len(self.headers))
-        self.table.setRowCount(len(self.current_data))
-        self.table.setHorizontalHeaderLabels(self.headers)
-        self.populate_table()
-
-    def populate_table(self):
-        # Turn off signals while building to prevent lag
-        self.table.setSortingEnabled(False)
-
-        for row_idx, row_data in enumerate(self.current_data):
-            for col_idx, col_name in enumerate(self.headers):
-                cell_value = row_data[col_idx]
-
-                # If the column isn't in the map, default to FieldType.TEXT
-                field_type = COLUMN_MAP.get(col_name, FieldType.TEXT)
-
-                # --- LOGIC TO CHOOSE CELL TYPE ---
-
-                if field_type == FieldType.READONLY:
-                    # Standard Item, but grayed out and locked
-                    item = QTableWidgetItem(str(cell_value))
-                    item.setFlags(
-                        item.flags() ^ Qt.ItemFlag.ItemIsEditable
-                    )  # Remove edit flag
-                    item.setBackground(Qt.GlobalColor.lightGray)
-                    self.table.setItem(row_idx, col_idx, item)
-
-                elif field_type in (FieldType.SEX_COMBOBOX, FieldType.DATE):
-                    widget = WidgetFactory.create_widget(field_type, value=cell_value)
-                    self.table.setCellWidget(row_idx, col_idx, widget)
-
-                else:
-                    # Default: FieldType.TEXT
-                    display_text = str(cell_value) if cell_value is not None else ""
-                    self.table.setItem(row_idx, col_idx, QTableWidgetItem(display_text))
-
-        # Make it look nice
-        self.table.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
+        with tracer.span("set table data", "ui", rows=len(data)):
+            self.model.set_data(headers, data)
+            self._hide_other_columns()
+            self.table.scrollToTop()
+
+    def set_visible_columns(self, columns):
+        """
+        Chooses the columns to show (None = all). Columns already loaded
+        are shown/hidden at once; the next load only fetches these.
+        """
+        self.visible_columns = list(columns) if columns else None
+        self._hide_other_columns()
+
+    def _hide_other_columns(self):
+        """Hides what was only fetched for paging and saving (key, StatusDate...)."""
+        for col_idx, col in enumerate(self.model.store.headers):
+            self.table.setColumnHidden(
+                col_idx,
+                self.visible_columns is not None and col not in self.visible_columns,
+            )
+
+    def _on_cell_opened(self, proxy_index):
+        index = self.proxy.mapToSource(proxy_index)
+        if index.isValid() and not self.model.is_loaded(index.row(), index.column()):
+            self.cell_load_requested.emit(
+                index.row(), self.model.store.headers[index.column()]
+            )
+
+    def load_cells(self, key_column, key, values, edit_column=None):
+        """
+        Called by Presenter with cells fetched later ({column: value}) for
+        the row with this key; edit_column then opens that cell's editor.
+        """
+        row_idx = self.model.load_cells(key_column, key, values)
+        if row_idx is None or edit_column not in self.model.store.headers:
+            return
+        col_idx = self.model.store.headers.index(edit_column)
+        proxy_index = self.proxy.mapFromSource(self.model.index(row_idx, col_idx))
+        if proxy_index.isValid():
+            self.table.setCurrentIndex(proxy_index)
+            self.table.edit(proxy_index)
+
+    def append_table_data(self, data):
+        """Called by Presenter to add the next page of rows to the bottom"""
+        with tracer.span("append table data", "ui", rows=len(data)):
+            self.model.append_rows(data)
+
+    def set_quick_filters(self, filters):
+        """
+        Called by Presenter to filter the loaded rows in memory.
+        filters: {column: (MatchMode, normalized term)}, {} to show every row
+        Returns: how many rows now show
+        """
+        headers = self.model.store.headers
+        with tracer.span("quick filter", "ui", rows=self.model.rowCount()):
+            return self.proxy.set_filters({
+                headers.index(col): condition
+                for col, condition in filters.items()
+                if col in headers
+            })
+
+    def set_more_rows_available(self, available):
+        """Called by Presenter so the table knows whether to ask for more rows"""
+        self.model.more_available = available
+
+    def get_changed_rows(self, key_column, token_column=None):
+        """
+        Returns only the rows the user edited, as dictionaries holding
+        key_column (e.g. the Primary Key) plus just the changed columns:
+        [{'RecID': 101, 'Surname': 'Smith'}, ...]
+        token_column: also include this column as loaded (e.g. StatusDate),
+        so the save can check nobody else changed the row meanwhile.
+        """
+        store = self.model.store
+        key_idx = store.headers.index(key_column)
+        token_idx = (
+            store.headers.index(token_column)
+            if token_column in store.headers else None
         )
 
-    def get_table_row_data(self, row_idx):
+        changed_rows = []
+        for row_idx, cells in sorted(store.dirty_rows().items()):
+            row_dict = {key_column: store.value(row_idx, key_idx)}
+            if token_idx is not None:
+                row_dict[token_column] = store.edited.get(
+                    (row_idx, token_idx), store.value(row_idx, token_idx)
+                )
+            for col_idx, value in cells.items():
+                row_dict[store.headers[col_idx]] = value
+            changed_rows.append(row_dict)
+        return changed_rows
+
+    def update_rows(self, key_column, headers, rows, skip_edited=False):
+        """Called by Presenter to patch rows in place (see RecordTableModel)"""
+        return self.model.update_rows(key_column, headers, rows, skip_edited)
+
+    def revert_rows(self, key_column, keys):
+        """Called by Presenter to drop the edits on some rows"""
+        self.model.revert_rows(key_column, keys)
+
+    def apply_saved(self, key_column, sent, headers=None, rows=None):
+        """Called by Presenter once edits are saved or queued (see RecordTableModel)"""
+        self.model.apply_saved(key_column, sent, headers, rows)
+
+    def resolve_conflicts(self, conflicts, headers, key_column, token_column):
         """
-        Helper to extract clean data from a single row of widgets.
-        Returns a list of values: ['1', 'A111', 'Hall', ...]
+        Shows the rows someone else saved first and lets the user pick,
+        field by field, whose value to keep.
+        Returns: the rows to save again (see ConflictDialog), or None if cancelled
         """
-        row_values = []
-        for col_idx, col_name in enumerate(self.headers):
-            # Check if there is a special widget (Combo/Date)
-            widget = self.table.cellWidget(row_idx, col_idx)
-            item = self.table.item(row_idx, col_idx)
-            target = widget if widget else item
-
-            row_values.append(WidgetFactory.extract_value(target))
-
-        return row_values
-
-    def get_all_data(self):
-        """Returns a list of lists containing all table data as strings"""
-        all_data = []
-        for row_idx in range(self.table.rowCount()):
-            all_data.append(self.get_table_row_data(row_idx))
-        return all_data
-    
+        from src.ui.view.conflict_dialog import ConflictDialog  # Rarely needed
+
+        dialog = ConflictDialog(self, conflicts, headers, key_column, token_column)
+        if not dialog.exec():
+            return None
+        return dialog.get_resolution()
+
+    def set_busy(self, busy):
+        """Shows/hides the busy indicator. The window stays usable either way."""
+        self.busy_bar.setVisible(busy)
+
+    def show_status(self, message):
+        """Shows a short note in the status bar (e.g. the last sync result)."""
+        self.statusBar().showMessage(message)
+
+    def ask_import_file(self):
+        """Asks the user for a file to import. Returns its path, or "" if cancelled."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Records", "", "Data files (*.csv *.xlsx *.xlsm)"
+        )
+        return path
+
+    def ask_export_file(self):
+        """Asks where to save an export. Returns the path, or "" if cancelled."""
+        path, chosen_filter = QFileDialog.getSaveFileName(
+            self, "Export Records", "", "CSV (*.csv);;Parquet (*.parquet)"
+        )
+        if path and not path.lower().endswith((".csv", ".parquet")):
+            path += ".parquet" if "parquet" in chosen_filter.lower() else ".csv"
+        return path
+
     def show_message(self, title, message):
         QMessageBox.information(self, title, message)
 
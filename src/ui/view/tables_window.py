@@ -0,0 +1,30 @@
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QMainWindow, QTabWidget
+
+
+class TablesWindow(QMainWindow):
+    """
+    Multi-table mode (TABLES_CONFIG): one tab per table, each holding a
+    whole MainView (search bar, grid, buttons) with its own loaded rows.
+    Switching tabs just shows another view; nothing is reloaded.
+    """
+
+    # Emitted with the tab's index whenever another tab is shown
+    tab_shown = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("UCL Data Haven - Table View")
+        self.resize(1000, 600)
+
+        self.tabs = QTabWidget()
+        self.tabs.currentChanged.connect(self.tab_shown)
+        self.setCentralWidget(self.tabs)
+
+    def add_table(self, title, view):
+        """Adds a MainView as a tab. Returns: its index"""
+        return self.tabs.addTab(view, title)
+
+    @property
+    def views(self):
+        return [self.tabs.widget(i) for i in range(self.tabs.count())]